@@ -5,45 +5,38 @@ Includes warmup data, TLD breakdown, and theoretical capacity calculations
 """
 
 from datetime import datetime, timedelta
-from collections import defaultdict
+from collections import defaultdict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
 
+import numpy as np
+
+from allocation import METRICS, build_membership, allocate, rollup
 from config import (
-    TAG_TO_INFRA, TIME_PERIODS, TRACKED_INFRA_TYPES,
+    TIME_PERIODS, TRACKED_INFRA_TYPES,
     INFRA_MAX_LIMITS, INFRA_COSTS
 )
 from api_client import get_all_workspace_clients, RevGenLabsAPI
+from mailbox_store import MailboxRecord, MailboxStore, SNAPSHOT_FIELDS, get_infra_type_from_tags
+from projections import project_grid, pure_mixes
+from warmup_ramp import simulate_warmup_ramp, RAMP_WEEKS
+from query_cache import TTLCache
+from query_layer import check_generation, register_cache
+from supabase_data_collector import supabase_select
 
+# Date-range analysis from stored daily data
+WINDOW_CACHE_TTL = 600   # seconds a computed window (and the stored inventory) stays fresh
+WINDOW_CACHE_MAX = 32    # windows kept, least recently used evicted
 
-def get_infra_type_from_tags(tags: list) -> str:
-    """
-    Extract infra type from mailbox tags
-    Only returns types in TRACKED_INFRA_TYPES, otherwise None
-    """
-    if not tags:
-        return None
-    
-    for tag in tags:
-        tag_name = tag.get("name", "")
-        if tag_name in TAG_TO_INFRA:
-            infra_type = TAG_TO_INFRA[tag_name]
-            if infra_type in TRACKED_INFRA_TYPES:
-                return infra_type
-    
-    return None
-
+# Concurrent per-group stats requests in analyze_period (1 = serial)
+ANALYZE_WORKERS = 8
 
-def extract_domain(email: str) -> str:
-    """Extract domain from email address"""
-    if not email or "@" not in email:
-        return ""
-    return email.split("@")[1].lower()
+# Periods written to static/data.json
+ANALYSIS_PERIODS = ["3d", "7d", "14d", "30d"]
 
+WAREHOUSE_READ_WORKERS = 6   # parallel page reads per table in warehouse mode
 
-def extract_tld(domain: str) -> str:
-    """Extract TLD from domain (e.g., 'example.com' -> '.com')"""
-    if not domain or "." not in domain:
-        return ""
-    return "." + domain.split(".")[-1].lower()
+# daily_infra_stats column for each metric (in METRICS order)
+STORED_METRIC_COLUMNS = ["emails_sent", "replies", "bounces", "interested"]
 
 
 def get_date_range(period: str) -> tuple[str, str, int]:
@@ -58,22 +51,28 @@ def fetch_all_mailboxes_with_infra() -> dict:
     """
     Fetch all mailboxes from all workspaces with detailed info
     
+    The groupings are views into one MailboxStore, so each mailbox record
+    exists once however many groupings it appears in. Domain indexes and
+    warmup stats are built here once and reused by every period (the store
+    is the ID -> mailbox / infra index).
+    
     Returns:
         {
-            "by_infra": {infra_type: [mailbox_info, ...]},
-            "by_workspace_infra": {workspace: {infra_type: [mailbox_info, ...]}},
-            "by_tld": {tld: [mailbox_info, ...]},
-            "by_infra_tld": {infra_type: {tld: [mailbox_info, ...]}},
+            "store": MailboxStore of tracked mailboxes,
+            "by_infra": {infra_type: [mailbox, ...]},
+            "by_workspace_infra": {workspace: {infra_type: [mailbox, ...]}},
+            "by_tld": {tld: [mailbox, ...]},
+            "by_infra_tld": {infra_type: {tld: [mailbox, ...]}},
+            "tld_domains": {tld: {domain, ...}},
+            "infra_tld_domains": {(infra_type, tld): {domain, ...}},
             "warmup_data": {workspace: [warmup_info, ...]},
+            "warmup_stats": calculate_warmup_stats result,
             "clients": {workspace: client}
         }
     """
     clients = get_all_workspace_clients()
     
-    by_infra = defaultdict(list)
-    by_workspace_infra = defaultdict(lambda: defaultdict(list))
-    by_tld = defaultdict(list)
-    by_infra_tld = defaultdict(lambda: defaultdict(list))
+    store = MailboxStore()
     warmup_data = {}
     
     print("Fetching mailboxes from all workspaces...")
@@ -94,29 +93,8 @@ def fetch_all_mailboxes_with_infra() -> dict:
             tracked_count = 0
             for mb in mailboxes:
                 infra_type = get_infra_type_from_tags(mb.get("tags", []))
-                if infra_type:
-                    domain = extract_domain(mb.get("email", ""))
-                    tld = extract_tld(domain)
-                    
-                    mb_info = {
-                        "id": mb["id"],
-                        "email": mb.get("email", ""),
-                        "domain": domain,
-                        "tld": tld,
-                        "workspace": workspace_name,
-                        "daily_limit": mb.get("daily_limit", 0),
-                        "status": mb.get("status", ""),
-                        "infra_type": infra_type,
-                    }
-                    
-                    by_infra[infra_type].append(mb_info)
-                    by_workspace_infra[workspace_name][infra_type].append(mb_info)
-                    
-                    # TLD aggregation
-                    if tld:
-                        by_tld[tld].append(mb_info)
-                        by_infra_tld[infra_type][tld].append(mb_info)
-                    
+                if infra_type in TRACKED_INFRA_TYPES:
+                    store.add(MailboxRecord.from_api(mb, workspace_name, infra_type))
                     tracked_count += 1
             
             print(f"✓ {tracked_count}/{len(mailboxes)} tracked")
@@ -124,17 +102,41 @@ def fetch_all_mailboxes_with_infra() -> dict:
         except Exception as e:
             print(f"✗ Error: {e}")
     
+    return index_mailboxes(store, warmup_data, clients)
+
+
+def index_mailboxes(store: MailboxStore, warmup_data: dict, clients: dict) -> dict:
+    """Groupings, domain indexes and warmup stats for a mailbox store (see fetch_all_mailboxes_with_infra)"""
+    # TLD groupings skip mailboxes without a TLD
+    by_infra_tld = {}
+    for infra_type, tld_groups in store.nested("infra_type", "tld").items():
+        tld_groups = {tld: mbs for tld, mbs in tld_groups.items() if tld}
+        if tld_groups:
+            by_infra_tld[infra_type] = tld_groups
+    
+    # Inverted domain indexes for the TLD domain counts
+    tld_domains = defaultdict(set)
+    infra_tld_domains = defaultdict(set)
+    for mb in store:
+        if mb.tld:
+            tld_domains[mb.tld].add(mb.domain)
+            infra_tld_domains[(mb.infra_type, mb.tld)].add(mb.domain)
+    
     return {
-        "by_infra": dict(by_infra),
-        "by_workspace_infra": dict(by_workspace_infra),
-        "by_tld": dict(by_tld),
-        "by_infra_tld": {k: dict(v) for k, v in by_infra_tld.items()},
+        "store": store,
+        "by_infra": store.group_by("infra_type"),
+        "by_workspace_infra": store.nested("workspace_name", "infra_type"),
+        "by_tld": {tld: mbs for tld, mbs in store.group_by("tld").items() if tld},
+        "by_infra_tld": by_infra_tld,
+        "tld_domains": dict(tld_domains),
+        "infra_tld_domains": dict(infra_tld_domains),
         "warmup_data": warmup_data,
+        "warmup_stats": calculate_warmup_stats(warmup_data, store),
         "clients": clients,
     }
 
 
-def calculate_warmup_stats(warmup_data: dict, by_infra: dict) -> dict:
+def calculate_warmup_stats(warmup_data: dict, store: MailboxStore) -> dict:
     """
     Calculate warmup statistics per infra type
     
@@ -143,22 +145,18 @@ def calculate_warmup_stats(warmup_data: dict, by_infra: dict) -> dict:
     - warmup_enabled: boolean, whether warmup is active
     - warmup_daily_limit: current warmup daily limit
     
+    Mailboxes are looked up by ID in the tracked mailbox store.
+    
     Returns dict with warmup counts and status per infra type
     """
-    # Build a lookup of mailbox ID to infra type
-    id_to_infra = {}
-    for infra_type, mailboxes in by_infra.items():
-        for mb in mailboxes:
-            id_to_infra[mb["id"]] = infra_type
-    
     warmup_stats = {infra: {"in_warmup": 0, "ready": 0, "total_warmup_limit": 0} 
                     for infra in TRACKED_INFRA_TYPES}
     
     for workspace_name, warmup_list in warmup_data.items():
         for item in warmup_list:
             mb_id = item.get("id")
-            if mb_id and mb_id in id_to_infra:
-                infra_type = id_to_infra[mb_id]
+            if mb_id and mb_id in store:
+                infra_type = store.get(mb_id).infra_type
                 warmup_enabled = item.get("warmup_enabled", False)
                 warmup_limit = item.get("warmup_daily_limit", 0)
                 
@@ -216,32 +214,97 @@ def calculate_metrics(sent: int, replied: int, interested: int, bounced: int,
     return metrics
 
 
-def analyze_period(mailbox_data: dict, period: str) -> dict:
+# One group's stats for a window: values in METRICS order, or None with the error
+GroupStats = namedtuple("GroupStats", ["workspace_name", "infra_type", "mailbox_count", "values", "error"])
+
+
+def fetch_group_stats(client: RevGenLabsAPI, workspace_name: str, infra_type: str,
+                      mailbox_ids: list, start_date: str, end_date: str) -> GroupStats:
+    """Fetch one workspace/infra group's time-filtered stats (safe to run on a thread pool)"""
+    try:
+        stats = client.get_sender_email_stats(mailbox_ids, start_date, end_date)
+    except Exception as e:
+        return GroupStats(workspace_name, infra_type, len(mailbox_ids), None, str(e))
+    return GroupStats(workspace_name, infra_type, len(mailbox_ids),
+                      tuple(stats.get(metric, 0) for metric in METRICS), None)
+
+
+def analyze_period(mailbox_data: dict, period: str, workers: int = ANALYZE_WORKERS) -> dict:
     """
     Analyze a specific time period using time-filtered API
     
+    Each workspace/infra group is an independent request on a thread pool;
+    results are reduced in inventory order, so the output does not depend
+    on which request finishes first.
+    
     Returns aggregated stats by infra type, by client, by TLD, and by infra+TLD
     """
     start_date, end_date, num_days = get_date_range(period)
     
     clients = mailbox_data["clients"]
     by_workspace_infra = mailbox_data["by_workspace_infra"]
-    by_infra = mailbox_data["by_infra"]
-    by_tld = mailbox_data["by_tld"]
-    by_infra_tld = mailbox_data["by_infra_tld"]
-    warmup_data = mailbox_data["warmup_data"]
     
     print(f"\nAnalyzing {period} ({start_date} to {end_date}, {num_days} days)...")
     
-    # Calculate warmup stats
-    warmup_stats = calculate_warmup_stats(warmup_data, by_infra)
+    # One task per workspace/infra group, in inventory order
+    tasks = []
+    for workspace_name, infra_mailboxes in by_workspace_infra.items():
+        client = clients.get(workspace_name)
+        if not client:
+            continue
+        
+        for infra_type, mailboxes in infra_mailboxes.items():
+            if not mailboxes or infra_type not in TRACKED_INFRA_TYPES:
+                continue
+            mailbox_ids = [mb.external_id for mb in mailboxes]
+            tasks.append((client, workspace_name, infra_type, mailbox_ids, start_date, end_date))
+    
+    # Reduce: stats of every group that returned data, in task order
+    group_results = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for result in pool.map(lambda task: fetch_group_stats(*task), tasks):
+            print(f"  {result.workspace_name}/{result.infra_type}: {result.mailbox_count} mailboxes...", end=" ")
+            if result.error is not None:
+                print(f"✗ {result.error}")
+                continue
+            group_results[(result.workspace_name, result.infra_type)] = list(result.values)
+            print(f"✓ sent={result.values[0]}")
+    
+    results = summarize_groups(mailbox_data, group_results, num_days)
+    results["meta"] = {
+        "period": period,
+        "days": num_days,
+        "start_date": start_date,
+        "end_date": end_date,
+        "generated_at": datetime.now().isoformat(),
+    }
+    return results
+
+
+def summarize_groups(mailbox_data: dict, group_results: dict, num_days: int) -> dict:
+    """
+    Build the period structure from per-group stats and the mailbox inventory
+    
+    Args:
+        mailbox_data: Indexed inventory (index_mailboxes)
+        group_results: {(workspace, infra_type): [sent, replied, bounced, interested]}
+            for every group that has stats, in output order
+        num_days: Days in the window (for per-day metrics)
+    
+    Returns {"by_infra", "by_client", "by_tld", "by_infra_tld", "totals"}
+    """
+    by_workspace_infra = mailbox_data["by_workspace_infra"]
+    by_infra = mailbox_data["by_infra"]
+    tld_domains = mailbox_data["tld_domains"]
+    infra_tld_domains = mailbox_data["infra_tld_domains"]
+    warmup_stats = mailbox_data["warmup_stats"]
     
     # Initialize stats structures
     infra_stats = {}
     for infra_type in TRACKED_INFRA_TYPES:
         mailboxes = by_infra.get(infra_type, [])
-        domains = set(mb["domain"] for mb in mailboxes if mb["domain"])
-        current_capacity = sum(mb.get("daily_limit", 0) for mb in mailboxes)
+        domains = set(mb.domain for mb in mailboxes if mb.domain)
+        current_capacity = sum(mb.daily_limit for mb in mailboxes)
         theoretical_max = len(mailboxes) * INFRA_MAX_LIMITS.get(infra_type, 10)
         
         infra_stats[infra_type] = {
@@ -291,85 +354,73 @@ def analyze_period(mailbox_data: dict, period: str) -> dict:
         "interested": 0,
     }))
     
-    # Build mailbox ID to TLD mapping for stats aggregation
-    id_to_mailbox = {}
-    for infra_type, mailboxes in by_infra.items():
-        for mb in mailboxes:
-            id_to_mailbox[mb["id"]] = mb
-    
-    # Fetch time-filtered stats per workspace per infra type
-    for workspace_name, infra_mailboxes in by_workspace_infra.items():
-        client = clients.get(workspace_name)
-        if not client:
-            continue
+    # Group stats into infra-level and workspace-infra stats
+    for (workspace_name, infra_type), (sent, replied, bounced, interested) in group_results.items():
+        mailboxes = by_workspace_infra.get(workspace_name, {}).get(infra_type, [])
         
-        for infra_type, mailboxes in infra_mailboxes.items():
-            if not mailboxes or infra_type not in infra_stats:
-                continue
-            
-            mailbox_ids = [mb["id"] for mb in mailboxes]
-            domains = set(mb["domain"] for mb in mailboxes if mb["domain"])
-            current_capacity = sum(mb.get("daily_limit", 0) for mb in mailboxes)
-            theoretical_max = len(mailboxes) * INFRA_MAX_LIMITS.get(infra_type, 10)
-            
-            print(f"  {workspace_name}/{infra_type}: {len(mailbox_ids)} mailboxes...", end=" ", flush=True)
-            
-            try:
-                stats = client.get_sender_email_stats(mailbox_ids, start_date, end_date)
-                
-                sent = stats.get("sent", 0)
-                replied = stats.get("replied", 0)
-                bounced = stats.get("bounced", 0)
-                interested = stats.get("interested", 0)
-                
-                # Update infra-level stats
-                infra_stats[infra_type]["sent"] += sent
-                infra_stats[infra_type]["replied"] += replied
-                infra_stats[infra_type]["bounced"] += bounced
-                infra_stats[infra_type]["interested"] += interested
-                infra_stats[infra_type]["workspaces"].add(workspace_name)
-                
-                # Update workspace-infra stats
-                ws_stats = workspace_infra_stats[workspace_name][infra_type]
-                ws_stats["mailbox_count"] = len(mailboxes)
-                ws_stats["domain_count"] = len(domains)
-                ws_stats["current_capacity"] = current_capacity
-                ws_stats["theoretical_max"] = theoretical_max
-                ws_stats["sent"] = sent
-                ws_stats["replied"] = replied
-                ws_stats["bounced"] = bounced
-                ws_stats["interested"] = interested
-                
-                # Aggregate TLD stats (proportional distribution based on mailbox count per TLD)
-                # Group mailboxes by TLD for this infra
-                tld_mailbox_counts = defaultdict(int)
-                for mb in mailboxes:
-                    if mb["tld"]:
-                        tld_mailbox_counts[mb["tld"]] += 1
-                
-                total_mb = len(mailboxes)
-                for tld, count in tld_mailbox_counts.items():
-                    ratio = count / total_mb if total_mb > 0 else 0
-                    
-                    # Distribute stats proportionally by TLD
-                    tld_stats[tld]["mailbox_count"] += count
-                    tld_stats[tld]["sent"] += int(sent * ratio)
-                    tld_stats[tld]["replied"] += int(replied * ratio)
-                    tld_stats[tld]["bounced"] += int(bounced * ratio)
-                    tld_stats[tld]["interested"] += int(interested * ratio)
-                    
-                    # Infra + TLD stats
-                    infra_tld_stats[infra_type][tld]["mailbox_count"] += count
-                    infra_tld_stats[infra_type][tld]["sent"] += int(sent * ratio)
-                    infra_tld_stats[infra_type][tld]["replied"] += int(replied * ratio)
-                    infra_tld_stats[infra_type][tld]["bounced"] += int(bounced * ratio)
-                    infra_tld_stats[infra_type][tld]["interested"] += int(interested * ratio)
-                
-                print(f"✓ sent={sent}")
-                
-            except Exception as e:
-                print(f"✗ {e}")
-    
+        infra_stats[infra_type]["sent"] += sent
+        infra_stats[infra_type]["replied"] += replied
+        infra_stats[infra_type]["bounced"] += bounced
+        infra_stats[infra_type]["interested"] += interested
+        infra_stats[infra_type]["workspaces"].add(workspace_name)
+        
+        ws_stats = workspace_infra_stats[workspace_name][infra_type]
+        ws_stats["mailbox_count"] = len(mailboxes)
+        ws_stats["domain_count"] = len(set(mb.domain for mb in mailboxes if mb.domain))
+        ws_stats["current_capacity"] = sum(mb.daily_limit for mb in mailboxes)
+        ws_stats["theoretical_max"] = len(mailboxes) * INFRA_MAX_LIMITS.get(infra_type, 10)
+        ws_stats["sent"] = sent
+        ws_stats["replied"] = replied
+        ws_stats["bounced"] = bounced
+        ws_stats["interested"] = interested
+    
+    # Distribute group stats to TLDs by mailbox count (largest-remainder, so TLDs add up)
+    membership = build_membership(by_workspace_infra)
+    groups = membership["groups"]
+    totals = np.array([[group_results.get(g, [0] * len(METRICS)) for g in groups]], dtype=np.float64)
+    slot_values = allocate(totals, membership)
+    
+    # Mailbox counts only include groups that returned stats
+    fetched = np.array([g in group_results for g in groups], dtype=bool)
+    weights = (membership["slot_weight"] * fetched[membership["slot_group"]])[None, :, None]
+    
+    tld_values = rollup(slot_values, membership, "tld")[0].tolist()
+    tld_counts = rollup(weights, membership, "tld")[0, :, 0].tolist()
+    for tld, count, values in zip(membership["tlds"], tld_counts, tld_values):
+        if count:
+            tld_stats[tld]["mailbox_count"] += count
+            for metric, value in zip(METRICS, values):
+                tld_stats[tld][metric] += value
+    
+    infra_tld_values = rollup(slot_values, membership, "infra_tld")[0].tolist()
+    infra_tld_counts = rollup(weights, membership, "infra_tld")[0, :, 0].tolist()
+    for (infra_type, tld), count, values in zip(membership["infra_tlds"], infra_tld_counts, infra_tld_values):
+        if count:
+            infra_tld_stats[infra_type][tld]["mailbox_count"] += count
+            for metric, value in zip(METRICS, values):
+                infra_tld_stats[infra_type][tld][metric] += value
+    
+    return finish_period_stats(infra_stats, workspace_infra_stats, tld_stats, infra_tld_stats,
+                               tld_domains, infra_tld_domains, num_days)
+
+
+def finish_period_stats(infra_stats: dict, workspace_infra_stats: dict, tld_stats: dict,
+                        infra_tld_stats: dict, tld_domains: dict, infra_tld_domains: dict,
+                        num_days: int) -> dict:
+    """
+    Derived metrics, domain counts and totals for summed period stats (updated in place)
+    
+    Args:
+        infra_stats: {infra_type: counts, "workspaces": set of workspace names}
+        workspace_infra_stats: {workspace: {infra_type: counts}}
+        tld_stats: {tld: counts}
+        infra_tld_stats: {infra_type: {tld: counts}}
+        tld_domains: {tld: {domain, ...}} for the TLD domain counts
+        infra_tld_domains: {(infra_type, tld): {domain, ...}}
+        num_days: Days in the window (for per-day metrics)
+    
+    Returns {"by_infra", "by_client", "by_tld", "by_infra_tld", "totals"}
+    """
     # Calculate derived metrics for infra stats
     for infra_type, stats in infra_stats.items():
         stats["workspaces"] = list(stats["workspaces"])
@@ -393,10 +444,7 @@ def analyze_period(mailbox_data: dict, period: str) -> dict:
     # Calculate derived metrics for TLD stats
     for tld, stats in tld_stats.items():
         # Count unique domains for this TLD
-        stats["domain_count"] = len(set(
-            mb["domain"] for infra_mbs in by_infra.values() 
-            for mb in infra_mbs if mb["tld"] == tld
-        ))
+        stats["domain_count"] = len(tld_domains.get(tld, ()))
         metrics = calculate_metrics(
             stats["sent"], stats["replied"], stats["interested"], stats["bounced"],
             stats["mailbox_count"], num_days
@@ -406,10 +454,7 @@ def analyze_period(mailbox_data: dict, period: str) -> dict:
     # Calculate derived metrics for infra+TLD stats
     for infra_type, tld_data in infra_tld_stats.items():
         for tld, stats in tld_data.items():
-            stats["domain_count"] = len(set(
-                mb["domain"] for mb in by_infra.get(infra_type, []) 
-                if mb["tld"] == tld
-            ))
+            stats["domain_count"] = len(infra_tld_domains.get((infra_type, tld), ()))
             metrics = calculate_metrics(
                 stats["sent"], stats["replied"], stats["interested"], stats["bounced"],
                 stats["mailbox_count"], num_days
@@ -450,14 +495,235 @@ def analyze_period(mailbox_data: dict, period: str) -> dict:
         "by_tld": by_tld_output,
         "by_infra_tld": by_infra_tld_output,
         "totals": totals,
-        "meta": {
+    }
+
+
+# Dropped with the server query cache when a collector run finishes
+_window_cache = register_cache(TTLCache(max_entries=WINDOW_CACHE_MAX, ttl=WINDOW_CACHE_TTL))
+
+
+def parse_date_range(start: str, end: str) -> tuple[str, str, int]:
+    """
+    Validate an inclusive YYYY-MM-DD window
+    
+    Returns (start_date, end_date, num_days); raises ValueError for bad dates or end < start
+    """
+    try:
+        start_dt = datetime.strptime(start or "", "%Y-%m-%d")
+        end_dt = datetime.strptime(end or "", "%Y-%m-%d")
+    except ValueError:
+        raise ValueError(f"start and end must be YYYY-MM-DD (got start={start!r}, end={end!r})")
+    if end_dt < start_dt:
+        raise ValueError(f"end ({end}) is before start ({start})")
+    return start_dt.strftime("%Y-%m-%d"), end_dt.strftime("%Y-%m-%d"), (end_dt - start_dt).days + 1
+
+
+def load_stored_inventory(workers: int = 1) -> dict:
+    """
+    Tracked mailbox inventory from mailbox_snapshots (no API calls)
+    
+    Args:
+        workers: Parallel page reads (see supabase_select)
+    
+    Returns the same structure as fetch_all_mailboxes_with_infra (without clients);
+    warmup stats come from each snapshot's warmup_enabled / warmup_daily_limit.
+    """
+    rows = supabase_select("mailbox_snapshots", select=",".join(SNAPSHOT_FIELDS), order="email.asc",
+                           workers=workers)
+    
+    store = MailboxStore()
+    warmup_list = []
+    for row in rows:
+        if row.get("infra_type") not in TRACKED_INFRA_TYPES:
+            continue
+        mb = store.add(MailboxRecord(**{k: v for k, v in row.items() if v is not None}))
+        warmup_list.append({
+            "id": mb.external_id,
+            "warmup_enabled": mb.warmup_enabled,
+            "warmup_daily_limit": mb.warmup_daily_limit,
+        })
+    
+    return index_mailboxes(store, {"mailbox_snapshots": warmup_list}, clients={})
+
+
+def fetch_stored_daily_stats(start_date: str, end_date: str, workers: int = 1) -> dict:
+    """
+    daily_infra_stats rows for a window, per tracked workspace/infra group and date
+    
+    Returns {(workspace, infra_type): {date: [sent, replied, bounced, interested]}}
+    """
+    rows = supabase_select(
+        "daily_infra_stats",
+        filters=[("date", f"gte.{start_date}"), ("date", f"lte.{end_date}")],
+        select="date,workspace_name,infra_type," + ",".join(STORED_METRIC_COLUMNS),
+        order="date.asc,workspace_name.asc,infra_type.asc",
+        workers=workers,
+    )
+    
+    daily = {}
+    for row in rows:
+        if row["infra_type"] not in TRACKED_INFRA_TYPES:
+            continue
+        by_date = daily.setdefault((row["workspace_name"], row["infra_type"]), {})
+        totals = by_date.setdefault(row["date"], [0] * len(METRICS))
+        for i, column in enumerate(STORED_METRIC_COLUMNS):
+            totals[i] += row.get(column) or 0
+    
+    return daily
+
+
+def sum_daily_stats(daily: dict, start_date: str, end_date: str) -> tuple[dict, list]:
+    """
+    Sum per-date group stats over an inclusive window
+    
+    Every group in daily is included (zeros if it has no data in the window).
+    
+    Returns ({(workspace, infra_type): [sent, replied, bounced, interested]}, dates with data)
+    """
+    group_results = {}
+    dates = set()
+    for group, by_date in daily.items():
+        totals = group_results[group] = [0] * len(METRICS)
+        for date, values in by_date.items():
+            if not start_date <= date <= end_date:
+                continue
+            for i, value in enumerate(values):
+                totals[i] += value
+            dates.add(date)
+    
+    return group_results, sorted(dates)
+
+
+def fetch_stored_group_stats(start_date: str, end_date: str) -> tuple[dict, list]:
+    """
+    Sum daily_infra_stats over a window per tracked workspace/infra group
+    
+    Returns ({(workspace, infra_type): [sent, replied, bounced, interested]}, dates with data)
+    """
+    return sum_daily_stats(fetch_stored_daily_stats(start_date, end_date), start_date, end_date)
+
+
+def fill_missing_days(mailbox_data: dict, daily: dict, start_date: str, end_date: str) -> list:
+    """
+    Fetch days with no daily_infra_stats rows from the API into daily (in place)
+    
+    Only the missing dates are requested, one daily-breakdown call per group
+    covering the first to last missing date.
+    
+    Returns the dates that were missing, sorted
+    """
+    stored = {date for by_date in daily.values() for date in by_date}
+    day = datetime.strptime(start_date, "%Y-%m-%d")
+    last = datetime.strptime(end_date, "%Y-%m-%d")
+    missing = []
+    while day <= last:
+        if day.strftime("%Y-%m-%d") not in stored:
+            missing.append(day.strftime("%Y-%m-%d"))
+        day += timedelta(days=1)
+    if not missing:
+        return missing
+    
+    print(f"Filling {len(missing)} day(s) without stored stats from the API: {', '.join(missing)}")
+    clients = mailbox_data["clients"] or get_all_workspace_clients()
+    wanted = set(missing)
+    for workspace_name, infra_groups in mailbox_data["by_workspace_infra"].items():
+        client = clients.get(workspace_name)
+        if not client:
+            print(f"  ✗ {workspace_name}: no API client")
+            continue
+        for infra_type, mailboxes in infra_groups.items():
+            ids = [mb.external_id for mb in mailboxes if mb.external_id is not None]
+            if not ids:
+                continue
+            daily_stats = client.get_sender_email_stats_daily(ids, missing[0], missing[-1])
+            for date, stats in daily_stats.items():
+                if date in wanted:
+                    by_date = daily.setdefault((workspace_name, infra_type), {})
+                    by_date[date] = [stats.get(m, 0) for m in METRICS]
+    
+    return missing
+
+
+def analyze_stored_periods(mailbox_data: dict, periods: list) -> dict:
+    """
+    Analyze several periods from daily_infra_stats with one read of the widest window
+    
+    Days with no stored rows are filled from the API (fill_missing_days).
+    
+    Returns {period: analyze_period structure}
+    """
+    windows = {period: get_date_range(period) for period in periods}
+    start_date = min(start for start, _, _ in windows.values())
+    end_date = max(end for _, end, _ in windows.values())
+    
+    daily = fetch_stored_daily_stats(start_date, end_date, workers=WAREHOUSE_READ_WORKERS)
+    filled = fill_missing_days(mailbox_data, daily, start_date, end_date)
+    
+    all_results = {}
+    for period, (period_start, period_end, num_days) in windows.items():
+        group_results, dates = sum_daily_stats(daily, period_start, period_end)
+        results = summarize_groups(mailbox_data, group_results, num_days)
+        results["meta"] = {
             "period": period,
             "days": num_days,
+            "start_date": period_start,
+            "end_date": period_end,
+            "days_with_data": len(dates),
+            "filled_dates": [date for date in filled if period_start <= date <= period_end],
+            "source": "warehouse",
+            "generated_at": datetime.now().isoformat(),
+        }
+        all_results[period] = results
+    
+    return all_results
+
+
+def analyze_date_range(start: str, end: str) -> dict:
+    """
+    Analyze any inclusive date window from stored daily data (no API calls)
+    
+    Stats come from daily_infra_stats and the inventory from mailbox_snapshots.
+    Results are cached per window for WINDOW_CACHE_TTL seconds, or until a
+    collector run finishes (query_layer.check_generation).
+    
+    Returns the analyze_period structure (by_infra, by_client, by_tld,
+    by_infra_tld, totals, meta); raises ValueError for an invalid window
+    """
+    start_date, end_date, num_days = parse_date_range(start, end)
+    check_generation()
+    
+    def compute():
+        mailbox_data = _window_cache.get_or_compute("inventory", load_stored_inventory)
+        group_results, dates = fetch_stored_group_stats(start_date, end_date)
+        results = summarize_groups(mailbox_data, group_results, num_days)
+        results["meta"] = {
+            "period": f"{start_date}..{end_date}",
+            "days": num_days,
             "start_date": start_date,
             "end_date": end_date,
+            "days_with_data": len(dates),
+            "source": "daily_infra_stats",
             "generated_at": datetime.now().isoformat(),
         }
-    }
+        return results
+    
+    return _window_cache.get_or_compute(("window", start_date, end_date), compute)
+
+
+def analyze_warmup_ramp(weeks: int = RAMP_WEEKS) -> dict:
+    """
+    Warmup ramp projection from the stored inventory (no API calls)
+    
+    Cached per day and horizon like analyze_date_range windows.
+    """
+    today = datetime.now().date()
+    check_generation()
+    
+    def compute():
+        mailbox_data = _window_cache.get_or_compute("inventory", load_stored_inventory)
+        return simulate_warmup_ramp(mailbox_data, weeks, today)
+    
+    return _window_cache.get_or_compute(("ramp", weeks, today.isoformat()), compute)
 
 
 def calculate_cost_projections(target_sends: int = 100000) -> dict:
@@ -467,16 +733,18 @@ def calculate_cost_projections(target_sends: int = 100000) -> dict:
     Returns dict with projections per infra type
     """
     projections = {}
+    infra_types = list(TRACKED_INFRA_TYPES)
+    grid = project_grid([target_sends], pure_mixes(infra_types), infra_types)
     
-    for infra_type in TRACKED_INFRA_TYPES:
+    for i, infra_type in enumerate(infra_types):
         costs = INFRA_COSTS.get(infra_type, {})
         sends_per_day = costs.get("sends_per_day", INFRA_MAX_LIMITS.get(infra_type, 10))
         
-        if sends_per_day <= 0:
+        if not grid["feasible"][i]:
             projections[infra_type] = {"feasible": False, "reason": "No sends per day defined"}
             continue
         
-        mailboxes_needed = target_sends // sends_per_day
+        mailboxes_needed = int(grid["mailboxes_needed"][0, i])
         if mailboxes_needed > 50000:
             projections[infra_type] = {
                 "feasible": False,
@@ -485,52 +753,55 @@ def calculate_cost_projections(target_sends: int = 100000) -> dict:
             }
             continue
         
-        monthly_cost = mailboxes_needed * costs.get("monthly_per_mailbox", 0)
-        
-        # Calculate one-time setup cost
-        setup_cost = 0
-        domains_needed = 0
-        
-        if "mailboxes_per_tenant" in costs:
-            # Aged Outlook / Outlook style
-            tenants_needed = mailboxes_needed // costs.get("mailboxes_per_tenant", 25)
-            domains_needed = tenants_needed * costs.get("domains_per_tenant", 5)
-            setup_cost = (
-                tenants_needed * costs.get("tenant_cost", 0) +
-                domains_needed * costs.get("aged_domain_cost", costs.get("domain_cost", 0))
-            )
-        else:
-            # Maldoso / GR style
-            mailboxes_per_domain = costs.get("mailboxes_per_domain", 4)
-            domains_needed = mailboxes_needed // mailboxes_per_domain
-            setup_cost = (
-                domains_needed * costs.get("domain_cost", 0) +
-                mailboxes_needed * costs.get("setup_per_mailbox", 0)
-            )
-        
         projections[infra_type] = {
             "feasible": True,
             "target_sends": target_sends,
             "sends_per_day": sends_per_day,
             "mailboxes_needed": mailboxes_needed,
-            "domains_needed": domains_needed,
-            "monthly_cost": round(monthly_cost, 2),
-            "setup_cost": round(setup_cost, 2),
+            "domains_needed": int(grid["domains_needed"][0, i]),
+            "monthly_cost": round(float(grid["monthly_cost"][0, i]), 2),
+            "setup_cost": round(float(grid["setup_cost"][0, i]), 2),
             "warmup_weeks": costs.get("warmup_weeks", 4),
         }
     
     return projections
 
 
-def analyze_all_periods() -> dict:
+def analyze_all_periods(source: str = "api") -> dict:
     """
     Analyze all time periods
     
+    Args:
+        source: "api" fetches inventory and stats from the RevGenLabs API;
+                "warehouse" reads mailbox_snapshots and daily_infra_stats from
+                Supabase and only calls the API for days with no stored rows
+    
     Returns dict with data for each period plus cost projections
     """
     # First fetch all mailboxes (only need to do this once)
-    mailbox_data = fetch_all_mailboxes_with_infra()
+    if source == "warehouse":
+        mailbox_data = load_stored_inventory(workers=WAREHOUSE_READ_WORKERS)
+        analyze = analyze_stored_periods(mailbox_data, ANALYSIS_PERIODS).__getitem__
+    elif source == "api":
+        mailbox_data = fetch_all_mailboxes_with_infra()
+        analyze = lambda period: analyze_period(mailbox_data, period)
+    else:
+        raise ValueError(f"Unknown analysis source: {source}")
     
+    return build_all_periods(mailbox_data, analyze)
+
+
+def build_all_periods(mailbox_data: dict, analyze) -> dict:
+    """
+    Print the inventory summary and assemble every period plus cost projections
+    
+    Args:
+        mailbox_data: Indexed inventory (index_mailboxes)
+        analyze: Callable period -> analyze_period structure
+    
+    Returns dict with data for each period in ANALYSIS_PERIODS plus "projections"
+    and "warmup_ramp"
+    """
     # Print mailbox summary
     print("\n" + "=" * 80)
     print("MAILBOX SUMMARY (Tracked Infra Types Only)")
@@ -540,8 +811,8 @@ def analyze_all_periods() -> dict:
     
     for infra_type in TRACKED_INFRA_TYPES:
         mailboxes = mailbox_data["by_infra"].get(infra_type, [])
-        domains = set(mb["domain"] for mb in mailboxes if mb["domain"])
-        current_cap = sum(mb.get("daily_limit", 0) for mb in mailboxes)
+        domains = set(mb.domain for mb in mailboxes if mb.domain)
+        current_cap = sum(mb.daily_limit for mb in mailboxes)
         theo_max = len(mailboxes) * INFRA_MAX_LIMITS.get(infra_type, 10)
         print(f"{infra_type:<18} {len(mailboxes):>10,} {len(domains):>10,} {current_cap:>12,} {theo_max:>10,}")
     
@@ -555,8 +826,8 @@ def analyze_all_periods() -> dict:
     
     # Analyze each period
     all_results = {}
-    for period in ["3d", "7d", "14d", "30d"]:
-        results = analyze_period(mailbox_data, period)
+    for period in ANALYSIS_PERIODS:
+        results = analyze(period)
         all_results[period] = results
         
         # Print summary
@@ -571,6 +842,7 @@ def analyze_all_periods() -> dict:
     
     # Add cost projections
     all_results["projections"] = calculate_cost_projections(100000)
+    all_results["warmup_ramp"] = simulate_warmup_ramp(mailbox_data, RAMP_WEEKS)
     
     return all_results
 
@@ -578,7 +850,7 @@ def analyze_all_periods() -> dict:
 def print_summary(results: dict) -> None:
     """Print formatted summary"""
     for period, data in results.items():
-        if period == "projections":
+        if period in ("projections", "warmup_ramp"):
             continue
             
         days = data["meta"]["days"]
@@ -4,14 +4,25 @@ Endpoint: /api/aggregate_domains
 
 Triggers domain aggregation from Infrastructure_dashboard to domain_daily_metrics
 Can be called by n8n or Vercel cron
+
+Query params:
+    max_keys: (domain, client) groups held in memory before spilling to a
+              temporary SQLite file under /tmp (default: AGGREGATE_MAX_KEYS, 0 = never)
 """
 
 from http.server import BaseHTTPRequestHandler
 import json
 import os
+import sys
 import requests
 from datetime import date
-from collections import defaultdict
+from itertools import islice
+from urllib.parse import urlparse, parse_qs
+
+# Add parent directory to path so we can import our modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spill_aggregator import SpillAggregator, SPILL_MAX_KEYS
 
 # Supabase configuration
 SUPABASE_URL = "https://fxxjfgfnrywffjmxoadl.supabase.co"
@@ -27,16 +38,23 @@ HEADERS = {
     "Prefer": "resolution=merge-duplicates"
 }
 
+DASHBOARD_SELECT = "Mailbox,Domain,Client,Tag,Email Sent,Reply Count,Bounce Count,interested_response"
+DASHBOARD_PAGE_SIZE = 1000
+
 
-def fetch_infrastructure_dashboard():
-    """Fetch all mailbox data from Infrastructure_dashboard table"""
+def iter_infrastructure_dashboard(page_size: int = DASHBOARD_PAGE_SIZE):
+    """Yield Infrastructure_dashboard rows, one page in memory at a time"""
     url = f"{SUPABASE_URL}/rest/v1/Infrastructure_dashboard"
-    params = {
-        "select": "Mailbox,Domain,Client,Tag,Email Sent,Reply Count,Bounce Count,interested_response"
-    }
-    response = requests.get(url, headers=HEADERS, params=params)
-    response.raise_for_status()
-    return response.json()
+    offset = 0
+    while True:
+        params = {"select": DASHBOARD_SELECT, "order": "Mailbox", "limit": page_size, "offset": offset}
+        response = requests.get(url, headers=HEADERS, params=params)
+        response.raise_for_status()
+        rows = response.json()
+        yield from rows
+        if len(rows) < page_size:
+            break
+        offset += page_size
 
 
 def extract_tld(domain: str) -> str:
@@ -47,51 +65,50 @@ def extract_tld(domain: str) -> str:
     return parts[-1] if parts else "unknown"
 
 
-def aggregate_by_domain(mailboxes: list) -> list:
-    """Aggregate mailbox data by domain + client"""
-    domain_data = defaultdict(lambda: {
-        "mailbox_count": 0,
-        "emails_sent": 0,
-        "replies": 0,
-        "bounces": 0,
-        "interested": 0,
-        "infra_type": None,
-        "tld": None
-    })
+def aggregate_domains(mailboxes, max_keys: int = SPILL_MAX_KEYS) -> tuple:
+    """Group mailbox rows by domain + client; returns (SpillAggregator, rows read)"""
+    aggregator = SpillAggregator(
+        ["domain", "client"],
+        ["mailbox_count", "emails_sent", "replies", "bounces", "interested"],
+        ["infra_type"],
+        max_keys=max_keys,
+    )
+    count = 0
 
     for mailbox in mailboxes:
+        count += 1
         domain = mailbox.get("Domain", "").lower().strip()
         client = mailbox.get("Client", "Unknown")
 
         if not domain:
             continue
 
-        key = (domain, client)
-        domain_data[key]["mailbox_count"] += 1
-        domain_data[key]["emails_sent"] += mailbox.get("Email Sent", 0) or 0
-        domain_data[key]["replies"] += mailbox.get("Reply Count", 0) or 0
-        domain_data[key]["bounces"] += mailbox.get("Bounce Count", 0) or 0
-        domain_data[key]["interested"] += mailbox.get("interested_response", 0) or 0
+        aggregator.add((domain, client), [
+            1,
+            mailbox.get("Email Sent", 0) or 0,
+            mailbox.get("Reply Count", 0) or 0,
+            mailbox.get("Bounce Count", 0) or 0,
+            mailbox.get("interested_response", 0) or 0,
+        ], [mailbox.get("Tag", "Unknown") or None])
+
+    return aggregator, count
 
-        if not domain_data[key]["infra_type"]:
-            domain_data[key]["infra_type"] = mailbox.get("Tag", "Unknown")
-        if not domain_data[key]["tld"]:
-            domain_data[key]["tld"] = extract_tld(domain)
 
+def domain_records(aggregator: SpillAggregator):
+    """Yield domain metric records in first-seen order"""
     today = date.today().isoformat()
-    records = []
 
-    for (domain, client), data in domain_data.items():
+    for (domain, client), data in aggregator.items():
         sent = data["emails_sent"]
         reply_rate = round(data["replies"] / sent * 100, 4) if sent > 0 else 0
         bounce_rate = round(data["bounces"] / sent * 100, 4) if sent > 0 else 0
 
-        records.append({
+        yield {
             "date": today,
             "domain": domain,
             "client_name": client,
             "infra_type": data["infra_type"] or "Unknown",
-            "tld": data["tld"],
+            "tld": extract_tld(domain),
             "mailbox_count": data["mailbox_count"],
             "emails_sent": data["emails_sent"],
             "replies": data["replies"],
@@ -99,29 +116,32 @@ def aggregate_by_domain(mailboxes: list) -> list:
             "interested": data["interested"],
             "reply_rate": reply_rate,
             "bounce_rate": bounce_rate
-        })
-
-    return records
+        }
 
 
-def upsert_domain_metrics(records: list) -> dict:
-    """Upsert domain metrics into Supabase"""
-    if not records:
-        return {"inserted": 0, "message": "No records to insert"}
-
+def upsert_domain_metrics(records) -> dict:
+    """Upsert domain metrics into Supabase (records may be any iterable)"""
     url = f"{SUPABASE_URL}/rest/v1/domain_daily_metrics"
     batch_size = 100
     total_inserted = 0
-
-    for i in range(0, len(records), batch_size):
-        batch = records[i:i + batch_size]
+    total_records = 0
+    records = iter(records)
+
+    while True:
+        batch = list(islice(records, batch_size))
+        if not batch:
+            break
+        total_records += len(batch)
         response = requests.post(url, headers=HEADERS, json=batch)
         if response.status_code in [200, 201]:
             total_inserted += len(batch)
 
+    if not total_records:
+        return {"inserted": 0, "message": "No records to insert"}
+
     return {
         "inserted": total_inserted,
-        "total_domains": len(records),
+        "total_domains": total_records,
         "date": date.today().isoformat()
     }
 
@@ -129,13 +149,17 @@ def upsert_domain_metrics(records: list) -> dict:
 class handler(BaseHTTPRequestHandler):
     def do_GET(self):
         try:
-            # Run aggregation
-            mailboxes = fetch_infrastructure_dashboard()
-            domain_records = aggregate_by_domain(mailboxes)
-            result = upsert_domain_metrics(domain_records)
+            params = parse_qs(urlparse(self.path).query)
+            max_keys = int(params.get("max_keys", [SPILL_MAX_KEYS])[0])
+
+            # Run aggregation (rows streamed page by page, groups spilled past max_keys)
+            aggregator, mailbox_count = aggregate_domains(iter_infrastructure_dashboard(), max_keys)
+            with aggregator:
+                result = upsert_domain_metrics(domain_records(aggregator))
+                result["spills"] = aggregator.spills
 
             # Add summary
-            result["mailboxes_processed"] = len(mailboxes)
+            result["mailboxes_processed"] = mailbox_count
             result["status"] = "success"
 
             self.send_response(200)
@@ -1,34 +1,84 @@
 """
 Vercel Serverless Function for Daily Data Collection
-Triggered by Vercel Cron at 4:30 PM IST (11:00 UTC)
+Triggered by Vercel Cron every 10 minutes from 4:30 PM IST (11:00 UTC)
 
 Endpoint: GET /api/collect
+
+Each call collects a bounded slice of workspaces so it fits inside the
+serverless execution limit, saves a cursor, and (unless chain=0) triggers
+the next slice itself until the run is done. The first cron call of the
+day starts the run; later ones resume the saved cursor if the self-chain
+broke and do nothing once the run is done.
+
+Query params:
+    cursor: Index of the first workspace to collect (default: resume saved cursor)
+    batch: Workspaces per call (default: COLLECT_CHUNK_WORKSPACES)
+    chain: "0" to disable self-chaining (default: "1")
 """
 import sys
 import os
 import json
+import requests
 from http.server import BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
 
 # Add parent directory to path so we can import our modules
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from supabase_data_collector import collect_and_store
+from api_client import Deadline
+from supabase_data_collector import (
+    collect_chunk, COLLECT_CHUNK_WORKSPACES,
+    COLLECT_CHUNK_DEADLINE_SECONDS, COLLECT_CHUNK_WRITE_RESERVE
+)
+
+# Seconds to wait for the chained call to be accepted (it keeps running after we disconnect)
+CHAIN_TIMEOUT = 3
+
+
+def _trigger_next_chunk(host: str, next_cursor: int, batch: int) -> bool:
+    """Fire-and-forget GET for the next slice of the run"""
+    url = f"https://{host}/api/collect?cursor={next_cursor}&batch={batch}"
+    try:
+        requests.get(url, timeout=CHAIN_TIMEOUT)
+    except requests.exceptions.Timeout:
+        # Expected - the next invocation is still running
+        pass
+    except requests.exceptions.RequestException as e:
+        print(f"Failed to chain next chunk (cursor={next_cursor}): {e}")
+        return False
+    return True
 
 
 class handler(BaseHTTPRequestHandler):
     def do_GET(self):
-        """Handle GET request - run data collection"""
+        """Handle GET request - run one slice of data collection"""
         try:
-            # Run the data collection
-            result = collect_and_store()
+            query = parse_qs(urlparse(self.path).query)
+            cursor = int(query["cursor"][0]) if "cursor" in query else None
+            batch = int(query.get("batch", [COLLECT_CHUNK_WORKSPACES])[0])
+            chain = query.get("chain", ["1"])[0] != "0"
+
+            # Run the data collection for this slice within the function time limit
+            deadline = Deadline(COLLECT_CHUNK_DEADLINE_SECONDS, write_reserve=COLLECT_CHUNK_WRITE_RESERVE)
+            result = collect_chunk(cursor=cursor, max_workspaces=batch, deadline=deadline)
+
+            chained = False
+            host = self.headers.get("Host")
+            # Don't chain a slice that made no progress (it would loop forever)
+            progressed = result["next_cursor"] != result["cursor"]
+            if chain and not result["done"] and progressed and host:
+                chained = _trigger_next_chunk(host, result["next_cursor"], batch)
 
-            # Return success response
+            # Return progress response
             self.send_response(200)
             self.send_header('Content-type', 'application/json')
             self.end_headers()
             self.wfile.write(json.dumps({
                 'status': 'success',
-                'message': 'Data collection completed',
+                'message': 'Data collection completed' if result["done"] else 'Data collection in progress',
+                'progress': f"{result['next_cursor'] if result['next_cursor'] is not None else result['total_workspaces']}/{result['total_workspaces']}",
+                'next_cursor': result["next_cursor"],
+                'chained': chained,
                 'result': result
             }).encode())
 
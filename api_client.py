@@ -12,14 +12,74 @@ from config import BASE_URL, WORKSPACES
 # Retry configuration
 MAX_RETRIES = 3
 RETRY_DELAY_BASE = 2  # seconds, doubles each retry
+REQUEST_TIMEOUT = 60  # seconds, per request when no deadline is near
+
+# Deadline configuration
+DEADLINE_MIN_TIMEOUT = 5  # seconds; don't start a request with less time than this
+DEADLINE_WRITE_RESERVE = 120  # seconds kept free at the end of a run for Supabase upserts
+
+
+class NotCollected(Exception):
+    """Raised (only when a Deadline is set) when a request's data could not be fetched"""
+
+
+class DeadlineExceeded(NotCollected):
+    """Raised when the run deadline leaves no time for another API request"""
+
+
+class RetriesExhausted(NotCollected):
+    """Raised when a request still times out or gets 5xx after MAX_RETRIES attempts"""
+
+
+class Deadline:
+    """
+    Run-wide time budget shared by every API client in a collection run
+
+    API requests stop DEADLINE_WRITE_RESERVE seconds before the deadline so
+    the upserts for data already fetched can finish.
+    """
+
+    def __init__(self, seconds: float, write_reserve: float = DEADLINE_WRITE_RESERVE):
+        self.expires_at = time.monotonic() + seconds
+        self.write_reserve = write_reserve
+
+    def remaining(self) -> float:
+        """Seconds left until the hard deadline"""
+        return self.expires_at - time.monotonic()
+
+    def expired(self) -> bool:
+        """True once the hard deadline has passed"""
+        return self.remaining() <= 0
+
+    def fetch_remaining(self) -> float:
+        """Seconds left for API requests (excludes the write reserve)"""
+        return self.remaining() - self.write_reserve
+
+    def request_timeout(self, default: float = REQUEST_TIMEOUT) -> float:
+        """Per-request timeout shrunk to fit the budget; raises DeadlineExceeded if none is left"""
+        available = self.fetch_remaining()
+        if available < DEADLINE_MIN_TIMEOUT:
+            raise DeadlineExceeded(f"{max(available, 0):.0f}s left for API requests")
+        return min(default, available)
+
+    def can_retry(self, delay: float) -> bool:
+        """Whether sleeping delay seconds still leaves room for another request"""
+        return self.fetch_remaining() - delay >= DEADLINE_MIN_TIMEOUT
+
+
+def _is_server_error(error: requests.exceptions.RequestException) -> bool:
+    """Whether a failed request got a 5xx response"""
+    status_code = getattr(error.response, "status_code", None)
+    return status_code is not None and 500 <= status_code < 600
 
 
 class RevGenLabsAPI:
     """API client for RevGenLabs email platform"""
     
-    def __init__(self, workspace_name: str, token: str):
+    def __init__(self, workspace_name: str, token: str, deadline: Optional[Deadline] = None):
         self.workspace_name = workspace_name
         self.token = token
+        self.deadline = deadline
         self.base_url = BASE_URL
         self.headers = {
             "Authorization": f"Bearer {token}",
@@ -28,30 +88,47 @@ class RevGenLabsAPI:
         }
     
     def _get(self, endpoint: str, params: Optional[dict] = None) -> dict:
-        """Make GET request to API with retry logic"""
+        """
+        Make GET request to API with retry logic
+
+        With a deadline, the timeout shrinks to the remaining budget, retries are
+        skipped when they no longer fit, and DeadlineExceeded (budget gone) or
+        RetriesExhausted (timeouts / 5xx on every attempt) is raised instead of
+        returning empty data so callers can tell "no data" from "not collected".
+        """
         url = f"{self.base_url}{endpoint}"
 
         for attempt in range(MAX_RETRIES):
+            timeout = self.deadline.request_timeout() if self.deadline else REQUEST_TIMEOUT
             try:
-                response = requests.get(url, headers=self.headers, params=params, timeout=60)
+                response = requests.get(url, headers=self.headers, params=params, timeout=timeout)
                 response.raise_for_status()
                 return response.json()
             except requests.exceptions.Timeout as e:
+                delay = RETRY_DELAY_BASE * (2 ** attempt)
                 if attempt < MAX_RETRIES - 1:
-                    delay = RETRY_DELAY_BASE * (2 ** attempt)
+                    if self.deadline and not self.deadline.can_retry(delay):
+                        raise DeadlineExceeded(f"timeout on {endpoint} with no time left to retry") from e
                     print(f"[{self.workspace_name}] Timeout on {endpoint}, retry {attempt + 1}/{MAX_RETRIES} in {delay}s...")
                     time.sleep(delay)
                 else:
                     print(f"[{self.workspace_name}] API timeout on {endpoint} after {MAX_RETRIES} retries: {e}")
+                    if self.deadline:
+                        raise RetriesExhausted(f"timeout on {endpoint} after {MAX_RETRIES} attempts") from e
                     return {"data": []}
             except requests.exceptions.RequestException as e:
-                if attempt < MAX_RETRIES - 1 and "5" in str(getattr(e.response, 'status_code', '')):
+                delay = RETRY_DELAY_BASE * (2 ** attempt)
+                server_error = _is_server_error(e)
+                if attempt < MAX_RETRIES - 1 and server_error:
+                    if self.deadline and not self.deadline.can_retry(delay):
+                        raise DeadlineExceeded(f"server error on {endpoint} with no time left to retry") from e
                     # Retry on 5xx errors
-                    delay = RETRY_DELAY_BASE * (2 ** attempt)
                     print(f"[{self.workspace_name}] Server error, retry {attempt + 1}/{MAX_RETRIES} in {delay}s...")
                     time.sleep(delay)
                 else:
                     print(f"[{self.workspace_name}] API error on {endpoint}: {e}")
+                    if self.deadline and server_error:
+                        raise RetriesExhausted(f"server error on {endpoint} after {MAX_RETRIES} attempts") from e
                     return {"data": []}
 
         return {"data": []}
@@ -265,13 +342,16 @@ class RevGenLabsAPI:
         return result
 
 
-def get_all_workspace_clients() -> dict[str, RevGenLabsAPI]:
+def get_all_workspace_clients(deadline: Optional[Deadline] = None) -> dict[str, RevGenLabsAPI]:
     """
     Create API clients for all configured workspaces.
 
     Tries to fetch from Supabase workspaces table first (dynamic).
     Falls back to config.py WORKSPACES dict if Supabase fails.
 
+    Args:
+        deadline: Optional run-wide Deadline shared by all clients
+
     Returns dict of workspace_name -> API client
     """
     # Try Supabase first for dynamic workspace management
@@ -279,7 +359,7 @@ def get_all_workspace_clients() -> dict[str, RevGenLabsAPI]:
     if supabase_workspaces:
         clients = {}
         for name, token in supabase_workspaces.items():
-            clients[name] = RevGenLabsAPI(name, token)
+            clients[name] = RevGenLabsAPI(name, token, deadline)
         print(f"[Workspaces] Loaded {len(clients)} active workspaces from Supabase")
         return clients
 
@@ -287,7 +367,7 @@ def get_all_workspace_clients() -> dict[str, RevGenLabsAPI]:
     print("[Workspaces] Supabase unavailable, falling back to config.py")
     clients = {}
     for name, token in WORKSPACES.items():
-        clients[name] = RevGenLabsAPI(name, token)
+        clients[name] = RevGenLabsAPI(name, token, deadline)
     return clients
 
 
@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+RGL Infra Tracking - Collection Pipeline
+One API pass feeding every output: Supabase tables, static/data.json, local files
+
+The inventory (mailboxes + warmup) is fetched once, and each workspace/infra
+group's daily stats are fetched once for the widest window. The Supabase
+rows (30-day snapshot) and every dashboard period are summed from those same
+daily stats, so the two outputs cannot drift apart.
+
+The dashboard sink is incremental: per-workspace partials are cached in
+.partials/ under a content hash and only changed workspaces are recomputed.
+data.json is published with a temp file + atomic rename, then sharded by
+period and client under static/data/<version>/ with a manifest
+(static/data/manifest.json), then a version stamp (static/data.version.json)
+the server can poll.
+
+    python3 collection_pipeline.py                            # supabase + dashboard
+    python3 collection_pipeline.py --sinks dashboard          # data.json only
+    python3 collection_pipeline.py --sinks files --out runs/  # raw collection to disk
+"""
+
+import os
+import re
+import json
+import shutil
+import hashlib
+import tempfile
+from datetime import datetime
+
+from config import TIME_PERIODS, TRACKED_INFRA_TYPES
+from api_client import get_all_workspace_clients, Deadline
+from allocation import METRICS
+from analyzer import (
+    ANALYSIS_PERIODS, build_all_periods, get_date_range, index_mailboxes, sum_daily_stats,
+)
+from supabase_data_collector import (
+    fetch_all_mailboxes_with_details, fetch_daily_stats_for_mailboxes,
+    collected_mailboxes, store_collection, run_result, bump_data_generation,
+)
+from workspace_partials import workspace_hash, workspace_partial, merge_partials
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_JSON_PATH = os.path.join(BASE_DIR, "static", "data.json")
+
+# Per-period / per-client shards of data.json; older versions beyond this are pruned
+SHARDS_DIR = os.path.join(BASE_DIR, "static", "data")
+SHARD_VERSIONS_KEPT = 2
+
+# Cached per-workspace partial results (one JSON file per workspace)
+PARTIALS_DIR = os.path.join(BASE_DIR, ".partials")
+
+# Window of the daily_infra_stats / daily_domain_stats snapshot rows (as collect_and_store)
+SNAPSHOT_STATS_DAYS = 30
+
+DEFAULT_SINKS = ["supabase", "dashboard"]
+
+
+def collect(deadline: Deadline = None) -> dict:
+    """
+    Fetch inventory and daily stats once for every sink
+
+    Returns:
+        {
+            "mailboxes": MailboxStore of every mapped infra type (collected groups only),
+            "warmup_data": {workspace: [warmup_info, ...]},
+            "clients": {workspace: client},
+            "daily_stats": {workspace: {infra_type: {date: {sent, replied, bounced, interested}}}},
+            "days": days of daily stats fetched,
+            "status": run_result (complete / partial + not_collected),
+        }
+    """
+    print("=" * 80)
+    print("RGL Infra Collection Pipeline")
+    print(f"Started at: {datetime.now().isoformat()}")
+    print("=" * 80)
+
+    clients = get_all_workspace_clients(deadline)
+    skipped_workspaces, skipped_groups = [], []
+    warmup_data = {}
+
+    mailboxes = fetch_all_mailboxes_with_details(clients, not_collected=skipped_workspaces,
+                                                 warmup_data=warmup_data)
+    print(f"\nTotal mailboxes: {len(mailboxes)}")
+
+    days = max([SNAPSHOT_STATS_DAYS] + [TIME_PERIODS.get(period, 30) for period in ANALYSIS_PERIODS])
+    daily_stats = fetch_daily_stats_for_mailboxes(mailboxes, days=days, clients=clients,
+                                                  not_collected=skipped_groups)
+    if skipped_groups:
+        mailboxes = collected_mailboxes(mailboxes, daily_stats)
+
+    return {
+        "mailboxes": mailboxes,
+        "warmup_data": warmup_data,
+        "clients": clients,
+        "daily_stats": daily_stats,
+        "days": days,
+        "status": run_result(skipped_workspaces, skipped_groups),
+    }
+
+
+def group_daily_stats(daily_stats: dict, groups: dict) -> dict:
+    """
+    Daily stats as {(workspace, infra_type): {date: [sent, replied, bounced, interested]}}
+
+    Only groups in groups ({workspace: {infra_type: ...}}) that were fetched
+    are kept, in groups order.
+    """
+    daily = {}
+    for workspace_name, infra_groups in groups.items():
+        for infra_type in infra_groups:
+            date_stats = daily_stats.get(workspace_name, {}).get(infra_type)
+            if date_stats is None:
+                continue
+            daily[(workspace_name, infra_type)] = {
+                date: [stats.get(metric, 0) for metric in METRICS]
+                for date, stats in date_stats.items()
+            }
+    return daily
+
+
+# ----------------------------------------------------------------------
+# Sinks: each takes the collect() result
+# ----------------------------------------------------------------------
+
+def to_supabase(collection: dict, **_) -> dict:
+    """Store mailbox_snapshots, daily_infra_stats and daily_domain_stats (as collect_and_store)"""
+    mailboxes = collection["mailboxes"]
+    groups = mailboxes.nested("workspace_name", "infra_type")
+    start_date, end_date, _ = get_date_range(f"{SNAPSHOT_STATS_DAYS}d")
+    daily = group_daily_stats(collection["daily_stats"], groups)
+    group_results, _ = sum_daily_stats(daily, start_date, end_date)
+
+    stats_by_workspace_infra = {}
+    for (workspace_name, infra_type), totals in group_results.items():
+        stats = dict(zip(METRICS, totals))
+        stats["mailbox_count"] = len(groups[workspace_name][infra_type])
+        stats_by_workspace_infra.setdefault(workspace_name, {})[infra_type] = stats
+
+    infra_stats, domain_stats = store_collection(mailboxes, stats_by_workspace_infra)
+    bump_data_generation("pipeline")
+    return {"infra_stats": len(infra_stats), "domain_stats": len(domain_stats)}
+
+
+def build_periods_incremental(mailbox_data: dict, daily: dict, windows: dict,
+                              partials_dir: str = PARTIALS_DIR) -> tuple[dict, dict]:
+    """
+    Period outputs from per-workspace partials, recomputing only changed workspaces
+
+    A workspace's cached partial is reused when the content hash of its
+    mailboxes, warmup list and per-period group totals is unchanged (see
+    workspace_partials for when that happens). Partials of workspaces that
+    are gone are deleted.
+
+    Returns ({period: summarize_groups structure}, {workspace: content hash})
+    """
+    os.makedirs(partials_dir, exist_ok=True)
+    partials, hashes, files = [], {}, set()
+    reused = 0
+
+    for workspace_name, infra_groups in mailbox_data["by_workspace_infra"].items():
+        warmup_list = mailbox_data["warmup_data"].get(workspace_name, [])
+        content_hash = workspace_hash(workspace_name, infra_groups, warmup_list, daily, windows)
+        file_name = hashlib.sha1(workspace_name.encode()).hexdigest()[:16] + ".json"
+        path = os.path.join(partials_dir, file_name)
+
+        partial = None
+        if os.path.exists(path):
+            try:
+                with open(path) as f:
+                    partial = json.load(f)
+            except (OSError, ValueError):
+                partial = None
+        if partial and partial.get("hash") == content_hash:
+            reused += 1
+        else:
+            partial = workspace_partial(workspace_name, infra_groups, warmup_list, daily, windows)
+            partial["hash"] = content_hash
+            write_json_atomic(partial, path)
+
+        partials.append(partial)
+        hashes[workspace_name] = content_hash
+        files.add(file_name)
+
+    for file_name in os.listdir(partials_dir):
+        if file_name.endswith(".json") and file_name not in files:
+            os.remove(os.path.join(partials_dir, file_name))
+
+    print(f"Workspace partials: {reused} reused, {len(partials) - reused} recomputed")
+    return merge_partials(partials, windows), hashes
+
+
+def analyze_collection(collection: dict, partials_dir: str = PARTIALS_DIR) -> tuple[dict, dict]:
+    """
+    static/data.json structure (every period plus projections) from a collection
+
+    Returns (results, {workspace: content hash})
+    """
+    tracked = collection["mailboxes"].filter(lambda mb: mb.infra_type in TRACKED_INFRA_TYPES)
+    mailbox_data = index_mailboxes(tracked, collection["warmup_data"], collection["clients"])
+    daily = group_daily_stats(collection["daily_stats"], mailbox_data["by_workspace_infra"])
+
+    windows = {period: get_date_range(period) for period in ANALYSIS_PERIODS}
+    period_stats, hashes = build_periods_incremental(mailbox_data, daily, windows, partials_dir)
+
+    def analyze(period: str) -> dict:
+        start_date, end_date, num_days = windows[period]
+        results = period_stats[period]
+        results["meta"] = {
+            "period": period,
+            "days": num_days,
+            "start_date": start_date,
+            "end_date": end_date,
+            "generated_at": datetime.now().isoformat(),
+        }
+        return results
+
+    return build_all_periods(mailbox_data, analyze), hashes
+
+
+def write_json_atomic(data, path: str, **dump_options) -> bytes:
+    """
+    Write JSON via a temp file in the same folder and an atomic rename
+
+    Readers see either the old file or the complete new one, never a partial write.
+    Returns the bytes written.
+    """
+    encoded = json.dumps(data, default=str, **dump_options).encode()
+    folder = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=folder, prefix=".tmp-", suffix=".json")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(encoded)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return encoded
+
+
+def version_path(path: str = DATA_JSON_PATH) -> str:
+    """Version stamp next to a data file (static/data.json -> static/data.version.json)"""
+    return os.path.splitext(path)[0] + ".version.json"
+
+
+def shard_name(name: str) -> str:
+    """File-safe, collision-free name for a client shard"""
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", name).strip("-")[:40] or "client"
+    return f"{slug}-{hashlib.sha1(name.encode()).hexdigest()[:8]}"
+
+
+def write_shards(results: dict, version: str, shards_dir: str = SHARDS_DIR) -> dict:
+    """
+    Split the dashboard data into small files the server can load one at a time
+
+    Each period is written without by_client ({version}/{period}.json), each
+    client of a period separately ({version}/{period}/{client}.json) and every
+    other section (projections, warmup_ramp) on its own. The manifest is
+    replaced last, so it only ever points at complete shards; older version
+    folders beyond SHARD_VERSIONS_KEPT are removed (a server snapshot still
+    on a removed version reads its unread shards from the current one).
+
+    Returns the manifest
+    """
+    manifest = {"version": version, "generated_at": datetime.now().isoformat(),
+                "order": list(results), "periods": {}, "sections": {}}
+
+    def write(relative: str, data) -> str:
+        path = os.path.join(shards_dir, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_json_atomic(data, path)
+        return relative
+
+    for name, section in results.items():
+        if name not in TIME_PERIODS:
+            manifest["sections"][name] = write(f"{version}/{name}.json", section)
+            continue
+        period = {key: value for key, value in section.items() if key != "by_client"}
+        manifest["periods"][name] = {
+            "file": write(f"{version}/{name}.json", period),
+            "keys": list(section),
+            "clients": {client: write(f"{version}/{name}/{shard_name(client)}.json", stats)
+                        for client, stats in section.get("by_client", {}).items()},
+        }
+    write_json_atomic(manifest, os.path.join(shards_dir, "manifest.json"), indent=2)
+
+    folders = [entry for entry in os.scandir(shards_dir) if entry.is_dir() and entry.name != version]
+    folders.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    for entry in folders[SHARD_VERSIONS_KEPT - 1:]:
+        shutil.rmtree(entry.path, ignore_errors=True)
+    return manifest
+
+
+def write_data_json(results: dict, path: str = DATA_JSON_PATH, workspace_hashes: dict = None,
+                    shards_dir: str = None) -> str:
+    """
+    Publish the dashboard data file atomically, its shards, then its version stamp
+
+    The stamp ({version, generated_at, workspaces}) is replaced after the data
+    and shards, so a reader that sees a new version always finds the matching
+    data. Shards go to shards_dir (default: a "data" folder next to path).
+    Returns the path
+    """
+    encoded = write_json_atomic(results, path, indent=2)
+    version = hashlib.sha256(encoded).hexdigest()[:16]
+    write_shards(results, version, shards_dir or os.path.join(os.path.dirname(os.path.abspath(path)), "data"))
+    write_json_atomic({
+        "version": version,
+        "generated_at": datetime.now().isoformat(),
+        "workspaces": workspace_hashes or {},
+    }, version_path(path), indent=2)
+    return path
+
+
+def to_dashboard(collection: dict, path: str = DATA_JSON_PATH, partials_dir: str = PARTIALS_DIR,
+                 **_) -> dict:
+    """Analyze every period (reusing unchanged workspace partials) and publish static/data.json"""
+    results, hashes = analyze_collection(collection, partials_dir)
+    write_data_json(results, path, workspace_hashes=hashes)
+    print(f"\n✓ Dashboard data saved to {path}")
+    return {"path": path, "results": results}
+
+
+def to_local_files(collection: dict, out_dir: str = "collections", **_) -> dict:
+    """Write the raw collection (snapshot rows + daily stats) to a dated folder"""
+    run_dir = os.path.join(out_dir, datetime.now().strftime("%Y-%m-%d_%H%M%S"))
+    os.makedirs(run_dir, exist_ok=True)
+
+    snapshots = [mb.snapshot_row() for mb in collection["mailboxes"]]
+    with open(os.path.join(run_dir, "mailbox_snapshots.json"), "w") as f:
+        json.dump(snapshots, f, indent=2, default=str)
+    with open(os.path.join(run_dir, "daily_stats.json"), "w") as f:
+        json.dump({"days": collection["days"], "status": collection["status"],
+                   "daily_stats": collection["daily_stats"]}, f, indent=2, default=str)
+
+    print(f"\n✓ Collection saved to {run_dir}")
+    return {"path": run_dir}
+
+
+SINKS = {
+    "supabase": to_supabase,
+    "dashboard": to_dashboard,
+    "files": to_local_files,
+}
+
+
+def run_pipeline(sinks: list = None, deadline: Deadline = None, **sink_options) -> dict:
+    """
+    Collect once and feed each sink
+
+    Args:
+        sinks: Names from SINKS (default: DEFAULT_SINKS)
+        deadline: Optional run-wide Deadline for the API pass
+        sink_options: Passed to every sink (e.g. path= for dashboard, out_dir= for files)
+
+    Returns {"status": ..., "not_collected": ..., sink name: sink result}
+    """
+    sinks = sinks or DEFAULT_SINKS
+    unknown = [name for name in sinks if name not in SINKS]
+    if unknown:
+        raise ValueError(f"Unknown sink(s): {', '.join(unknown)} (choose from {', '.join(SINKS)})")
+
+    collection = collect(deadline)
+    summary = dict(collection["status"])
+    for name in sinks:
+        print("\n" + "-" * 40)
+        print(f"Sink: {name}")
+        summary[name] = SINKS[name](collection, **sink_options)
+
+    print("\n" + "=" * 80)
+    print("Pipeline Complete!")
+    print(f"  Mailboxes: {len(collection['mailboxes'])}")
+    if summary["status"] == "partial":
+        print(f"  PARTIAL - not collected: {summary['not_collected']}")
+    print(f"Finished at: {datetime.now().isoformat()}")
+    print("=" * 80)
+    return summary
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Collect once, write every output")
+    parser.add_argument("--sinks", default=",".join(DEFAULT_SINKS),
+                        help=f"Comma-separated outputs: {', '.join(SINKS)}")
+    parser.add_argument("--out", default="collections", help="Folder for the files sink")
+    args = parser.parse_args()
+
+    deadline_minutes = os.environ.get("COLLECTOR_DEADLINE_MINUTES")
+    run_deadline = Deadline(float(deadline_minutes) * 60) if deadline_minutes else None
+
+    run_pipeline(args.sinks.split(","), deadline=run_deadline, out_dir=args.out)
@@ -0,0 +1,36 @@
+-- RGL Infra Dashboard - Collector Runs Table
+-- Run this in Supabase SQL Editor (https://supabase.com/dashboard/project/fxxjfgfnrywffjmxoadl/sql)
+
+-- Table: collector_runs (Cursor + progress for chunked /api/collect runs)
+-- One row per run date; cursor is the index of the next workspace in workspace_order
+-- (workspace names sorted at the start of the run, fixed for the whole run)
+CREATE TABLE IF NOT EXISTS collector_runs (
+    run_date DATE PRIMARY KEY,
+    cursor INTEGER DEFAULT 0,
+    workspace_order JSONB DEFAULT '[]'::jsonb,
+    total_workspaces INTEGER DEFAULT 0,
+    status VARCHAR(20) DEFAULT 'running',  -- running | done
+
+    -- Cumulative records written across all chunks of the run
+    mailboxes INTEGER DEFAULT 0,
+    infra_stats INTEGER DEFAULT 0,
+    domain_stats INTEGER DEFAULT 0,
+
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    finished_at TIMESTAMPTZ
+);
+
+-- Existing tables (created before workspace_order was added)
+ALTER TABLE collector_runs ADD COLUMN IF NOT EXISTS workspace_order JSONB DEFAULT '[]'::jsonb;
+
+-- Table: data_generations (Last write by jobs without a collector_runs row)
+-- The backfill and the pipeline's Supabase sink bump their row after storing;
+-- the server drops its query caches when the latest row changes
+CREATE TABLE IF NOT EXISTS data_generations (
+    source VARCHAR(50) PRIMARY KEY,  -- backfill | pipeline | weekly_alerts
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Verify
+SELECT * FROM collector_runs ORDER BY run_date DESC LIMIT 5;
+SELECT * FROM data_generations ORDER BY updated_at DESC;
@@ -0,0 +1,225 @@
+"""
+RGL Infra Tracking - Domain Health
+Per-domain health from mailbox_snapshots, scored and paged on the server
+
+Mailbox rows are grouped by domain + workspace (all-time cumulative
+stats, as the dashboard's Domains tab), scored with the bounce / reply
+thresholds below and cached until the query layer is invalidated. A
+request then only filters and takes the top rows it needs:
+
+    page = query_domains(sort="bounce_rate", client="Reev", min_sends=2000, limit=50)
+    page["domains"]       # up to 50 rows, worst bounce first
+    page["next_cursor"]   # pass back as cursor= for the next 50, None on the last page
+"""
+
+import base64
+import heapq
+import json
+from datetime import datetime, timezone
+
+import query_layer
+from query_cache import TTLCache
+
+# Below this many sends a domain is "insufficient" rather than scored
+DOMAIN_MIN_SENDS = 2000
+DOMAIN_PAGE_SIZE = 50
+DOMAIN_PAGE_MAX = 1000
+
+# (limit %, status, action) checked worst first; first match per metric wins
+BOUNCE_THRESHOLDS = [
+    (10, "burned", "Retire domain"),
+    (4, "danger", "Stop sends, scrub"),
+    (2, "warning", "Scrub list, reduce volume"),
+]
+REPLY_THRESHOLDS = [
+    (0.3, "burned", "Pull infra, likely blocked"),
+    (0.8, "danger", "Audit sequence & targeting"),
+    (1.5, "warning", "Monitor closely"),
+]
+STATUS_PRIORITY = {"burned": 4, "danger": 3, "warning": 2, "healthy": 1, "insufficient": 0}
+DOMAIN_STATUSES = ["burned", "danger", "warning", "healthy", "insufficient"]
+
+# Sortable fields; "desc" puts the largest value first
+DOMAIN_SORT_FIELDS = ["bounce_rate", "reply_rate", "positive_rate", "emails_sent",
+                      "bounces", "replies", "mailbox_count"]
+
+_domain_cache = query_layer.register_cache(TTLCache(max_entries=4, ttl=query_layer.QUERY_CACHE_TTL))
+
+
+def aggregate_domains(rows: list, now: datetime = None) -> list:
+    """
+    Group mailbox_snapshots rows by domain + workspace
+
+    Rows without a domain are skipped; infra_type and tld come from the
+    first mailbox seen, age from the oldest created_at.
+    """
+    now = now or datetime.now(timezone.utc)
+    domains = {}
+    for row in rows:
+        domain = row.get("domain")
+        if not domain:
+            continue
+        key = (domain, row.get("workspace_name"))
+        entry = domains.get(key)
+        if entry is None:
+            entry = domains[key] = {
+                "domain": domain,
+                "client": row.get("workspace_name"),
+                "infra_type": row.get("infra_type"),
+                "tld": row.get("tld"),
+                "mailbox_count": 0,
+                "emails_sent": 0,
+                "replies": 0,
+                "bounces": 0,
+                "interested": 0,
+                "oldest_created_at": None,
+            }
+        entry["mailbox_count"] += 1
+        entry["emails_sent"] += row.get("emails_sent") or 0
+        entry["replies"] += row.get("replies") or 0
+        entry["bounces"] += row.get("bounces") or 0
+        entry["interested"] += row.get("interested") or 0
+        created = row.get("created_at")
+        if created and (entry["oldest_created_at"] is None or created < entry["oldest_created_at"]):
+            entry["oldest_created_at"] = created
+
+    result = []
+    for entry in domains.values():
+        sent = entry["emails_sent"]
+        entry["reply_rate"] = entry["replies"] / sent * 100 if sent > 0 else 0
+        entry["bounce_rate"] = entry["bounces"] / sent * 100 if sent > 0 else 0
+        entry["positive_rate"] = entry["interested"] / sent * 100 if sent > 0 else 0
+        entry["oldest_mailbox_date"] = entry["oldest_created_at"]
+        entry["age_days"] = _age_days(entry["oldest_created_at"], now)
+        result.append(entry)
+    return result
+
+
+def _age_days(created_at: str, now: datetime):
+    if not created_at:
+        return None
+    try:
+        created = datetime.fromisoformat(str(created_at).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if created.tzinfo is None:
+        created = created.replace(tzinfo=timezone.utc)
+    return (now - created).days
+
+
+def score_domains(domains: list, min_sends: int = DOMAIN_MIN_SENDS) -> list:
+    """Set status and burn_reason on each domain (in place, as the dashboard's scoreDomainHealth)"""
+    for d in domains:
+        if d["emails_sent"] < min_sends:
+            d["status"] = "insufficient"
+            d["burn_reason"] = f"Low volume (<{min_sends} sent)"
+            continue
+
+        status = "healthy"
+        reasons = []
+        for limit, level, action in BOUNCE_THRESHOLDS:
+            if d["bounce_rate"] > limit:
+                status = _worst(status, level)
+                reasons.append(f"{action} (bounce {d['bounce_rate']:.1f}%)")
+                break
+        for limit, level, action in REPLY_THRESHOLDS:
+            if d["reply_rate"] < limit:
+                status = _worst(status, level)
+                reasons.append(f"{action} (reply {d['reply_rate']:.2f}%)")
+                break
+        d["status"] = status
+        d["burn_reason"] = ", ".join(reasons) or "Healthy"
+    return domains
+
+
+def _worst(a: str, b: str) -> str:
+    return a if STATUS_PRIORITY[a] >= STATUS_PRIORITY[b] else b
+
+
+def scored_domains() -> list:
+    """Every domain, aggregated and scored (cached until the query layer is invalidated)"""
+    query_layer.check_generation()
+    return _domain_cache.get_or_compute(
+        ("domains",), lambda: score_domains(aggregate_domains(query_layer.mailbox_snapshots())))
+
+
+def encode_cursor(key: tuple) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """Sort key of the last row of the previous page; ValueError if malformed"""
+    try:
+        value, domain, client = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return (float(value), str(domain), str(client))
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def query_domains(sort: str = "bounce_rate", order: str = "desc", client: list = None,
+                  infra: list = None, tld: list = None, status: list = None,
+                  min_sends: int = 0, limit: int = DOMAIN_PAGE_SIZE, cursor: str = None,
+                  domains: list = None) -> dict:
+    """
+    One page of domains, filtered and sorted
+
+    Args:
+        sort: One of DOMAIN_SORT_FIELDS
+        order: "desc" (largest first) or "asc"
+        client, infra, tld, status: Keep only these values (None = all)
+        min_sends: Minimum emails_sent
+        limit: Page size, 1-DOMAIN_PAGE_MAX
+        cursor: next_cursor of the previous page
+        domains: Scored domains to page (default: scored_domains())
+
+    Returns:
+        {"domains": [...], "next_cursor": str or None, "total": rows matching the filters,
+         "summary": {"total", <status>: count} over the filters except status,
+         "filters": {"clients", "infra_types", "tlds"} available values}
+
+    Raises ValueError for unknown sort fields, bad limits or cursors
+    """
+    if sort not in DOMAIN_SORT_FIELDS:
+        raise ValueError(f"sort must be one of: {', '.join(DOMAIN_SORT_FIELDS)}")
+    if order not in ("asc", "desc"):
+        raise ValueError("order must be asc or desc")
+    if not 1 <= limit <= DOMAIN_PAGE_MAX:
+        raise ValueError(f"limit must be between 1 and {DOMAIN_PAGE_MAX}")
+    after = decode_cursor(cursor) if cursor else None
+    domains = scored_domains() if domains is None else domains
+
+    sign = -1 if order == "desc" else 1
+
+    def sort_key(d: dict) -> tuple:
+        # Domain and client break ties so every row has a unique position
+        return (sign * (d[sort] or 0), d["domain"] or "", d["client"] or "")
+
+    def keep(d: dict) -> bool:
+        return ((client is None or d["client"] in client) and
+                (infra is None or d["infra_type"] in infra) and
+                (tld is None or d["tld"] in tld) and
+                d["emails_sent"] >= min_sends)
+
+    matching = [d for d in domains if keep(d)]
+    summary = {"total": len(matching), **{s: 0 for s in DOMAIN_STATUSES}}
+    for d in matching:
+        summary[d["status"]] += 1
+    if status is not None:
+        matching = [d for d in matching if d["status"] in status]
+
+    candidates = matching if after is None else (d for d in matching if sort_key(d) > after)
+    page = heapq.nsmallest(limit + 1, candidates, key=sort_key)
+    has_more = len(page) > limit
+    page = page[:limit]
+
+    return {
+        "domains": [dict(d) for d in page],
+        "next_cursor": encode_cursor(sort_key(page[-1])) if has_more else None,
+        "total": len(matching),
+        "summary": summary,
+        "filters": {
+            "clients": sorted({d["client"] for d in domains if d["client"]}),
+            "infra_types": sorted({d["infra_type"] for d in domains if d["infra_type"]}),
+            "tlds": sorted({d["tld"] for d in domains if d["tld"]}),
+        },
+    }
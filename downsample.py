@@ -0,0 +1,73 @@
+"""
+RGL Infra Tracking - Downsampling
+Shape-preserving point selection for long time series
+
+Both methods return the indices of the points to keep (ascending, first
+and last always included), so every metric of a series can be sampled at
+the same x positions:
+
+    keep = lttb(x, bounce_rate, 200)     # Largest-Triangle-Three-Buckets
+    keep = min_max(bounce_rate, 200)     # min and max of each window (keeps spikes)
+"""
+
+import numpy as np
+
+DOWNSAMPLE_METHODS = ("lttb", "minmax")
+MIN_POINTS = 3
+
+
+def lttb(x, y, points: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: per bucket, the point forming the
+    largest triangle with the previous kept point and the next bucket's mean
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    points = max(points, MIN_POINTS)
+    if n <= points:
+        return np.arange(n)
+
+    # Inner points split into points - 2 buckets; first and last kept as is
+    edges = np.linspace(1, n - 1, points - 1).astype(np.int64)
+    keep = np.empty(points, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for b in range(points - 2):
+        lo, hi = edges[b], edges[b + 1]
+        if b + 2 < len(edges):
+            next_lo, next_hi = edges[b + 1], edges[b + 2]
+        else:
+            next_lo, next_hi = n - 1, n
+        avg_x, avg_y = x[next_lo:next_hi].mean(), y[next_lo:next_hi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(area.argmax())
+        keep[b + 1] = a
+    return keep
+
+
+def min_max(y, points: int) -> np.ndarray:
+    """Smallest and largest point of each of points // 2 windows, plus the first and last point"""
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    points = max(points, MIN_POINTS)
+    if n <= points:
+        return np.arange(n)
+
+    windows = max((points - 2) // 2, 1)
+    edges = np.linspace(0, n, windows + 1).astype(np.int64)
+    keep = {0, n - 1}
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        if hi > lo:
+            keep.add(lo + int(y[lo:hi].argmin()))
+            keep.add(lo + int(y[lo:hi].argmax()))
+    return np.array(sorted(keep), dtype=np.int64)
+
+
+def downsample_indices(x, y, points: int, method: str = "lttb") -> np.ndarray:
+    """Indices to keep by method; raises ValueError for unknown methods"""
+    if method == "lttb":
+        return lttb(x, y, points)
+    if method == "minmax":
+        return min_max(y, points)
+    raise ValueError(f"method must be one of: {', '.join(DOWNSAMPLE_METHODS)}")
@@ -0,0 +1,144 @@
+"""
+RGL Infra Tracking - Field Projection
+Sparse fieldsets for the analysis responses
+
+include= names whole sections, fields= picks metrics out of them. A
+metric path is applied to every entry of a keyed section (by_infra is
+infra -> metrics, by_client is client -> infra -> metrics, ...), or
+written out in full with explicit keys or "*":
+
+    projection = compile_projection("by_infra.sent,by_infra.reply_rate", "totals")
+    projection.apply(results)   # {"by_infra": {"GR": {"sent": ..., "reply_rate": ...}, ...}, "totals": {...}}
+
+    compile_projection("by_client.Reev.*.sent")    # one client, every infra, sent only
+
+Compiled projections are cached per (fields, include) string.
+"""
+
+from functools import lru_cache
+
+# Keyed levels above the metrics in each section of a period's results
+SECTION_KEY_DEPTH = {
+    "by_infra": 1,        # infra_type
+    "by_client": 2,       # client, infra_type
+    "by_workspace": 2,    # workspace, infra_type
+    "by_tld": 1,          # tld
+    "by_infra_tld": 2,    # infra_type, tld
+    "totals": 0,
+    "meta": 0,
+}
+WILDCARD = "*"
+MAX_FIELDS = 200
+
+
+class Projection:
+    """
+    Compiled field tree: {key: subtree or True (keep everything)}
+
+    Attributes:
+        key: Canonical (sorted) field list, for cache keys
+        sections: Top-level sections the projection reads
+    """
+
+    def __init__(self, tree: dict, key: tuple):
+        self.tree = tree
+        self.key = key
+        self.sections = frozenset(tree)
+
+    def apply(self, results: dict) -> dict:
+        return _project(results, self.tree)
+
+    def keys(self, section: str):
+        """Entries of section the projection names explicitly, or None if it reads all of them"""
+        subtree = self.tree.get(section)
+        if subtree is None:
+            return ()
+        if subtree is True or WILDCARD in subtree:
+            return None
+        return tuple(subtree)
+
+
+def _project(value, tree):
+    if tree is True or not isinstance(value, dict):
+        return value
+    out = {}
+    wildcard = tree.get(WILDCARD)
+    for key, item in value.items():
+        subtree = _merge(tree.get(key), wildcard)
+        if subtree is not None:
+            out[key] = _project(item, subtree)
+    return out
+
+
+def _merge(a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    if a is True or b is True:
+        return True
+    merged = dict(a)
+    for key, sub in b.items():
+        merged[key] = _merge(merged.get(key), sub)
+    return merged
+
+
+def _insert(tree: dict, path: list) -> None:
+    node = tree
+    for i, segment in enumerate(path):
+        if i == len(path) - 1:
+            node[segment] = True
+            return
+        child = node.get(segment)
+        if child is True:
+            return   # already keeping the whole subtree
+        node = node.setdefault(segment, {})
+
+
+def _split(spec: str) -> list:
+    return [part.strip() for part in (spec or "").split(",") if part.strip()]
+
+
+@lru_cache(maxsize=256)
+def compile_projection(fields: str = None, include: str = None):
+    """
+    Projection for fields= / include= query values, or None to return everything
+
+    Raises ValueError for unknown sections, paths of the wrong depth or too many fields
+    """
+    paths = []
+    for section in _split(include):
+        if section not in SECTION_KEY_DEPTH:
+            raise ValueError(f"Unknown section in include: {section}")
+        paths.append([section])
+
+    for field in _split(fields):
+        segments = field.split(".")
+        section, rest = segments[0], segments[1:]
+        if section not in SECTION_KEY_DEPTH:
+            raise ValueError(f"Unknown section in fields: {section}")
+        depth = SECTION_KEY_DEPTH[section]
+        if len(rest) == 1:
+            rest = [WILDCARD] * depth + rest
+        elif len(rest) != depth + 1:
+            raise ValueError(f"Field {field} must be {section}.<metric>"
+                             + (f" or name {depth} key(s) before the metric" if depth else ""))
+        if any(not segment for segment in rest):
+            raise ValueError(f"Empty segment in field: {field}")
+        paths.append([section] + rest)
+
+    if not paths:
+        return None
+    if len(paths) > MAX_FIELDS:
+        raise ValueError(f"Too many fields (max {MAX_FIELDS})")
+
+    tree = {}
+    # Shorter paths first, so a whole section is never narrowed by a field inside it
+    for path in sorted(paths, key=len):
+        _insert(tree, path)
+    return Projection(tree, tuple(sorted(".".join(path) for path in paths)))
+
+
+def apply_projection(projection, results: dict) -> dict:
+    """results narrowed by projection (unchanged if it is None)"""
+    return projection.apply(results) if projection is not None else results
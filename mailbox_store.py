@@ -0,0 +1,250 @@
+"""
+RGL Infra Tracking - Mailbox Store
+Compact in-memory mailbox inventory shared by the analyzer and the collector
+
+Each mailbox is one MailboxRecord (__slots__, no per-record dict) and the
+workspace, infra, domain and TLD strings are interned, so thousands of
+mailboxes on the same domain share one string. The store keeps records in
+fetch order with an external_id index, and hands out group-by views:
+lists of row numbers into the store, so the same record is never copied
+into by_infra, by_workspace_infra, by_tld, ...
+
+    store = MailboxStore()
+    store.add(MailboxRecord.from_api(mb, "Workspace", "Maldoso"))
+    store.group_by("infra_type")                       # {infra_type: view}
+    store.nested("workspace_name", "infra_type")       # {workspace: {infra_type: view}}
+"""
+
+import sys
+from array import array
+from operator import attrgetter
+
+from config import TAG_TO_INFRA
+
+
+# Record fields, in mailbox_snapshots column order (plus status, which is analyzer-only)
+SNAPSHOT_FIELDS = (
+    "email", "domain", "tld", "workspace_name", "infra_type",
+    "daily_limit", "warmup_enabled", "warmup_daily_limit",
+    "external_id", "created_at",
+    "emails_sent", "replies", "bounces", "interested",
+)
+MAILBOX_FIELDS = SNAPSHOT_FIELDS + ("status",)
+
+# Low-cardinality strings shared across records
+INTERNED_FIELDS = ("domain", "tld", "workspace_name", "infra_type")
+
+FIELD_DEFAULTS = {
+    "email": "",
+    "domain": "",
+    "tld": "",
+    "workspace_name": "",
+    "infra_type": "",
+    "daily_limit": 0,
+    "warmup_enabled": False,
+    "warmup_daily_limit": 0,
+    "external_id": None,
+    "created_at": None,
+    "emails_sent": 0,
+    "replies": 0,
+    "bounces": 0,
+    "interested": 0,
+    "status": "",
+}
+
+
+def extract_domain(email: str) -> str:
+    """Extract domain from email address"""
+    if not email or "@" not in email:
+        return ""
+    return email.split("@")[1].lower()
+
+
+def extract_tld(domain: str) -> str:
+    """Extract TLD from domain (e.g., 'example.com' -> '.com')"""
+    if not domain or "." not in domain:
+        return ""
+    return "." + domain.split(".")[-1].lower()
+
+
+def get_infra_type_from_tags(tags: list) -> str:
+    """
+    Infra type of the first mapped tag (TAG_TO_INFRA), or None
+
+    Untracked infra types are returned too; callers that only want
+    TRACKED_INFRA_TYPES filter on the result, so every output classifies a
+    mailbox the same way.
+    """
+    if not tags:
+        return None
+    for tag in tags:
+        tag_name = tag.get("name", "")
+        if tag_name in TAG_TO_INFRA:
+            return TAG_TO_INFRA[tag_name]
+    return None
+
+
+class MailboxRecord:
+    """
+    One tracked mailbox (attribute access, e.g. mb.domain, mb.daily_limit)
+
+    mb["domain"] and mb.get("domain") also work, so code written against
+    mailbox dicts (e.g. allocation.build_membership) reads records as-is.
+    """
+
+    __slots__ = MAILBOX_FIELDS
+
+    def __init__(self, **fields):
+        for name in MAILBOX_FIELDS:
+            value = fields.get(name, FIELD_DEFAULTS[name])
+            if name in INTERNED_FIELDS and value:
+                value = sys.intern(value)
+            setattr(self, name, value)
+
+    @classmethod
+    def from_api(cls, mb: dict, workspace_name: str, infra_type: str,
+                 warmup_info: dict = None) -> "MailboxRecord":
+        """
+        Build a record from a /sender-emails item
+
+        Args:
+            mb: Mailbox dict from the API
+            workspace_name: Workspace the mailbox was fetched from
+            infra_type: Infra type resolved from the mailbox tags
+            warmup_info: Optional /warmup/sender-emails item for this mailbox
+        """
+        email = mb.get("email", "")
+        domain = extract_domain(email)
+        warmup_info = warmup_info or {}
+        warmup_enabled = warmup_info.get("warmup_enabled", False)
+        return cls(
+            email=email,
+            domain=domain,
+            tld=extract_tld(domain),
+            workspace_name=workspace_name,
+            infra_type=infra_type,
+            daily_limit=mb.get("daily_limit", 0),
+            warmup_enabled=warmup_enabled,
+            warmup_daily_limit=warmup_info.get("warmup_daily_limit", 0) if warmup_enabled else 0,
+            external_id=mb.get("id"),
+            created_at=mb.get("created_at"),
+            # All-time cumulative stats from API
+            emails_sent=mb.get("emails_sent_count", 0) or 0,
+            replies=mb.get("total_replied_count", 0) or 0,
+            bounces=mb.get("bounced_count", 0) or 0,
+            interested=mb.get("interested_leads_count", 0) or 0,
+            status=mb.get("status", ""),
+        )
+
+    def __getitem__(self, name):
+        if name not in MAILBOX_FIELDS:
+            raise KeyError(name)
+        return getattr(self, name)
+
+    def get(self, name, default=None):
+        """Field value, or default for unknown fields (dict.get semantics)"""
+        return getattr(self, name) if name in MAILBOX_FIELDS else default
+
+    def snapshot_row(self) -> dict:
+        """mailbox_snapshots row for this mailbox"""
+        return {name: getattr(self, name) for name in SNAPSHOT_FIELDS}
+
+    def __repr__(self):
+        return f"MailboxRecord({self.email!r}, {self.workspace_name!r}, {self.infra_type!r})"
+
+
+class MailboxView:
+    """Read-only sequence of store records selected by row number (no copies, slices are views too)"""
+
+    __slots__ = ("_records", "_rows")
+
+    def __init__(self, records: list, rows: array):
+        self._records = records
+        self._rows = rows
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __iter__(self):
+        records = self._records
+        return (records[row] for row in self._rows)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return MailboxView(self._records, self._rows[index])
+        return self._records[self._rows[index]]
+
+    def __repr__(self):
+        return f"MailboxView({len(self._rows)} mailboxes)"
+
+
+class MailboxStore:
+    """
+    Append-only mailbox inventory with O(1) lookup by external_id
+
+    Iterating the store yields records in insertion order. Group-by views are
+    built in one pass on first use and cached until the next add().
+    """
+
+    def __init__(self, records=()):
+        self._records = []
+        self._by_id = {}
+        self._views = {}
+        for record in records:
+            self.add(record)
+
+    def add(self, record: MailboxRecord) -> MailboxRecord:
+        """Append a record (a later record with the same external_id wins the lookup)"""
+        self._records.append(record)
+        if record.external_id is not None:
+            self._by_id[record.external_id] = record
+        self._views.clear()
+        return record
+
+    def get(self, external_id, default=None):
+        """Record for an external_id"""
+        return self._by_id.get(external_id, default)
+
+    def __contains__(self, external_id):
+        return external_id in self._by_id
+
+    def __len__(self):
+        return len(self._records)
+
+    def __iter__(self):
+        return iter(self._records)
+
+    def __bool__(self):
+        return bool(self._records)
+
+    def filter(self, predicate) -> "MailboxStore":
+        """New store with the records matching predicate (records are shared, not copied)"""
+        return MailboxStore(record for record in self._records if predicate(record))
+
+    def group_by(self, field: str) -> dict:
+        """{value: MailboxView} for one field, keys in first-seen order"""
+        key = (field,)
+        if key not in self._views:
+            rows = {}
+            for row, value in enumerate(map(attrgetter(field), self._records)):
+                if value not in rows:
+                    rows[value] = array("l")
+                rows[value].append(row)
+            self._views[key] = {value: MailboxView(self._records, r) for value, r in rows.items()}
+        return self._views[key]
+
+    def nested(self, outer: str, inner: str) -> dict:
+        """{outer value: {inner value: MailboxView}}, keys in first-seen order"""
+        key = (outer, inner)
+        if key not in self._views:
+            rows = {}
+            for row, (o, i) in enumerate(map(attrgetter(outer, inner), self._records)):
+                inner_rows = rows.setdefault(o, {})
+                if i not in inner_rows:
+                    inner_rows[i] = array("l")
+                inner_rows[i].append(row)
+            self._views[key] = {
+                o: {i: MailboxView(self._records, r) for i, r in inner_rows.items()}
+                for o, inner_rows in rows.items()
+            }
+        return self._views[key]
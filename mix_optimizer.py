@@ -0,0 +1,138 @@
+"""
+RGL Infra Tracking - Infra Mix Optimizer
+Cheapest mix of infra types that reaches a target send volume
+
+Candidate mixes (every split of the target in steps of a few percent)
+are evaluated in one projection_grid pass, filtered by the constraints
+and ranked by cost over the planning horizon (setup + monthly):
+
+    result = optimize_mix(100000, positive_rates={"GR": 0.08, ...},
+                          bounce_rates={"GR": 1.2, ...},
+                          max_share={"GR": 0.5}, lead_weeks=3,
+                          min_positives_per_month=2000)
+
+Only infra types with an INFRA_COSTS entry are candidates by default;
+the others have no cost data and would look free.
+"""
+
+import math
+
+import numpy as np
+
+from config import INFRA_COSTS, TRACKED_INFRA_TYPES
+from projections import mix_grid, project_grid
+
+# Finest share step whose mix count stays under OPTIMIZER_MAX_MIXES is used
+OPTIMIZER_STEPS = [0.01, 0.02, 0.05, 0.1, 0.2, 0.25, 0.5]
+OPTIMIZER_MAX_MIXES = 20000
+OPTIMIZER_HORIZON_WEEKS = 12
+OPTIMIZER_ALTERNATIVES = 5
+
+
+def default_candidates() -> list:
+    """Tracked infra types with cost data, in TRACKED_INFRA_TYPES order"""
+    return [infra_type for infra_type in TRACKED_INFRA_TYPES if infra_type in INFRA_COSTS]
+
+
+def choose_step(n_types: int, max_mixes: int = OPTIMIZER_MAX_MIXES) -> float:
+    """Finest OPTIMIZER_STEPS step with at most max_mixes mixes of n_types"""
+    for step in OPTIMIZER_STEPS:
+        parts = int(round(1 / step))
+        if math.comb(parts + n_types - 1, n_types - 1) <= max_mixes:
+            return step
+    raise ValueError(f"Too many infra types to optimize over ({n_types})")
+
+
+def optimize_mix(target_sends: int, infra_types: list = None, positive_rates: dict = None,
+                 bounce_rates: dict = None, max_share: dict = None, lead_weeks: float = None,
+                 min_positives_per_month: float = 0, max_bounce_rate: float = None,
+                 horizon_weeks: float = OPTIMIZER_HORIZON_WEEKS, step: float = None) -> dict:
+    """
+    Find the cheapest infra mix for target_sends per day
+
+    Args:
+        target_sends: Sends/day to reach
+        infra_types: Candidate infra types (default: default_candidates())
+        positive_rates: {infra_type: positive rate %} (e.g. by_infra of a period)
+        bounce_rates: {infra_type: bounce rate %}
+        max_share: {infra_type: max share of the target (0-1)}
+        lead_weeks: Weeks until the volume is needed; slower-warming types are excluded
+        min_positives_per_month: Minimum expected positives per month at full volume
+        max_bounce_rate: Maximum send-weighted bounce rate %
+        horizon_weeks: Cost horizon (setup + monthly over these weeks) used for ranking
+        step: Share step of the candidate mixes (default: choose_step)
+
+    Returns:
+        {"best": scenario or None, "alternatives": [scenario, ...],
+         "evaluated": n mixes, "feasible": n mixes meeting every constraint,
+         "step": share step, "constraints": {...}}
+        where a scenario is {mix, sends, mailboxes, domains, capacity, monthly_cost,
+        setup_cost, horizon_cost, warmup_weeks, positives_per_month, bounce_rate,
+        cost_per_positive}
+    """
+    infra_types = list(infra_types or default_candidates())
+    positive_rates = positive_rates or {}
+    bounce_rates = bounce_rates or {}
+    max_share = max_share or {}
+    unknown = [t for t in list(max_share) if t not in infra_types]
+    if unknown:
+        raise ValueError(f"max_share given for infra types not in the candidates: {', '.join(unknown)}")
+    step = step or choose_step(len(infra_types))
+
+    mixes = mix_grid(infra_types, step, max_mixes=OPTIMIZER_MAX_MIXES)
+    rates = np.array([[positive_rates.get(t, 0) for t in infra_types]], dtype=np.float64)
+    grid = project_grid([target_sends], mixes, infra_types, positive_rates=rates,
+                        horizons_weeks=[horizon_weeks])
+
+    # Constraints, one boolean per mix; a mix whose mailboxes can't send the target is never picked
+    ok = grid["feasible"] & (grid["capacity"][0] >= target_sends)
+    shares_cap = np.array([max_share.get(t, 1.0) for t in infra_types])
+    ok &= (mixes <= shares_cap + 1e-9).all(axis=1)
+    if lead_weeks is not None:
+        ok &= grid["warmup_weeks"] <= lead_weeks
+    positives = grid["expected_positives_per_month"][0, :, 0]
+    ok &= positives >= min_positives_per_month
+    bounce = mixes @ np.array([bounce_rates.get(t, 0) for t in infra_types], dtype=np.float64)
+    if max_bounce_rate is not None:
+        ok &= bounce <= max_bounce_rate
+
+    horizon_cost = grid["horizon_cost"][0, :, 0]
+    # Cheapest first; ties go to the mix with more positives
+    order = np.lexsort((-positives, horizon_cost))
+    order = order[ok[order]]
+    ranked = order[:OPTIMIZER_ALTERNATIVES + 1].tolist()
+
+    def scenario(m: int) -> dict:
+        sends = grid["sends"][0, m]
+        mailboxes = grid["mailboxes"][0, m]
+        return {
+            "mix": {t: round(float(share), 4) for t, share in zip(infra_types, mixes[m]) if share},
+            "sends": {t: int(v) for t, v in zip(infra_types, sends) if v},
+            "mailboxes": {t: int(v) for t, v in zip(infra_types, mailboxes) if v},
+            "domains": {t: int(v) for t, v in zip(infra_types, grid["domains"][0, m]) if v},
+            "capacity": int(grid["capacity"][0, m]),
+            "monthly_cost": round(float(grid["monthly_cost"][0, m]), 2),
+            "setup_cost": round(float(grid["setup_cost"][0, m]), 2),
+            "horizon_cost": round(float(horizon_cost[m]), 2),
+            "warmup_weeks": float(grid["warmup_weeks"][m]),
+            "positives_per_month": round(float(positives[m]), 1),
+            "bounce_rate": round(float(bounce[m]), 2),
+            "cost_per_positive": round(float(grid["cost_per_positive"][0, m, 0]), 2),
+        }
+
+    return {
+        "best": scenario(ranked[0]) if ranked else None,
+        "alternatives": [scenario(m) for m in ranked[1:]],
+        "evaluated": len(mixes),
+        "feasible": len(order),
+        "step": step,
+        "constraints": {
+            "target_sends": target_sends,
+            "infra_types": infra_types,
+            "max_share": {t: max_share[t] for t in infra_types if t in max_share},
+            "lead_weeks": lead_weeks,
+            "min_positives_per_month": min_positives_per_month,
+            "max_bounce_rate": max_bounce_rate,
+            "horizon_weeks": horizon_weeks,
+        },
+    }
@@ -0,0 +1,274 @@
+"""
+RGL Infra Tracking - Projection Engine
+Vectorized cost projections over a grid of scenarios
+
+One pass of numpy evaluates every combination of
+
+    targets:   sends/day to reach                         (T,)
+    mixes:     share of the target per infra type         (M, I), rows sum to 1
+    horizons:  planning horizons in weeks (warmup first)  (H,)
+    windows:   positive rates from analysis periods       (W, I), in percent
+
+Costs follow INFRA_COSTS: tenant-priced infra (anything with
+"mailboxes_per_tenant", e.g. AO) pays per tenant and per aged domain,
+everything else per mailbox and per domain. A target is split across the
+mix with largest-remainder rounding, so the per-infra sends add up to the
+target, and mailboxes, tenants and domains are rounded up, so every
+scenario's capacity reaches its target.
+"""
+
+import itertools
+import math
+
+import numpy as np
+
+from config import INFRA_COSTS, INFRA_MAX_LIMITS
+
+# Defaults for the scenario grid
+DEFAULT_TARGET_SENDS = 100000
+DEFAULT_HORIZON_WEEKS = [4, 8, 12]
+DEFAULT_RATE_WINDOW = "14d"
+MAX_GRID_SCENARIOS = 250000   # targets x mixes x horizons x windows per request
+DAYS_PER_MONTH = 30
+
+
+def cost_table(infra_types: list) -> dict:
+    """
+    Per-infra cost parameters as arrays aligned with infra_types
+
+    Defaults match the dashboard's projection table (AO: $4.22/month per
+    25-mailbox tenant, $11.22 tenant setup, $7 aged domain, 1 domain/tenant).
+    """
+    rows = []
+    for infra_type in infra_types:
+        costs = INFRA_COSTS.get(infra_type, {})
+        rows.append((
+            costs.get("sends_per_day", INFRA_MAX_LIMITS.get(infra_type, 10)),
+            "mailboxes_per_tenant" in costs,
+            costs.get("monthly_per_mailbox", 0),
+            costs.get("mailboxes_per_domain", 4),
+            costs.get("domain_cost", 0),
+            costs.get("setup_per_mailbox", 0),
+            costs.get("mailboxes_per_tenant", 25),
+            costs.get("domains_per_tenant", 1),
+            costs.get("monthly_per_tenant", 4.22),
+            costs.get("tenant_cost", 11.22),
+            costs.get("aged_domain_cost", 7.00),
+            costs.get("warmup_weeks", 4),
+        ))
+    columns = list(zip(*rows)) if rows else [()] * 12
+    table = {
+        "sends_per_day": np.array(columns[0], dtype=np.int64),
+        "tenant_priced": np.array(columns[1], dtype=bool),
+        "monthly_per_mailbox": np.array(columns[2], dtype=np.float64),
+        "mailboxes_per_domain": np.array(columns[3], dtype=np.int64),
+        "domain_cost": np.array(columns[4], dtype=np.float64),
+        "setup_per_mailbox": np.array(columns[5], dtype=np.float64),
+        "mailboxes_per_tenant": np.array(columns[6], dtype=np.int64),
+        "domains_per_tenant": np.array(columns[7], dtype=np.int64),
+        "monthly_per_tenant": np.array(columns[8], dtype=np.float64),
+        "tenant_cost": np.array(columns[9], dtype=np.float64),
+        "aged_domain_cost": np.array(columns[10], dtype=np.float64),
+        "warmup_weeks": np.array(columns[11], dtype=np.float64),
+    }
+    table["feasible"] = table["sends_per_day"] > 0
+    return table
+
+
+def project_grid(targets, mixes, infra_types: list, positive_rates=None, horizons_weeks=()) -> dict:
+    """
+    Evaluate every target x mix (x horizon x rate window) scenario at once
+
+    Args:
+        targets: Sends/day, shape (T,)
+        mixes: Share of each target per infra type, shape (M, I)
+        infra_types: The I infra types the mix columns refer to
+        positive_rates: Positive rate (%) per window and infra type, shape (W, I)
+        horizons_weeks: Planning horizons in weeks, shape (H,)
+
+    Returns dict of arrays:
+        per infra (T, M, I): sends, mailboxes, domains, tenants, infra_monthly_cost, infra_setup_cost
+        per scenario (T, M): capacity (sends/day of the mailboxes), mailboxes_needed,
+            domains_needed, monthly_cost, setup_cost
+        per mix (M,): warmup_weeks (slowest infra with a share), feasible
+        with rates (T, M, W): expected_positives_per_month, cost_per_positive
+        with horizons (T, M, H): horizon_cost; and with rates too (T, M, H, W):
+            horizon_positives, horizon_cost_per_positive. Sends start once the
+            mix is warm, costs from day one.
+    """
+    targets = np.asarray(targets, dtype=np.int64)
+    mixes = np.asarray(mixes, dtype=np.float64).reshape(-1, len(infra_types))
+    table = cost_table(infra_types)
+
+    sends_per_day = np.where(table["feasible"], table["sends_per_day"], 1)
+    sends = split_target(targets, mixes)
+    active = sends > 0
+    mailboxes = _ceil_divide(sends, sends_per_day)
+
+    # Tenant pricing: at least one tenant, domains per tenant
+    tenants = np.where(active, np.maximum(_ceil_divide(mailboxes, table["mailboxes_per_tenant"]), 1), 0)
+    tenants = np.where(table["tenant_priced"], tenants, 0)
+    # Mailbox pricing: at least one domain
+    domains = np.where(
+        table["tenant_priced"],
+        tenants * table["domains_per_tenant"],
+        np.where(active, np.maximum(_ceil_divide(mailboxes, table["mailboxes_per_domain"]), 1), 0),
+    )
+    monthly = np.where(
+        table["tenant_priced"],
+        tenants * table["monthly_per_tenant"],
+        mailboxes * table["monthly_per_mailbox"],
+    )
+    setup = np.where(
+        table["tenant_priced"],
+        tenants * table["tenant_cost"] + domains * table["aged_domain_cost"],
+        domains * table["domain_cost"] + mailboxes * table["setup_per_mailbox"],
+    )
+
+    in_mix = mixes > 0
+    result = {
+        "sends": sends,
+        "mailboxes": mailboxes,
+        "domains": domains,
+        "tenants": tenants,
+        "infra_monthly_cost": monthly,
+        "infra_setup_cost": setup,
+        "capacity": (mailboxes * table["sends_per_day"]).sum(axis=2),
+        "mailboxes_needed": mailboxes.sum(axis=2),
+        "domains_needed": domains.sum(axis=2),
+        "monthly_cost": monthly.sum(axis=2),
+        "setup_cost": setup.sum(axis=2),
+        "warmup_weeks": np.where(in_mix, table["warmup_weeks"], 0).max(axis=1, initial=0),
+        "feasible": ~(in_mix & ~table["feasible"]).any(axis=1),
+    }
+
+    horizons = np.asarray(horizons_weeks, dtype=np.float64)
+    if horizons.size:
+        result["horizon_cost"] = (result["setup_cost"][:, :, None] +
+                                  result["monthly_cost"][:, :, None] * (horizons * 7 / DAYS_PER_MONTH))
+
+    if positive_rates is not None:
+        rates = np.asarray(positive_rates, dtype=np.float64).reshape(-1, len(infra_types))
+        positives_per_day = np.einsum("tmi,wi->tmw", sends.astype(np.float64), rates / 100)
+        per_month = positives_per_day * DAYS_PER_MONTH
+        result["expected_positives_per_month"] = per_month
+        result["cost_per_positive"] = _safe_divide(result["monthly_cost"][:, :, None], per_month)
+
+        if horizons.size:
+            sending_days = np.maximum(horizons[None, :] - result["warmup_weeks"][:, None], 0) * 7
+            horizon_positives = positives_per_day[:, :, None, :] * sending_days[None, :, :, None]
+            result["horizon_positives"] = horizon_positives
+            result["horizon_cost_per_positive"] = _safe_divide(
+                result["horizon_cost"][:, :, :, None], horizon_positives)
+
+    return result
+
+
+def split_target(targets, mixes) -> np.ndarray:
+    """
+    Sends per infra type, (T, M, I) int64: each target split by the mix shares
+
+    Shares are floored and the leftover sends go to the infra types with the
+    largest fractional parts (ties to the earlier type), so each row adds up
+    to its target.
+    """
+    exact = np.asarray(targets, dtype=np.int64)[:, None, None] * np.asarray(mixes, dtype=np.float64)[None, :, :]
+    # Round off float noise so 0.3 * 100000 stays 30000
+    exact = np.round(exact, 6)
+    sends = np.floor(exact).astype(np.int64)
+    leftover = np.rint(exact.sum(axis=2)).astype(np.int64) - sends.sum(axis=2)
+    order = np.argsort(-(exact - sends), axis=2, kind="stable")
+    rank = np.empty_like(order)
+    np.put_along_axis(rank, order, np.arange(order.shape[2]), axis=2)
+    return sends + (rank < leftover[:, :, None])
+
+
+def _ceil_divide(numerator, denominator):
+    """ceil(numerator / denominator) for non-negative integer arrays"""
+    return -(-numerator // denominator)
+
+
+def _safe_divide(numerator, denominator):
+    """numerator / denominator, 0 where the denominator is not positive"""
+    out = np.zeros(np.broadcast(numerator, denominator).shape)
+    np.divide(numerator, denominator, out=out, where=np.broadcast_to(denominator > 0, out.shape))
+    return out
+
+
+def pure_mixes(infra_types: list) -> np.ndarray:
+    """One mix per infra type, all sends on that type"""
+    return np.eye(len(infra_types))
+
+
+def mix_grid(infra_types: list, step: float, max_mixes: int = MAX_GRID_SCENARIOS) -> np.ndarray:
+    """
+    Every mix of infra_types in multiples of step (e.g. 0.25 -> 0, 25, 50, ... %)
+
+    Returns (M, I) shares, each row summing to 1. Raises ValueError if step
+    does not divide 1 or there would be more than max_mixes mixes.
+    """
+    parts = int(round(1 / step)) if step > 0 else 0
+    if parts <= 0 or abs(parts * step - 1) > 1e-9:
+        raise ValueError(f"mix step must divide 1 evenly, got {step}")
+    n = len(infra_types)
+    if math.comb(parts + n - 1, n - 1) > max_mixes:
+        raise ValueError(f"Too many mixes for step {step} over {n} infra types (max {max_mixes:,})")
+
+    # Stars and bars: n - 1 bar positions among parts + n - 1 slots
+    rows = []
+    for bars in itertools.combinations(range(parts + n - 1), n - 1):
+        edges = (-1,) + bars + (parts + n - 1,)
+        rows.append([edges[i + 1] - edges[i] - 1 for i in range(n)])
+    return np.array(rows, dtype=np.float64).reshape(-1, n) / parts
+
+
+def parse_mix(spec: str, infra_types: list) -> np.ndarray:
+    """
+    Mix from "GR:2,AO:1" (weights, normalized to shares) or a bare "GR"
+
+    Raises ValueError for unknown infra types or non-positive totals
+    """
+    weights = np.zeros(len(infra_types))
+    for part in spec.split(","):
+        name, _, weight = part.partition(":")
+        name = name.strip()
+        if name not in infra_types:
+            raise ValueError(f"Unknown infra type in mix: {name}")
+        weights[infra_types.index(name)] += float(weight) if weight else 1.0
+    if weights.sum() <= 0 or (weights < 0).any():
+        raise ValueError(f"Mix weights must be non-negative with a positive total: {spec}")
+    return weights / weights.sum()
+
+
+def window_positive_rates(data: dict, windows: list, infra_types: list) -> np.ndarray:
+    """(W, I) positive rates (%) from the by_infra section of each analysis period"""
+    return np.array([[data.get(window, {}).get("by_infra", {}).get(infra_type, {}).get("positive_rate", 0)
+                      for infra_type in infra_types] for window in windows], dtype=np.float64)
+
+
+def grid_payload(grid: dict, targets, mixes, infra_types: list, windows: list = (),
+                 horizons_weeks=()) -> dict:
+    """JSON-ready grid: axes plus one nested list (rounded) per metric"""
+    rounding = {"expected_positives_per_month": 1, "horizon_positives": 1}
+    metrics = {}
+    for name, values in grid.items():
+        if values.dtype.kind == "f":
+            values = np.round(values, rounding.get(name, 2))
+        metrics[name] = values.tolist()
+
+    return {
+        "axes": {
+            "targets": np.asarray(targets).tolist(),
+            "mixes": [{infra_type: round(share, 4) for infra_type, share in zip(infra_types, row) if share}
+                      for row in np.asarray(mixes).tolist()],
+            "infra_types": list(infra_types),
+            "horizons_weeks": list(horizons_weeks),
+            "windows": list(windows),
+        },
+        "scenario_count": grid_size(len(targets), len(mixes), len(horizons_weeks), len(windows)),
+        "metrics": metrics,
+    }
+
+
+def grid_size(n_targets: int, n_mixes: int, n_horizons: int, n_windows: int) -> int:
+    return n_targets * n_mixes * max(n_horizons, 1) * max(n_windows, 1)
@@ -0,0 +1,64 @@
+"""
+RGL Infra Tracking - Query Cache
+Small thread-safe TTL + LRU cache for computed query results
+
+    cache = TTLCache(max_entries=32, ttl=600)
+    result = cache.get_or_compute(("2025-01-01", "2025-01-31"), lambda: expensive(...))
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    Results keyed by any hashable, expiring after ttl seconds
+
+    The least recently used entry is evicted once max_entries is reached.
+    Concurrent misses on the same key may compute twice; the last one wins.
+    """
+
+    def __init__(self, max_entries: int = 128, ttl: float = 600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Cached value for key, or default if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            stored_at, value = entry
+            if time.monotonic() - stored_at >= self.ttl:
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value) -> None:
+        """Store value under key (evicting the least recently used entry if full)"""
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, key, compute):
+        """Cached value for key, computing and storing it with compute() on a miss"""
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def clear(self) -> None:
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
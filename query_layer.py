@@ -0,0 +1,135 @@
+"""
+RGL Infra Tracking - Query Layer
+Cached server-side reads of the Supabase tables behind the dashboard
+
+Results are cached per (query, params) in a shared TTL + LRU cache, so a
+dashboard load costs a couple of cache lookups instead of a page-by-page
+PostgREST walk per browser:
+
+    rows = daily_infra_stats("2025-01-01", "2025-01-31")
+    rows = mailbox_snapshots(workspace="Reev")
+
+Every cache is dropped when stored rows change: the latest collector_runs
+row and the latest data_generations row (bumped by the backfill and other
+jobs that write without a collector_runs row) are checked at most every
+GENERATION_CHECK_SECONDS, and a change clears the registered caches.
+POST /api/cache/invalidate calls invalidate() directly.
+"""
+
+import threading
+import time
+
+import requests
+
+from query_cache import TTLCache
+from supabase_data_collector import SUPABASE_URL, SUPABASE_KEY, supabase_select
+
+QUERY_CACHE_TTL = 900            # seconds a query result stays fresh
+QUERY_CACHE_MAX = 64             # results kept, least recently used evicted
+GENERATION_CHECK_SECONDS = 60    # how often collector_runs is polled
+QUERY_READ_WORKERS = 4           # parallel page reads per query
+QUERY_MAX_DAYS = 366             # widest start/end window /api/query serves
+
+# Stable orders for paging (the browser used date.desc)
+QUERY_ORDERS = {
+    "daily_infra_stats": "date.desc,id.asc",
+    "daily_domain_stats": "date.desc,id.asc",
+    "mailbox_snapshots": "id.asc",
+}
+
+_query_cache = TTLCache(max_entries=QUERY_CACHE_MAX, ttl=QUERY_CACHE_TTL)
+_caches = [_query_cache]
+_generation = {"token": None, "checked_at": float("-inf")}
+_generation_lock = threading.Lock()
+
+
+def register_cache(cache: TTLCache) -> TTLCache:
+    """Clear cache together with the query cache (for results derived from the same tables)"""
+    _caches.append(cache)
+    return cache
+
+
+def invalidate() -> None:
+    """Drop every registered cache"""
+    for cache in _caches:
+        cache.clear()
+
+
+def _latest_row(table: str, select: str, order: str):
+    """Newest row of table ({} if empty), or None if unavailable"""
+    url = f"{SUPABASE_URL}/rest/v1/{table}?select={select}&order={order}&limit=1"
+    headers = {
+        "apikey": SUPABASE_KEY,
+        "Authorization": f"Bearer {SUPABASE_KEY}",
+        "Accept": "application/json",
+    }
+    try:
+        resp = requests.get(url, headers=headers, timeout=10)
+        resp.raise_for_status()
+        rows = resp.json()
+    except Exception as e:
+        print(f"  Warning: could not check {table}: {e}")
+        return None
+    return rows[0] if rows else {}
+
+
+def collector_generation():
+    """
+    (run_date, status, finished_at, data_generations updated_at) of the latest
+    collector run and job write, or None if unavailable
+    """
+    run = _latest_row("collector_runs", "run_date,status,finished_at", "run_date.desc")
+    job = _latest_row("data_generations", "source,updated_at", "updated_at.desc")
+    if run is None or job is None:
+        return None
+    return (run.get("run_date"), run.get("status"), run.get("finished_at"), job.get("updated_at"))
+
+
+def check_generation() -> None:
+    """Clear the caches if a collector run or job write happened since the last check (rate limited)"""
+    with _generation_lock:
+        now = time.monotonic()
+        if now - _generation["checked_at"] < GENERATION_CHECK_SECONDS:
+            return
+        _generation["checked_at"] = now
+        token = collector_generation()
+        if token is None:
+            return
+        changed = _generation["token"] is not None and token != _generation["token"]
+        _generation["token"] = token
+    if changed:
+        invalidate()
+
+
+def cached_query(name: str, params: tuple, fetch):
+    """Result of fetch() for (name, params), shared across requests until invalidated"""
+    check_generation()
+    return _query_cache.get_or_compute((name,) + tuple(params), fetch)
+
+
+def _date_rows(table: str, start_date: str, end_date: str) -> list:
+    return cached_query(table, (start_date, end_date), lambda: supabase_select(
+        table,
+        filters=[("date", f"gte.{start_date}"), ("date", f"lte.{end_date}")],
+        order=QUERY_ORDERS[table],
+        workers=QUERY_READ_WORKERS,
+    ))
+
+
+def daily_infra_stats(start_date: str, end_date: str) -> list:
+    """daily_infra_stats rows with start_date <= date <= end_date, newest first"""
+    return _date_rows("daily_infra_stats", start_date, end_date)
+
+
+def daily_domain_stats(start_date: str, end_date: str) -> list:
+    """daily_domain_stats rows with start_date <= date <= end_date, newest first"""
+    return _date_rows("daily_domain_stats", start_date, end_date)
+
+
+def mailbox_snapshots(workspace: str = None) -> list:
+    """mailbox_snapshots rows (optionally one workspace's)"""
+    filters = [("workspace_name", f"eq.{workspace}")] if workspace else []
+    return cached_query("mailbox_snapshots", (workspace,), lambda: supabase_select(
+        "mailbox_snapshots", filters=filters, order=QUERY_ORDERS["mailbox_snapshots"],
+        workers=QUERY_READ_WORKERS,
+    ))
@@ -0,0 +1,67 @@
+"""
+RGL Infra Tracking - Prepared Responses
+JSON / static bodies serialized and compressed once, served with ETags
+
+A response body is prepared once per data version: serialized, gzipped
+(and brotli-compressed when the brotli package is installed) and hashed
+for a weak ETag (shared by every encoding). Each request then only picks an encoding or answers a
+matching If-None-Match with 304:
+
+    prepared = _responses.get_or_compute(key, lambda: PreparedResponse(jsonify(data).get_data()))
+    return send_prepared(prepared)
+"""
+
+import gzip
+import hashlib
+
+from flask import Response, request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 9
+MIN_COMPRESS_BYTES = 1024      # smaller bodies are sent as is
+CACHE_CONTROL = "no-cache"     # store, but revalidate with the ETag every time
+
+
+class PreparedResponse:
+    """A body with its compressed variants and ETag"""
+
+    def __init__(self, body: bytes, mimetype: str = "application/json"):
+        self.body = body
+        self.mimetype = mimetype
+        self.etag = hashlib.sha1(body).hexdigest()
+        self.encoded = {}
+        if len(body) >= MIN_COMPRESS_BYTES:
+            self.encoded["gzip"] = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+            if brotli is not None:
+                self.encoded["br"] = brotli.compress(body, quality=BROTLI_QUALITY)
+
+
+def choose_encoding(prepared: PreparedResponse, accept_encodings) -> str:
+    """Best encoding of prepared the client accepts (br, then gzip), or None for identity"""
+    for encoding in ("br", "gzip"):
+        if encoding in prepared.encoded and accept_encodings[encoding] > 0:
+            return encoding
+    return None
+
+
+def send_prepared(prepared: PreparedResponse) -> Response:
+    """
+    Response for the current request: 304 if If-None-Match has the ETag,
+    otherwise the best accepted encoding of the body
+    """
+    headers = {"Cache-Control": CACHE_CONTROL, "Vary": "Accept-Encoding"}
+    if request.if_none_match.contains_weak(prepared.etag):
+        response = Response(status=304, headers=headers)
+    else:
+        encoding = choose_encoding(prepared, request.accept_encodings)
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        body = prepared.encoded[encoding] if encoding else prepared.body
+        response = Response(body, mimetype=prepared.mimetype, headers=headers)
+    response.set_etag(prepared.etag, weak=True)
+    return response
@@ -2,17 +2,25 @@
 """
 Full analysis script - Run from native Terminal (not Cursor)
 Generates data for all time periods and saves to static/data.json
+
+    python3 run_full_analysis.py              # live RevGenLabs API (30-60 minutes)
+    python3 run_full_analysis.py --store      # same API pass also writes the Supabase tables
+    python3 run_full_analysis.py --warehouse  # stored Supabase tables, API only for missing days
 """
 
-import json
+import sys
 from datetime import datetime
 from analyzer import analyze_all_periods, print_summary
+from collection_pipeline import run_pipeline, write_data_json
+
+warehouse = "--warehouse" in sys.argv[1:]
+store = "--store" in sys.argv[1:]
 
 print("=" * 60)
 print("RGL INFRA FULL ANALYSIS")
 print("=" * 60)
 print()
-print("This will fetch time-filtered stats for:")
+print(f"This will {'read stored' if warehouse else 'fetch'} time-filtered stats for:")
 print("  - Google Reseller (GR)")
 print("  - Aged Outlook (AO)")
 print("  - Legacy Panel (L)")
@@ -21,20 +29,24 @@ print("  - Outlook")
 print("  - Winnr SMTP (WR SMTP)")
 print("  - Epan (E) - Edu panel")
 print()
-print("⚠️  This may take 30-60 minutes due to API pagination")
+if warehouse:
+    print("Source: Supabase mailbox_snapshots + daily_infra_stats (API only for missing days)")
+else:
+    print("⚠️  This may take 30-60 minutes due to API pagination")
 print()
 
-# Run analysis
-results = analyze_all_periods()
+# Run analysis (the API path goes through the collection pipeline, which saves data.json)
+if warehouse:
+    results = analyze_all_periods(source="warehouse")
+    output_path = write_data_json(results)
+else:
+    summary = run_pipeline(["dashboard", "supabase"] if store else ["dashboard"])
+    results = summary["dashboard"]["results"]
+    output_path = summary["dashboard"]["path"]
 
 # Print summary
 print_summary(results)
 
-# Save to static JSON file
-output_path = "static/data.json"
-with open(output_path, "w") as f:
-    json.dump(results, f, indent=2, default=str)
-
 print(f"\n{'=' * 60}")
 print(f"✅ DATA SAVED to {output_path}")
 print(f"Generated at: {datetime.now().isoformat()}")
@@ -3,10 +3,26 @@ RGL Infra Tracking - Flask Server
 Web dashboard and API endpoints
 """
 
+import hmac
 import json
 import os
+import numpy as np
 from flask import Flask, render_template, jsonify, request
 from config import TIME_PERIODS, INFRA_COSTS, INFRA_MAX_LIMITS, TRACKED_INFRA_TYPES, PROJECTION_INFRA_TYPES
+from analyzer import analyze_date_range, analyze_warmup_ramp, parse_date_range, WINDOW_CACHE_TTL
+from projections import (
+    project_grid, pure_mixes, mix_grid, parse_mix, window_positive_rates, grid_payload, grid_size,
+    DEFAULT_TARGET_SENDS, DEFAULT_HORIZON_WEEKS, DEFAULT_RATE_WINDOW, MAX_GRID_SCENARIOS,
+)
+from mix_optimizer import optimize_mix, OPTIMIZER_HORIZON_WEEKS
+from query_cache import TTLCache
+import query_layer
+from response_cache import PreparedResponse, send_prepared
+from static_data import StaticDataStore, read_version_stamp
+from field_projection import compile_projection, apply_projection
+from domain_health import query_domains, DOMAIN_PAGE_SIZE
+from trends import get_trends, DEFAULT_DOWNSAMPLE_METRIC
+from warmup_ramp import RAMP_WEEKS
 
 # Get absolute path for templates and static files
 import pathlib
@@ -16,38 +32,83 @@ app = Flask(__name__,
             template_folder=str(BASE_DIR / "templates"),
             static_folder=str(BASE_DIR / "static"))
 
-# Load static data from JSON file
-_data_cache = None
+DATA_PATH = os.path.join(os.path.dirname(__file__), "static", "data.json")
+VERSION_PATH = os.path.join(os.path.dirname(__file__), "static", "data.version.json")
+MANIFEST_PATH = os.path.join(os.path.dirname(__file__), "static", "data", "manifest.json")
+
+# Projection grids, keyed by data version + request (a refresh changes the key)
+GRID_ARGS = ("targets", "mix", "mix_step", "infra", "horizons", "windows")
+PROJECTION_CACHE_TTL = 3600
+PROJECTION_CACHE_MAX = 64
+_projection_cache = TTLCache(max_entries=PROJECTION_CACHE_MAX, ttl=PROJECTION_CACHE_TTL)
+_optimizer_cache = TTLCache(max_entries=PROJECTION_CACHE_MAX, ttl=PROJECTION_CACHE_TTL)
+
+# Serialized + compressed response bodies, keyed by data version + request
+# (also dropped on refresh and when a collector run finishes)
+RESPONSE_CACHE_TTL = 24 * 3600
+RESPONSE_CACHE_MAX = 64
+_response_cache = query_layer.register_cache(TTLCache(max_entries=RESPONSE_CACHE_MAX, ttl=RESPONSE_CACHE_TTL))
+# start/end windows are computed from stored rows, not data.json: they live no
+# longer than the window they are built from (and are dropped with it)
+_window_response_cache = query_layer.register_cache(TTLCache(max_entries=RESPONSE_CACHE_MAX, ttl=WINDOW_CACHE_TTL))
+
+
+def read_data_version() -> dict:
+    """Version stamp published with data.json ({version, generated_at, workspaces}), or {}"""
+    return read_version_stamp(VERSION_PATH)
+
+
+def validate_static_data(data) -> None:
+    """Raise ValueError unless data looks like generate_data output"""
+    if not isinstance(data, dict):
+        raise ValueError("data.json must hold an object")
+    bad = [period for period in TIME_PERIODS if not isinstance(data.get(period, {}), dict)]
+    if bad:
+        raise ValueError(f"data.json periods are not objects: {', '.join(bad)}")
+
+
+# data.json snapshot, swapped in by a background reload when the file changes
+_store = StaticDataStore(DATA_PATH, VERSION_PATH, validate=validate_static_data, manifest_path=MANIFEST_PATH)
 
 
 def load_static_data() -> dict:
-    """Load pre-generated static data from JSON file"""
-    global _data_cache
-    
-    if _data_cache is not None:
-        return _data_cache
-    
-    data_path = os.path.join(os.path.dirname(__file__), "static", "data.json")
-    
-    if os.path.exists(data_path):
-        with open(data_path, "r") as f:
-            _data_cache = json.load(f)
-    else:
-        _data_cache = {}
+    """Pre-generated static data (the current snapshot; never waits for a reload)"""
+    return _store.snapshot().data
+
+
+def rate_windows(snapshot, windows: list) -> dict:
+    """{period: results without by_client} for the periods positive rates are read from"""
+    return {window: snapshot.period(window, clients=[]) for window in windows}
+
+
+def prepared_json(key: tuple, build, snapshot=None, cache: TTLCache = None):
+    """
+    JSON response for build(), serialized and compressed once per data snapshot
     
-    return _data_cache
+    Answers If-None-Match with 304 and serves gzip/brotli when accepted.
+    Cached in cache (default: the 24h response cache).
+    """
+    snapshot = snapshot or _store.snapshot()
+    cache = _response_cache if cache is None else cache
+    prepared = cache.get_or_compute(
+        (snapshot.key,) + key, lambda: PreparedResponse(jsonify(build()).get_data()))
+    return send_prepared(prepared)
+
+
+def request_projection():
+    """Compiled fields= / include= projection of the current request, or None (ValueError if malformed)"""
+    return compile_projection(request.args.get("fields"), request.args.get("include"))
 
 
-def get_analysis(period: str) -> dict:
-    """Get analysis results for a period from static data"""
+def get_analysis(period: str, snapshot=None, clients: list = None) -> dict:
+    """Get analysis results for a period from static data (by_client limited to clients if given)"""
     if period not in TIME_PERIODS:
         period = "14d"
     
-    data = load_static_data()
-    return data.get(period, {})
+    return (snapshot or _store.snapshot()).period(period, clients)
 
 
-def calculate_projections(target_sends: int = 100000) -> dict:
+def calculate_projections(target_sends: int = 100000, data: dict = None) -> dict:
     """
     Calculate cost projections for reaching target sends per day
     Only calculates for PROJECTION_INFRA_TYPES (Maldoso, Google Reseller, Aged Outlook)
@@ -57,70 +118,32 @@ def calculate_projections(target_sends: int = 100000) -> dict:
     projections = {}
     
     # Get current performance data for cost per positive calculation
-    data = load_static_data()
-    period_data = data.get("14d", {})  # Use 14 day data for positive rate
-    by_infra = period_data.get("by_infra", {})
+    data = rate_windows(_store.snapshot(), [DEFAULT_RATE_WINDOW]) if data is None else data
+    infra_types = list(PROJECTION_INFRA_TYPES)
+    rates = window_positive_rates(data, [DEFAULT_RATE_WINDOW], infra_types)  # 14 day positive rate
+    grid = project_grid([target_sends], pure_mixes(infra_types), infra_types, positive_rates=rates)
     
-    for infra_type in PROJECTION_INFRA_TYPES:
-        costs = INFRA_COSTS.get(infra_type, {})
-        sends_per_day = costs.get("sends_per_day", INFRA_MAX_LIMITS.get(infra_type, 10))
-        
-        if sends_per_day <= 0:
+    by_infra = data.get(DEFAULT_RATE_WINDOW, {}).get("by_infra", {})
+    
+    for i, infra_type in enumerate(infra_types):
+        if not grid["feasible"][i]:
             continue
         
-        mailboxes_needed = target_sends // sends_per_day
-        
-        # Calculate monthly cost
-        if infra_type == "Aged Outlook":
-            # Aged Outlook: $4.22/month for 25 mailboxes (per tenant)
-            tenants_needed = mailboxes_needed // costs.get("mailboxes_per_tenant", 25)
-            if tenants_needed == 0:
-                tenants_needed = 1
-            monthly_cost = tenants_needed * costs.get("monthly_per_tenant", 4.22)
-            domains_needed = tenants_needed * costs.get("domains_per_tenant", 1)
-            
-            # One-time: tenant cost + aged domain premium per domain
-            setup_cost = (
-                tenants_needed * costs.get("tenant_cost", 11.22) +
-                domains_needed * costs.get("aged_domain_cost", 7.00)
-            )
-        else:
-            # Maldoso / GR style: monthly per mailbox
-            monthly_cost = mailboxes_needed * costs.get("monthly_per_mailbox", 0)
-            mailboxes_per_domain = costs.get("mailboxes_per_domain", 4)
-            domains_needed = mailboxes_needed // mailboxes_per_domain
-            if domains_needed == 0:
-                domains_needed = 1
-            
-            setup_cost = (
-                domains_needed * costs.get("domain_cost", 0) +
-                mailboxes_needed * costs.get("setup_per_mailbox", 0)
-            )
-        
-        # Calculate cost per positive (excluding one-time setup)
-        # Based on: monthly_cost / (positives_per_day * 30)
-        infra_data = by_infra.get(infra_type, {})
-        positives_per_day = infra_data.get("positives_per_day", 0)
-        positive_rate = infra_data.get("positive_rate", 0)  # as percentage (e.g., 0.05 means 0.05%)
-        
-        # Calculate expected positives per month at target volume
-        # positive_rate is percentage, so divide by 100
+        positive_rate = by_infra.get(infra_type, {}).get("positive_rate", 0)  # as percentage
         if positive_rate > 0:
-            expected_positives_per_day = (target_sends * (positive_rate / 100))
-            expected_positives_per_month = expected_positives_per_day * 30
-            cost_per_positive = monthly_cost / expected_positives_per_month if expected_positives_per_month > 0 else 0
+            expected_positives_per_month = float(grid["expected_positives_per_month"][0, i, 0])
+            cost_per_positive = float(grid["cost_per_positive"][0, i, 0])
         else:
-            cost_per_positive = 0
-            expected_positives_per_month = 0
+            expected_positives_per_month = cost_per_positive = 0
         
         projections[infra_type] = {
             "target_sends": target_sends,
-            "sends_per_day": sends_per_day,
-            "mailboxes_needed": mailboxes_needed,
-            "domains_needed": domains_needed,
-            "monthly_cost": round(monthly_cost, 2),
-            "setup_cost": round(setup_cost, 2),
-            "warmup_weeks": costs.get("warmup_weeks", 4),
+            "sends_per_day": INFRA_COSTS.get(infra_type, {}).get("sends_per_day", INFRA_MAX_LIMITS.get(infra_type, 10)),
+            "mailboxes_needed": int(grid["mailboxes_needed"][0, i]),
+            "domains_needed": int(grid["domains_needed"][0, i]),
+            "monthly_cost": round(float(grid["monthly_cost"][0, i]), 2),
+            "setup_cost": round(float(grid["setup_cost"][0, i]), 2),
+            "warmup_weeks": INFRA_COSTS.get(infra_type, {}).get("warmup_weeks", 4),
             "positive_rate": round(positive_rate, 4),
             "expected_positives_per_month": round(expected_positives_per_month, 1),
             "cost_per_positive": round(cost_per_positive, 2),
@@ -129,12 +152,163 @@ def calculate_projections(target_sends: int = 100000) -> dict:
     return projections
 
 
+def _int_list(value: str) -> list:
+    return [int(float(v)) for v in value.split(",") if v.strip()]
+
+
+def calculate_projection_grid(args) -> dict:
+    """
+    Projection grid for /api/projections query args (cached per data version)
+    
+    Raises ValueError for malformed or oversized requests
+    """
+    infra_types = [t.strip() for t in args.get("infra", ",".join(PROJECTION_INFRA_TYPES)).split(",") if t.strip()]
+    unknown = [t for t in infra_types if t not in TRACKED_INFRA_TYPES]
+    if unknown or not infra_types:
+        raise ValueError(f"Unknown infra types: {', '.join(unknown) or '(none)'}")
+    
+    targets = _int_list(args.get("targets", str(DEFAULT_TARGET_SENDS)))
+    horizons = _int_list(args.get("horizons", ",".join(map(str, DEFAULT_HORIZON_WEEKS))))
+    windows = [w.strip() for w in args.get("windows", DEFAULT_RATE_WINDOW).split(",") if w.strip()]
+    if not targets or any(t <= 0 for t in targets) or any(h < 0 for h in horizons):
+        raise ValueError("targets must be positive and horizons non-negative")
+    bad_windows = [w for w in windows if w not in TIME_PERIODS]
+    if bad_windows:
+        raise ValueError(f"Unknown windows: {', '.join(bad_windows)}")
+    
+    mix_specs = args.getlist("mix")
+    mix_step = args.get("mix_step")
+    if mix_step:
+        mixes = mix_grid(infra_types, float(mix_step))
+    elif mix_specs:
+        mixes = np.array([parse_mix(spec, infra_types) for spec in mix_specs])
+    else:
+        mixes = pure_mixes(infra_types)
+    
+    if grid_size(len(targets), len(mixes), len(horizons), len(windows)) > MAX_GRID_SCENARIOS:
+        raise ValueError(f"Grid too large (max {MAX_GRID_SCENARIOS:,} scenarios)")
+    
+    snapshot = _store.snapshot()
+    key = (snapshot.key, tuple(infra_types), tuple(targets), tuple(horizons), tuple(windows),
+           mixes.tobytes())
+    
+    def compute():
+        rates = window_positive_rates(rate_windows(snapshot, windows), windows, infra_types)
+        grid = project_grid(targets, mixes, infra_types, positive_rates=rates, horizons_weeks=horizons)
+        return grid_payload(grid, targets, mixes, infra_types, windows, horizons)
+    
+    return _projection_cache.get_or_compute(key, compute)
+
+
+def _float_arg(args, name: str, default=None):
+    value = args.get(name)
+    return float(value) if value not in (None, "") else default
+
+
+def calculate_optimal_mix(args) -> dict:
+    """
+    Cheapest infra mix for /api/optimize query args (cached per data version)
+    
+    Raises ValueError for malformed requests
+    """
+    infra = args.get("infra")
+    infra_types = [t.strip() for t in infra.split(",") if t.strip()] if infra else None
+    if infra_types is not None:
+        unknown = [t for t in infra_types if t not in TRACKED_INFRA_TYPES]
+        if unknown or not infra_types:
+            raise ValueError(f"Unknown infra types: {', '.join(unknown) or '(none)'}")
+    
+    max_share = {}
+    for part in args.get("max_share", "").split(","):
+        if part.strip():
+            name, _, share = part.partition(":")
+            max_share[name.strip()] = float(share)
+    
+    window = args.get("window", DEFAULT_RATE_WINDOW)
+    if window not in TIME_PERIODS:
+        raise ValueError(f"Unknown window: {window}")
+    target = int(_float_arg(args, "target", DEFAULT_TARGET_SENDS))
+    if target <= 0:
+        raise ValueError("target must be positive")
+    
+    options = {
+        "infra_types": infra_types,
+        "max_share": max_share,
+        "lead_weeks": _float_arg(args, "lead_weeks"),
+        "min_positives_per_month": _float_arg(args, "min_positives", 0),
+        "max_bounce_rate": _float_arg(args, "max_bounce"),
+        "horizon_weeks": _float_arg(args, "horizon", OPTIMIZER_HORIZON_WEEKS),
+        "step": _float_arg(args, "step"),
+    }
+    snapshot = _store.snapshot()
+    key = (snapshot.key, target, window, tuple(infra_types or ()), tuple(sorted(max_share.items())),
+           tuple(options[name] for name in ("lead_weeks", "min_positives_per_month",
+                                            "max_bounce_rate", "horizon_weeks", "step")))
+    
+    def compute():
+        by_infra = snapshot.period(window, clients=[]).get("by_infra", {})
+        result = optimize_mix(
+            target,
+            positive_rates={t: s.get("positive_rate", 0) for t, s in by_infra.items()},
+            bounce_rates={t: s.get("bounce_rate", 0) for t, s in by_infra.items()},
+            **options,
+        )
+        result["window"] = window
+        return result
+    
+    return _optimizer_cache.get_or_compute(key, compute)
+
+
+def get_warmup_ramp(weeks: int, source: str = None) -> dict:
+    """
+    Warmup ramp for the next weeks
+    
+    The ramp published in data.json is used when it covers the horizon
+    (sliced to it); otherwise, or with source="warehouse", it is simulated
+    from the stored mailbox inventory.
+    """
+    if source not in (None, "static", "warehouse"):
+        raise ValueError(f"Unknown source: {source}")
+    
+    ramp = _store.snapshot().section("warmup_ramp")
+    if source == "warehouse" or not ramp or ramp.get("weeks", 0) < weeks:
+        if source == "static":
+            raise ValueError(f"Published ramp covers {ramp.get('weeks', 0) if ramp else 0} weeks")
+        ramp = dict(analyze_warmup_ramp(weeks), source="warehouse")
+    else:
+        ramp = dict(ramp, source="static")
+    
+    days = weeks * 7
+    if len(ramp["dates"]) > days:
+        def cut(group):
+            return dict(group, capacity=group["capacity"][:days],
+                        reaches_max_on=group["reaches_max_on"]
+                        if group["reaches_max_on"] and group["reaches_max_on"] <= ramp["dates"][days - 1] else None)
+        ramp = dict(ramp, weeks=weeks, dates=ramp["dates"][:days], totals=cut(ramp["totals"]),
+                    by_infra={k: cut(v) for k, v in ramp["by_infra"].items()},
+                    by_workspace={k: cut(v) for k, v in ramp["by_workspace"].items()})
+    return ramp
+
+
 @app.route("/")
 def dashboard():
     """Render the main dashboard"""
     return render_template("index.html")
 
 
+@app.route("/static/data.json")
+def static_data():
+    """data.json with an ETag, compressed once per file version (conditional GETs get 304)"""
+    try:
+        stat = os.stat(DATA_PATH)
+    except OSError:
+        return jsonify({"error": "data.json not found"}), 404
+    prepared = _response_cache.get_or_compute(
+        ("static", DATA_PATH, stat.st_mtime_ns, stat.st_size),
+        lambda: PreparedResponse(pathlib.Path(DATA_PATH).read_bytes()))
+    return send_prepared(prepared)
+
+
 @app.route("/api/analyze")
 def api_analyze():
     """
@@ -142,71 +316,308 @@ def api_analyze():
     
     Query params:
         period: "3d", "7d", "14d", "30d" (default: "14d")
+        start, end: YYYY-MM-DD window (inclusive), computed from stored daily
+            data instead of a pre-generated period
+        client: Only these clients in by_client (comma-separated; pre-generated periods)
+        include: Only these sections, e.g. "totals,meta"
+        fields: Only these metrics, e.g. "by_infra.sent,by_infra.reply_rate"
+            (applied to every infra / client / tld, or "by_client.Reev.*.sent")
     """
     period = request.args.get("period", "14d")
+    start = request.args.get("start")
+    end = request.args.get("end")
+    
+    try:
+        projection = request_projection()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    projection_key = projection.key if projection else None
+    
+    if start or end:
+        try:
+            query_layer.check_generation()
+            return prepared_json(("analyze", start, end, projection_key),
+                                 lambda: apply_projection(projection, analyze_date_range(start, end)),
+                                 cache=_window_response_cache)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
     
     try:
-        results = get_analysis(period)
+        client = request.args.get("client")
+        clients = tuple(c.strip() for c in client.split(",") if c.strip()) if client else None
+        if projection and projection.keys("by_client") is not None:
+            # Only the client shards the projection reads
+            named = projection.keys("by_client")
+            clients = tuple(c for c in named if clients is None or c in clients)
+        snapshot = _store.snapshot()
+        results = get_analysis(period, snapshot, clients)
         if not results:
             return jsonify({"error": "No data available. Run run_full_analysis.py first."}), 404
-        return jsonify(results)
+        return prepared_json(("analyze", period, clients, projection_key),
+                             lambda: apply_projection(projection, results), snapshot)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
 @app.route("/api/infra")
 def api_infra():
-    """Get infra comparison data only"""
+    """Get infra comparison data only (fields= / include= as /api/analyze)"""
     period = request.args.get("period", "14d")
     
     try:
-        results = get_analysis(period)
-        return jsonify({
+        try:
+            projection = request_projection()
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        snapshot = _store.snapshot()
+        results = get_analysis(period, snapshot, clients=[])
+        key = ("infra", period, projection.key if projection else None)
+        return prepared_json(key, lambda: apply_projection(projection, {
             "by_infra": results.get("by_infra", {}),
             "totals": results.get("totals", {}),
             "meta": results.get("meta", {}),
-        })
+        }), snapshot)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
 @app.route("/api/workspaces")
 def api_workspaces():
-    """Get workspace breakdown data"""
+    """Get workspace breakdown data (fields= / include= as /api/analyze)"""
     period = request.args.get("period", "14d")
     
     try:
-        results = get_analysis(period)
-        return jsonify({
+        try:
+            projection = request_projection()
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        snapshot = _store.snapshot()
+        results = get_analysis(period, snapshot)
+        key = ("workspaces", period, projection.key if projection else None)
+        return prepared_json(key, lambda: apply_projection(projection, {
             "by_workspace": results.get("by_workspace", {}),
             "by_client": results.get("by_client", {}),
             "meta": results.get("meta", {}),
-        })
+        }), snapshot)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
 @app.route("/api/projections")
 def api_projections():
-    """Get cost projections for 100k sends/day"""
+    """
+    Get cost projections (per infra type for 100k sends/day by default)
+    
+    Query params (any of them returns the scenario grid instead):
+        targets: Comma-separated sends/day, e.g. "50000,100000,200000"
+        mix: Infra mix, repeatable, e.g. "GR:2,AO:1" (weights) or "MD SMTP"
+        mix_step: Every mix of the infra types in this share step, e.g. 0.25
+        infra: Infra types the mixes are drawn from (default: PROJECTION_INFRA_TYPES)
+        horizons: Planning horizons in weeks (default: 4,8,12)
+        windows: Periods whose positive rates are used (default: 14d)
+    """
+    try:
+        if any(name in request.args for name in GRID_ARGS):
+            try:
+                return jsonify(calculate_projection_grid(request.args))
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+        
+        # Rebuilt once per data snapshot (cost per positive follows the loaded rates)
+        snapshot = _store.snapshot()
+        return prepared_json(("projections",), lambda: calculate_projections(
+            100000, rate_windows(snapshot, [DEFAULT_RATE_WINDOW])), snapshot)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/api/optimize")
+def api_optimize():
+    """
+    Cheapest infra mix reaching a target sends/day
+    
+    Query params:
+        target: Sends/day (default: 100000)
+        infra: Candidate infra types (default: tracked types with INFRA_COSTS)
+        max_share: Max share per infra type, e.g. "GR:0.5,AO:0.6"
+        lead_weeks: Weeks until the volume is needed (slower-warming types excluded)
+        min_positives: Minimum expected positives per month
+        max_bounce: Maximum send-weighted bounce rate (%)
+        window: Period whose positive/bounce rates are used (default: 14d)
+        horizon: Weeks of cost (setup + monthly) to rank by (default: 12)
+        step: Share step of candidate mixes (default: finest that stays fast)
+    """
+    try:
+        try:
+            return jsonify(calculate_optimal_mix(request.args))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/api/warmup-ramp")
+def api_warmup_ramp():
+    """
+    Projected daily sendable capacity as warming mailboxes ramp up
+    
+    Query params:
+        weeks: Horizon in weeks, 1-52 (default: 12)
+        source: "static" (data.json) or "warehouse" (mailbox_snapshots);
+            default: data.json when it covers the horizon
+        infra, workspace: Only return these groups (comma-separated)
+    """
+    try:
+        try:
+            weeks = int(request.args.get("weeks", RAMP_WEEKS))
+            if not 1 <= weeks <= 52:
+                raise ValueError("weeks must be between 1 and 52")
+            ramp = get_warmup_ramp(weeks, request.args.get("source"))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        for arg, section in (("infra", "by_infra"), ("workspace", "by_workspace")):
+            if request.args.get(arg):
+                names = [n.strip() for n in request.args[arg].split(",")]
+                ramp = dict(ramp, **{section: {n: ramp[section][n] for n in names if n in ramp[section]}})
+        return jsonify(ramp)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/api/query/<table>")
+def api_query(table):
+    """
+    Cached rows of a dashboard table (shared across requests, dropped when a collector run finishes)
+    
+    Tables and query params:
+        daily_infra_stats, daily_domain_stats: start, end (YYYY-MM-DD, inclusive, at most QUERY_MAX_DAYS)
+        mailbox_snapshots: workspace (optional)
+    """
+    try:
+        if table in ("daily_infra_stats", "daily_domain_stats"):
+            try:
+                start_date, end_date, num_days = parse_date_range(request.args.get("start"), request.args.get("end"))
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            if num_days > query_layer.QUERY_MAX_DAYS:
+                return jsonify({"error": f"Date range too wide (max {query_layer.QUERY_MAX_DAYS} days)"}), 400
+            query = getattr(query_layer, table)
+            return jsonify(query(start_date, end_date))
+        if table == "mailbox_snapshots":
+            return jsonify(query_layer.mailbox_snapshots(request.args.get("workspace") or None))
+        return jsonify({"error": f"Unknown table: {table}"}), 404
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/api/trends")
+def api_trends():
+    """
+    Bucketed daily stats for the trend charts (cached, dropped when a collector run finishes)
+    
+    Query params:
+        start, end: Date range (YYYY-MM-DD, inclusive)
+        group: total (default), infra or workspace
+        bucket: Data dates per bucket (default: 1)
+        top: Only the top N groups by emails sent
+        points: Downsample each series to at most this many buckets
+        method: lttb (default) or minmax, with points
+        metric: Metric the kept buckets are chosen on, with points (default: bounce_rate)
+    """
     try:
-        # Always calculate fresh to include cost per positive
-        projections = calculate_projections(100000)
-        return jsonify(projections)
+        try:
+            start_date, end_date, _ = parse_date_range(request.args.get("start"), request.args.get("end"))
+            top = request.args.get("top")
+            points = request.args.get("points")
+            trends = get_trends(
+                request.args.get("group", "total"),
+                int(request.args.get("bucket", 1)),
+                start_date,
+                end_date,
+                top=int(top) if top else None,
+                points=int(points) if points else None,
+                method=request.args.get("method", "lttb"),
+                metric=request.args.get("metric", DEFAULT_DOWNSAMPLE_METRIC),
+            )
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify(trends)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+@app.route("/api/domain-health")
+def api_domain_health():
+    """
+    Domain health aggregated from mailbox_snapshots, one page at a time
+    
+    Query params:
+        sort: bounce_rate (default), reply_rate, positive_rate, emails_sent, bounces, replies, mailbox_count
+        order: desc (default) or asc
+        client, infra, tld, status: Filters (comma-separated values)
+        min_sends: Minimum emails sent (default: 0)
+        limit: Rows per page / top-k, 1-1000 (default: 50)
+        cursor: next_cursor from the previous page
+    """
+    try:
+        def values(name):
+            raw = request.args.get(name)
+            return [v.strip() for v in raw.split(",") if v.strip()] if raw else None
+        
+        try:
+            page = query_domains(
+                sort=request.args.get("sort", "bounce_rate"),
+                order=request.args.get("order", "desc"),
+                client=values("client"),
+                infra=values("infra"),
+                tld=values("tld"),
+                status=values("status"),
+                min_sends=int(request.args.get("min_sends", 0)),
+                limit=int(request.args.get("limit", DOMAIN_PAGE_SIZE)),
+                cursor=request.args.get("cursor") or None,
+            )
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify(page)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/api/cache/invalidate", methods=["POST"])
+def api_cache_invalidate():
+    """Drop cached query results (e.g. after a backfill); disabled unless CACHE_INVALIDATE_TOKEN is set"""
+    token = os.environ.get("CACHE_INVALIDATE_TOKEN")
+    if not token:
+        return jsonify({"error": "Cache invalidation is disabled (CACHE_INVALIDATE_TOKEN not set)"}), 403
+    if not hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}"):
+        return jsonify({"error": "Unauthorized"}), 401
+    query_layer.invalidate()
+    return jsonify({"status": "ok", "message": "Query cache cleared"})
+
+
+@app.route("/api/version")
+def api_version():
+    """Published data version vs. the version this server has loaded"""
+    stamp = read_data_version()
+    return jsonify({
+        "published": stamp.get("version"),
+        "generated_at": stamp.get("generated_at"),
+        "loaded": _store.snapshot().version,
+    })
+
+
 @app.route("/api/refresh")
 def api_refresh():
-    """Reload static data from file"""
-    global _data_cache
-    _data_cache = None
-    load_static_data()
-    return jsonify({"status": "ok", "message": "Data reloaded from file"})
+    """Reload static data from file now (requests keep the current snapshot meanwhile)"""
+    snapshot = _store.reload()
+    return jsonify({"status": "ok", "message": "Data reloaded from file", "version": snapshot.version})
 
 
 if __name__ == "__main__":
     print("Starting RGL Infra Tracking Dashboard...")
     print("Open http://localhost:5000 in your browser")
+    _store.start_watcher()
     app.run(debug=True, port=5000)
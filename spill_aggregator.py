@@ -0,0 +1,145 @@
+"""
+RGL Infra Tracking - Spill Aggregator
+Group-by with bounded memory: partial sums spill to a temporary SQLite file
+
+At most max_keys groups are held in a dict. When a new key would exceed
+that, the dict is merged into an on-disk table (sums added, first-seen
+values kept) and cleared, so peak memory depends on max_keys only:
+
+    with SpillAggregator(["domain", "client"], ["sent", "replies"], ["infra_type"]) as agg:
+        for row in rows:
+            agg.add((row["domain"], row["client"]), [row["sent"], row["replies"]], [row["tag"]])
+        for (domain, client), values in agg.items():   # first-seen key order
+            ...
+
+With max_keys=0 nothing is spilled (plain in-memory group-by).
+"""
+
+import os
+import sqlite3
+import tempfile
+
+# Groups held in memory before spilling (0 = never spill)
+SPILL_MAX_KEYS = int(os.environ.get("AGGREGATE_MAX_KEYS", "100000"))
+
+
+class SpillAggregator:
+    """
+    Sums and first-seen values per key, spilling to SQLite past max_keys
+
+    A first-seen field keeps the first non-None value added for its key
+    (pass None to leave it unset). items() returns keys in the order they
+    were first added, whether or not they were spilled in between.
+    """
+
+    def __init__(self, key_fields: list, sum_fields: list, first_fields: list = (),
+                 max_keys: int = SPILL_MAX_KEYS, directory: str = None):
+        self.key_fields = list(key_fields)
+        self.sum_fields = list(sum_fields)
+        self.first_fields = list(first_fields)
+        self.max_keys = max_keys
+        self.directory = directory
+        self.spills = 0
+        self._rows = {}  # key -> [seq, *sums, *firsts]
+        self._seq = 0
+        self._db = None
+        self._path = None
+
+    def add(self, key: tuple, sums: list, firsts: list = ()) -> None:
+        """Add one row's sums (and first-seen values) to its key"""
+        row = self._rows.get(key)
+        if row is None:
+            if self.max_keys and len(self._rows) >= self.max_keys:
+                self._spill()
+            row = [self._seq] + [0] * len(self.sum_fields) + [None] * len(self.first_fields)
+            self._rows[key] = row
+            self._seq += 1
+        for i, value in enumerate(sums, 1):
+            row[i] += value
+        offset = 1 + len(self.sum_fields)
+        for i, value in enumerate(firsts, offset):
+            if row[i] is None:
+                row[i] = value
+
+    def items(self):
+        """Yield (key, {field: value}) for every key in first-seen order"""
+        fields = self.sum_fields + self.first_fields
+        if self._db is None:
+            for key, row in self._rows.items():
+                yield key, dict(zip(fields, row[1:]))
+            return
+
+        self._spill()
+        n_keys = len(self.key_fields)
+        columns = ", ".join(self._key_columns() + self._value_columns())
+        for row in self._db.execute(f"SELECT {columns} FROM groups ORDER BY seq"):
+            yield tuple(row[:n_keys]), dict(zip(fields, row[n_keys:]))
+
+    def __len__(self) -> int:
+        if self._db is None:
+            return len(self._rows)
+        self._spill()
+        return self._db.execute("SELECT COUNT(*) FROM groups").fetchone()[0]
+
+    def close(self) -> None:
+        """Drop the in-memory groups and delete the spill file"""
+        self._rows = {}
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+        if self._path:
+            try:
+                os.remove(self._path)
+            except OSError:
+                pass
+            self._path = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _key_columns(self) -> list:
+        return [f"k{i}" for i in range(len(self.key_fields))]
+
+    def _value_columns(self) -> list:
+        return ([f"s{i}" for i in range(len(self.sum_fields))] +
+                [f"f{i}" for i in range(len(self.first_fields))])
+
+    def _open(self) -> None:
+        fd, self._path = tempfile.mkstemp(prefix="spill_", suffix=".sqlite", dir=self.directory)
+        os.close(fd)
+        self._db = sqlite3.connect(self._path)
+        # Scratch data: no journal or fsync needed, it is deleted on close
+        self._db.execute("PRAGMA journal_mode = OFF")
+        self._db.execute("PRAGMA synchronous = OFF")
+        keys = self._key_columns()
+        self._db.execute(
+            f"CREATE TABLE groups ({', '.join(keys + ['seq'] + self._value_columns())}, "
+            f"PRIMARY KEY ({', '.join(keys)}))"
+        )
+        self._db.execute("CREATE INDEX groups_seq ON groups (seq)")
+
+    def _spill(self) -> None:
+        """Merge the in-memory groups into the spill table and clear them"""
+        if not self._rows:
+            return
+        if self._db is None:
+            self._open()
+
+        keys = self._key_columns()
+        sums = [f"s{i}" for i in range(len(self.sum_fields))]
+        firsts = [f"f{i}" for i in range(len(self.first_fields))]
+        columns = keys + ["seq"] + sums + firsts
+        # The stored row was added first, so it keeps its seq and any first-seen value it has
+        updates = ([f"{c} = {c} + excluded.{c}" for c in sums] +
+                   [f"{c} = COALESCE({c}, excluded.{c})" for c in firsts])
+        conflict = f"DO UPDATE SET {', '.join(updates)}" if updates else "DO NOTHING"
+        sql = (f"INSERT INTO groups ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+               f"ON CONFLICT ({', '.join(keys)}) {conflict}")
+
+        with self._db:
+            self._db.executemany(sql, (list(key) + row for key, row in self._rows.items()))
+        self._rows = {}
+        self.spills += 1
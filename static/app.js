@@ -207,6 +207,14 @@ async function fetchData(period, refresh = false) {
         }
     }
 
+    // Fallback to the pre-generated period (served from its shards, one period only)
+    try {
+        const periodResponse = await fetch(`/api/analyze?period=${encodeURIComponent(period)}`);
+        if (periodResponse.ok) return await periodResponse.json();
+    } catch (error) {
+        console.warn('Period fetch failed, loading data.json:', error);
+    }
+
     // Fallback to static JSON
     const response = await fetch('/static/data.json');
     if (!response.ok) throw new Error('Failed to load data');
@@ -727,13 +735,14 @@ const TREND_DAYS = TREND_WEEKS * 7;
 async function updateDailyTrendsCharts() {
     if (!window.SupabaseClient) return;
 
-    // Always fetch 6 weeks of data for trends
-    const trends = await window.SupabaseClient.fetchDailyTrends(TREND_DAYS);
+    // Always fetch 6 weeks of data for trends, in weekly buckets (7-day) from the
+    // server; bucket the raw daily rows here if it is unavailable
+    const server = await window.SupabaseClient.fetchTrendBuckets(TREND_DAYS, 'total', 7, { metric: 'reply_rate' });
+    const aggregated = server
+        ? (server.length ? server[0].buckets : [])
+        : aggregateByPeriod(await window.SupabaseClient.fetchDailyTrends(TREND_DAYS), 7);
 
-    if (!trends || trends.length === 0) return;
-
-    // Aggregate into weekly buckets (7-day)
-    const aggregated = aggregateByPeriod(trends, 7);
+    if (aggregated.length === 0) return;
 
     const labels = aggregated.map(a => a.label);
     const replyRates = aggregated.map(a => a.reply_rate);
@@ -806,43 +815,57 @@ async function updateDailyTrendsCharts() {
     }
 }
 
+// Weekly buckets per infra type from the raw daily rows (when /api/trends is unavailable),
+// in the shape of fetchTrendBuckets: [{ group, total_sent, buckets }], largest first
+async function fetchInfraTrendBuckets(top) {
+    const infraTrends = await window.SupabaseClient.fetchInfraTrends(TREND_DAYS);
+    if (!infraTrends) return [];
+
+    // Get all unique dates across all infra types
+    const allDates = new Set();
+    for (const dateData of Object.values(infraTrends)) {
+        Object.keys(dateData).forEach(d => allDates.add(d));
+    }
+    const sortedDates = [...allDates].sort();
+
+    const series = Object.entries(infraTrends).map(([infra, dateData]) => {
+        const infraData = sortedDates.map(date => {
+            const dayStats = dateData[date] || { sent: 0, replied: 0, interested: 0 };
+            return { date, sent: dayStats.sent || 0, replied: dayStats.replied || 0, interested: dayStats.interested || 0 };
+        });
+        const total = infraData.reduce((sum, d) => sum + d.sent, 0);
+        return { group: infra, total_sent: total, buckets: aggregateByPeriod(infraData, 7) };
+    });
+    return series.sort((a, b) => b.total_sent - a.total_sent).slice(0, top);
+}
+
+// Every bucket label of the series, in date order
+function trendLabels(series) {
+    const starts = new Map();
+    for (const { buckets } of series) {
+        for (const b of buckets) starts.set(b.label, b.start || b.label);
+    }
+    return [...starts.keys()].sort((a, b) => starts.get(a).localeCompare(starts.get(b)));
+}
+
 // Update Infra Comparison Trend Chart (multi-line by infra type)
 // Always fetches last 6 weeks regardless of selected date range
 async function updateInfraComparisonTrendChart() {
     if (!window.SupabaseClient) return;
 
-    // Always fetch 6 weeks of data for trends
-    const infraTrends = await window.SupabaseClient.fetchInfraTrends(TREND_DAYS);
-
-    // infraTrends is an object: { infraType: { date: { sent, replied, interested } } }
-    if (!infraTrends || Object.keys(infraTrends).length === 0) {
+    // Weekly buckets for the top 6 infra types by volume (keeps chart readable),
+    // bucketed on the server; bucket the raw daily rows here if it is unavailable
+    const infraSeries = await window.SupabaseClient.fetchTrendBuckets(TREND_DAYS, 'infra', 7,
+        { top: 6, metric: 'positive_rate' }) || await fetchInfraTrendBuckets(6);
+    if (infraSeries.length === 0) {
         console.log('No infra trends data available');
         return;
     }
-
-    // Calculate total sends per infra type to find top 6
-    const infraTotals = {};
-    for (const [infra, dateData] of Object.entries(infraTrends)) {
-        infraTotals[infra] = Object.values(dateData)
-            .reduce((sum, d) => sum + (d.sent || 0), 0);
-    }
-
-    // Get top 6 infra types by volume (keeps chart readable)
-    const top6Infra = Object.entries(infraTotals)
-        .sort((a, b) => b[1] - a[1])
-        .slice(0, 6)
-        .map(([infra]) => infra);
-
+    const top6Infra = infraSeries.map(s => s.group);
     console.log('[InfraComparison] Showing top 6 by volume:', top6Infra);
 
-    // Get all unique dates across all infra types
-    const allDates = new Set();
-    for (const infraType of top6Infra) {
-        if (infraTrends[infraType]) {
-            Object.keys(infraTrends[infraType]).forEach(d => allDates.add(d));
-        }
-    }
-    const sortedDates = [...allDates].sort();
+    // Downsampled series can keep different buckets; the axis has every kept one
+    const labels = trendLabels(infraSeries);
 
     // Build data per infra type (top 6 only)
     const datasets = [];
@@ -855,28 +878,14 @@ async function updateInfraComparisonTrendChart() {
         { borderWidth: 2, borderDash: [8, 3] },
     ];
 
-    for (let i = 0; i < top6Infra.length; i++) {
-        const infra = top6Infra[i];
+    for (let i = 0; i < infraSeries.length; i++) {
+        const { group: infra, buckets } = infraSeries[i];
         const style = lineStyles[i] || lineStyles[0];
-
-        // Get daily data for this infra
-        const infraData = sortedDates.map(date => {
-            const dayStats = (infraTrends[infra] || {})[date] || { sent: 0, replied: 0, interested: 0 };
-            return {
-                date: date,
-                sent: dayStats.sent || 0,
-                replied: dayStats.replied || 0,
-                interested: dayStats.interested || 0
-            };
-        });
-
-        // Aggregate into weekly buckets
-        const aggregated = aggregateByPeriod(infraData, 7);
         const color = getInfraColor(infra);
 
         datasets.push({
             label: infra,
-            data: aggregated.map(a => a.positive_rate),
+            data: buckets.map(b => ({ x: b.label, y: b.positive_rate })),
             borderColor: color,
             backgroundColor: color + '20',
             fill: false,
@@ -888,10 +897,6 @@ async function updateInfraComparisonTrendChart() {
         });
     }
 
-    // Get labels from aggregated data
-    const firstInfraData = sortedDates.map(d => ({ date: d }));
-    const labels = aggregateByPeriod(firstInfraData, 7).map(a => a.label);
-
     const ctx = document.getElementById('infraComparisonTrendChart');
     if (ctx) {
         infraComparisonTrendChart = destroyChart(infraComparisonTrendChart);
@@ -938,18 +943,13 @@ async function updateInfraComparisonTrendChart() {
 
     // Reply Rate chart (normal replies / sends)
     const replyRateDatasets = [];
-    for (let i = 0; i < top6Infra.length; i++) {
-        const infra = top6Infra[i];
+    for (let i = 0; i < infraSeries.length; i++) {
+        const { group: infra, buckets } = infraSeries[i];
         const style = lineStyles[i] || lineStyles[0];
-        const infraData = sortedDates.map(date => {
-            const dayStats = (infraTrends[infra] || {})[date] || { sent: 0, replied: 0, interested: 0 };
-            return { date, sent: dayStats.sent || 0, replied: dayStats.replied || 0, interested: dayStats.interested || 0 };
-        });
-        const aggregated = aggregateByPeriod(infraData, 7);
         const color = getInfraColor(infra);
         replyRateDatasets.push({
             label: infra,
-            data: aggregated.map(a => a.reply_rate),
+            data: buckets.map(b => ({ x: b.label, y: b.reply_rate })),
             borderColor: color,
             backgroundColor: color + '20',
             fill: false,
@@ -1777,7 +1777,11 @@ async function fetchLast7DaysPositiveRates() {
     if (!window.SupabaseClient) return {};
 
     try {
-        const trends = await window.SupabaseClient.fetchInfraTrends(7);
+        // One 7-day bucket per infra type from the server; the raw daily rows if it is unavailable
+        const server = await window.SupabaseClient.fetchTrendBuckets(7, 'infra', 7);
+        const trends = server
+            ? Object.fromEntries(server.map(series => [series.group, series.buckets]))
+            : await window.SupabaseClient.fetchInfraTrends(7);
         if (!trends || Object.keys(trends).length === 0) return {};
 
         // Calculate 7-day aggregated positive rate per infra type
@@ -2052,6 +2056,14 @@ async function loadDataWithDateRange(start, end) {
 let domainsDataCache = null;
 let domainsLoading = false;
 
+function currentDomainFilters() {
+    return {
+        client: document.getElementById('domainFilterWorkspace')?.value || 'all',
+        infra: document.getElementById('domainFilterInfra')?.value || 'all',
+        status: document.getElementById('domainFilterStatus')?.value || 'all',
+    };
+}
+
 async function updateDomainsTab() {
     if (!window.SupabaseClient || domainsLoading) return;
     domainsLoading = true;
@@ -2063,7 +2075,9 @@ async function updateDomainsTab() {
 
     try {
         console.log('[Domains] Loading domain health data...');
-        domainsDataCache = await window.SupabaseClient.fetchDomainHealthScored();
+        // The server filters and pages; the Supabase fallback loads everything and filters here
+        const serverFilters = domainsDataCache && domainsDataCache.server ? currentDomainFilters() : {};
+        domainsDataCache = await window.SupabaseClient.fetchDomainHealthScored(serverFilters);
         console.log('[Domains] Loaded:', domainsDataCache.summary);
 
         if (!domainsDataCache.all || domainsDataCache.all.length === 0) {
@@ -2075,7 +2089,7 @@ async function updateDomainsTab() {
         }
 
         // Populate filter dropdowns
-        populateDomainFilters(domainsDataCache.all);
+        populateDomainFilters(domainsDataCache);
 
         // Render everything
         renderDomainSummary(domainsDataCache.summary);
@@ -2092,13 +2106,37 @@ async function updateDomainsTab() {
     }
 }
 
-function populateDomainFilters(domains) {
+async function loadMoreDomains() {
+    if (!domainsDataCache || !domainsDataCache.server || !domainsDataCache.next_cursor || domainsLoading) return;
+    domainsLoading = true;
+    try {
+        const page = await window.SupabaseClient.fetchDomainHealthPage({
+            ...domainsDataCache.params,
+            cursor: domainsDataCache.next_cursor,
+        });
+        if (!page) throw new Error('Domain health server unavailable');
+        domainsDataCache.all = domainsDataCache.all.concat(page.domains);
+        domainsDataCache.next_cursor = page.next_cursor;
+        renderDomainTables(domainsDataCache.all);
+    } catch (err) {
+        console.error('[Domains] Error loading more:', err);
+    } finally {
+        domainsLoading = false;
+    }
+}
+
+function populateDomainFilters(data) {
     const wsSelect = document.getElementById('domainFilterWorkspace');
     const infraSelect = document.getElementById('domainFilterInfra');
     if (!wsSelect || !infraSelect) return;
 
-    const workspaces = [...new Set(domains.map(d => d.client))].filter(Boolean).sort();
-    const infras = [...new Set(domains.map(d => d.infra_type))].filter(Boolean).sort();
+    // Server pages hold only some domains; it lists every value instead
+    const workspaces = data.server
+        ? data.filters.clients
+        : [...new Set(data.all.map(d => d.client))].filter(Boolean).sort();
+    const infras = data.server
+        ? data.filters.infra_types
+        : [...new Set(data.all.map(d => d.infra_type))].filter(Boolean).sort();
 
     const curWs = wsSelect.value;
     const curInfra = infraSelect.value;
@@ -2118,6 +2156,11 @@ function populateDomainFilters(domains) {
     // Attach filter change handlers (only once)
     if (!wsSelect._domainFilterBound) {
         const rerender = () => {
+            if (domainsDataCache && domainsDataCache.server) {
+                // Filtered, counted and paged on the server
+                updateDomainsTab();
+                return;
+            }
             const all = domainsDataCache ? domainsDataCache.all : [];
             const filtered = getFilteredDomains(all);
             // Update summary cards based on filtered data
@@ -2134,14 +2177,16 @@ function populateDomainFilters(domains) {
         wsSelect.addEventListener('change', rerender);
         infraSelect.addEventListener('change', rerender);
         document.getElementById('domainFilterStatus')?.addEventListener('change', rerender);
+        document.getElementById('domainLoadMore')?.addEventListener('click', loadMoreDomains);
         wsSelect._domainFilterBound = true;
     }
 }
 
 function getFilteredDomains(allDomains) {
-    const wsFilter = document.getElementById('domainFilterWorkspace')?.value || 'all';
-    const infraFilter = document.getElementById('domainFilterInfra')?.value || 'all';
-    const statusFilter = document.getElementById('domainFilterStatus')?.value || 'all';
+    // Server rows already match the filters
+    if (domainsDataCache && domainsDataCache.server) return allDomains;
+
+    const { client: wsFilter, infra: infraFilter, status: statusFilter } = currentDomainFilters();
 
     return allDomains.filter(d => {
         if (wsFilter !== 'all' && d.client !== wsFilter) return false;
@@ -2166,8 +2211,9 @@ function renderDomainSummary(summary) {
 function renderDomainTables(allDomains) {
     const filtered = getFilteredDomains(allDomains);
 
-    // Action Required table (burned + danger + warning)
-    const actionDomains = filtered
+    // Action Required table (burned + danger + warning); the server sends these in their own page
+    const server = domainsDataCache && domainsDataCache.server;
+    const actionDomains = (server ? domainsDataCache.action : filtered)
         .filter(d => d.status === 'burned' || d.status === 'danger' || d.status === 'warning')
         .sort((a, b) => {
             const p = { burned: 3, danger: 2, warning: 1 };
@@ -2226,8 +2272,24 @@ function renderDomainTables(allDomains) {
         `).join('');
     }
 
+    // More rows on the server: the user pages through them
+    const loadMore = document.getElementById('domainLoadMore');
+    if (loadMore) {
+        const more = server && domainsDataCache.next_cursor;
+        loadMore.style.display = more ? 'inline-block' : 'none';
+        if (more) loadMore.textContent = `Load more (${filtered.length} of ${domainsDataCache.total})`;
+    }
+
     // Worst by Infra Type
-    renderWorstByInfra(filtered);
+    renderWorstByInfra(server ? mergeDomainRows(filtered, domainsDataCache.action) : filtered);
+}
+
+function mergeDomainRows(...lists) {
+    const seen = new Map();
+    for (const list of lists) {
+        for (const d of list) seen.set(`${d.domain}|${d.client}`, d);
+    }
+    return [...seen.values()];
 }
 
 function renderWorstByInfra(domains) {
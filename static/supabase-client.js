@@ -61,6 +61,25 @@ const INFRA_MAX_LIMITS = {
 // Date Range Query Functions
 // ======================
 
+/**
+ * Fetch rows through the Flask query layer (/api/query/<table>), cached on the server
+ * @param {string} table - Table name
+ * @param {Object} params - Query params (start/end or workspace)
+ * @returns {Promise<Array|null>} - Rows, or null if the server query failed
+ */
+async function fetchServerQuery(table, params = {}) {
+    try {
+        const query = new URLSearchParams(params).toString();
+        const response = await fetch(`/api/query/${table}${query ? '?' + query : ''}`);
+        if (!response.ok) return null;
+        const rows = await response.json();
+        return Array.isArray(rows) ? rows : null;
+    } catch (error) {
+        console.warn(`Server query for ${table} failed, querying Supabase directly:`, error);
+        return null;
+    }
+}
+
 /**
  * Fetch all rows from a table with pagination (bypasses 1000-row limit)
  * @param {string} table - Table name
@@ -70,6 +89,10 @@ const INFRA_MAX_LIMITS = {
  * @returns {Promise<Array>} - All rows
  */
 async function fetchAllRows(table, startDate, endDate, batchSize = 1000) {
+    // Cached server-side query (one request); page through Supabase if it is unavailable
+    const cached = await fetchServerQuery(table, { start: startDate, end: endDate });
+    if (cached) return cached;
+
     let allData = [];
     let offset = 0;
     let hasMore = true;
@@ -222,6 +245,9 @@ async function fetchInfraPerformance(startDate, endDate) {
  * Fallback: Aggregate from mailbox_snapshots (current snapshot)
  */
 async function fetchFromMailboxSnapshots() {
+    const cached = await fetchServerQuery('mailbox_snapshots');
+    if (cached) return aggregateMailboxSnapshots(cached);
+
     const { data, error } = await supabaseClient
         .from('mailbox_snapshots')
         .select('*');
@@ -1000,9 +1026,76 @@ function normalizeInfraType(tag) {
 // Trend & Analytics Functions
 // ======================
 
+/**
+ * Bucketed trend series from /api/trends
+ * @param {Object} params - start, end (YYYY-MM-DD), group (total|infra|workspace), bucket (days), top
+ * @returns {Promise<Object|null>} - { buckets, series }, null if the endpoint is unavailable
+ */
+async function fetchServerTrends(params) {
+    try {
+        const response = await fetch(`/api/trends?${new URLSearchParams(params)}`);
+        if (!response.ok) return null;
+        const trends = await response.json();
+        return trends && trends.series ? trends : null;
+    } catch (error) {
+        console.warn('Server trends failed, querying Supabase directly:', error);
+        return null;
+    }
+}
+
+// Most buckets a trend chart draws per series (the server downsamples longer ranges)
+const TREND_POINTS = 60;
+
+/**
+ * Chart-ready trend buckets from /api/trends, bucketed (and downsampled to
+ * TREND_POINTS) on the server, so nothing is re-aggregated here
+ * @param {number} days - Days back from the latest data date
+ * @param {string} group - total, infra or workspace
+ * @param {number} bucketDays - Data dates per bucket
+ * @param {Object} options - top (groups by volume), metric (kept intact when downsampling)
+ * @returns {Promise<Array|null>} - [{ group, total_sent, buckets: [{ start, label, sent, replied,
+ *   interested, bounced, reply_rate, positive_rate, bounce_rate }] }], largest group first;
+ *   null if the endpoint is unavailable
+ */
+async function fetchTrendBuckets(days, group, bucketDays, options = {}) {
+    const params = {
+        start: getDateNDaysAgo(days),
+        end: getLatestDataDate(),
+        group,
+        bucket: bucketDays,
+        points: TREND_POINTS
+    };
+    if (options.top) params.top = options.top;
+    if (options.metric) params.metric = options.metric;
+
+    const trends = await fetchServerTrends(params);
+    if (!trends) return null;
+
+    return Object.entries(trends.series).map(([name, series]) => {
+        // Downsampled series list their kept buckets; full ones share trends.buckets
+        const starts = series.dates || trends.buckets.map(b => b.start);
+        const labels = series.labels || trends.buckets.map(b => b.label);
+        return {
+            group: name,
+            total_sent: series.total_sent,
+            buckets: starts.map((start, i) => ({
+                start,
+                label: labels[i],
+                sent: series.sent[i],
+                replied: series.replied[i],
+                interested: series.interested[i],
+                bounced: series.bounced[i],
+                reply_rate: series.reply_rate[i],
+                positive_rate: series.positive_rate[i],
+                bounce_rate: series.bounce_rate[i]
+            }))
+        };
+    }).sort((a, b) => b.total_sent - a.total_sent);
+}
+
 /**
  * Fetch daily trends aggregated across all workspaces/infra
- * Used for agency-wide trend charts in Overview tab
+ * Used for agency-wide trend charts in Overview tab when /api/trends is unavailable
  * @param {number} days - Number of days to fetch (default 14)
  * @returns {Promise<Array>} - Array of daily stats with rates
  */
@@ -1067,7 +1160,7 @@ async function fetchDailyTrends(days = 14) {
 
 /**
  * Fetch infra trends - daily positive rate per infra type
- * Used for infra trend chart in Infra Comparison tab
+ * Used for infra trend chart in Infra Comparison tab when /api/trends is unavailable
  * @param {number} days - Number of days to fetch (default 14)
  * @returns {Promise<Object>} - Object keyed by infra_type with date->stats
  */
@@ -1320,10 +1413,19 @@ async function fetchActiveClients(days = 30) {
 /**
  * Fetch domain health data with health scoring applied.
  * Combines daily_domain_stats (aggregated) + mailbox_snapshots (for created_at/age).
+ * @param {Object} filters - client, infra, status ('all' or missing = no filter)
+ * @returns {Promise<Object>} - With server: true, `all` is the first server page
+ *   (load more with fetchDomainHealthPage({ ...params, cursor: next_cursor })),
+ *   `action` the action-required domains and `summary` the server's counts
  */
-async function fetchDomainHealthScored(clientFilter = null) {
+async function fetchDomainHealthScored(filters = {}) {
+    // Aggregated, scored and paged on the server
+    const page = await fetchServerDomainHealth(filters);
+    if (page) return page;
+
+    // Score mailbox_snapshots here if it is unavailable
     // 1. Fetch domain stats from mailbox_snapshots (all-time cumulative, includes age)
-    const domainData = await fetchDomainHealth(clientFilter);
+    const domainData = await fetchDomainHealth(filters.client);
     const domains = domainData.all || [];
 
     // 2. Apply health scoring
@@ -1337,6 +1439,7 @@ async function fetchDomainHealthScored(clientFilter = null) {
     const insufficient = scored.filter(d => d.status === 'insufficient');
 
     return {
+        server: false,
         all: scored,
         burned: burned.sort((a, b) => b.bounce_rate - a.bounce_rate),
         danger: danger.sort((a, b) => b.bounce_rate - a.bounce_rate),
@@ -1354,6 +1457,66 @@ async function fetchDomainHealthScored(clientFilter = null) {
     };
 }
 
+/**
+ * One page of scored domains from /api/domain-health
+ * @param {Object} params - sort, order, client, infra, tld, status, min_sends, limit, cursor
+ * @returns {Promise<Object|null>} - { domains, next_cursor, total, summary, filters }, null if unavailable
+ */
+async function fetchDomainHealthPage(params = {}) {
+    try {
+        const query = new URLSearchParams(params).toString();
+        const response = await fetch(`/api/domain-health${query ? '?' + query : ''}`);
+        if (!response.ok) return null;
+        const page = await response.json();
+        return Array.isArray(page.domains) ? page : null;
+    } catch (error) {
+        console.warn('Server domain health failed, querying Supabase directly:', error);
+        return null;
+    }
+}
+
+// Rows per /api/domain-health page in the All Domains table, and the
+// action-required rows fetched with it (the endpoint's maximum page)
+const DOMAIN_PAGE_SIZE = 100;
+const DOMAIN_ACTION_LIMIT = 1000;
+const DOMAIN_ACTION_STATUSES = ['burned', 'danger', 'warning'];
+
+/**
+ * First page of scored domains from /api/domain-health, worst bounce rate first.
+ * Totals and status counts come from the server summary, so only the rows shown
+ * are fetched; the action-required domains come in one status-filtered page.
+ * Returns null if the endpoint is unavailable.
+ */
+async function fetchServerDomainHealth(filters = {}, pageSize = DOMAIN_PAGE_SIZE) {
+    const params = { sort: 'bounce_rate', order: 'desc', limit: pageSize };
+    for (const name of ['client', 'infra', 'status']) {
+        if (filters[name] && filters[name] !== 'all') params[name] = filters[name];
+    }
+    const actionStatuses = params.status
+        ? DOMAIN_ACTION_STATUSES.filter(s => s === params.status)
+        : DOMAIN_ACTION_STATUSES;
+
+    const [page, action] = await Promise.all([
+        fetchDomainHealthPage(params),
+        actionStatuses.length
+            ? fetchDomainHealthPage({ ...params, status: actionStatuses.join(','), limit: DOMAIN_ACTION_LIMIT })
+            : Promise.resolve({ domains: [] }),
+    ]);
+    if (!page || !action) return null;
+
+    console.log(`[DomainHealth] ${page.domains.length} of ${page.total} domains from server`);
+    return {
+        server: true,
+        all: page.domains,
+        action: action.domains,
+        summary: page.summary,
+        total: page.total,
+        next_cursor: page.next_cursor,
+        params,
+        filters: page.filters,
+    };
+}
+
 /**
  * Fetch oldest mailbox created_at per domain from mailbox_snapshots.
  * Returns { "domain|workspace": { oldest: "ISO date", age_days: N } }
@@ -1461,11 +1624,14 @@ window.SupabaseClient = {
     fetchWorkspaces,
     fetchDailyTrends,
     fetchInfraTrends,
+    fetchServerTrends,
+    fetchTrendBuckets,
     fetchClientAnalytics,
     fetchLatestInfraSnapshot,
     fetchActiveInfraTypes,
     fetchActiveClients,
     fetchDomainHealthScored,
+    fetchDomainHealthPage,
     getDateNDaysAgo,
     getLatestDataDate,
     getYesterdayDate,
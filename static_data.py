@@ -0,0 +1,259 @@
+"""
+RGL Infra Tracking - Static Data Store
+data.json held as an immutable snapshot, reloaded in the background
+
+Readers take the current snapshot (one reference read) and use it for the
+whole request, so they never see half of an old file and half of a new
+one. A changed file (mtime / size of data.json, its shard manifest or its
+version stamp) is loaded and validated on a background thread and swapped
+in atomically; a file that fails to load or validate is ignored until it
+changes again:
+
+    store = StaticDataStore(DATA_PATH, VERSION_PATH, manifest_path=MANIFEST_PATH)
+    snapshot = store.snapshot()      # never waits for a reload
+    snapshot.period("14d", clients=["Reev"]), snapshot.version, snapshot.key
+
+When the shard manifest matches the published version, only the manifest is
+read up front; each period, client and section shard is parsed the first
+time a request needs it. Otherwise the whole data.json is parsed as before.
+The generator prunes old version folders, so a shard an older snapshot has
+not read yet can be gone; it is then read from the version the manifest
+points at now.
+"""
+
+import json
+import os
+import threading
+import time
+
+# How often snapshot() (or the watcher thread) stats the files
+DATA_CHECK_SECONDS = 5
+
+
+def _read_json(path: str) -> dict:
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def read_version_stamp(path: str) -> dict:
+    """Version stamp published with data.json ({version, generated_at, workspaces}), or {}"""
+    return _read_json(path)
+
+
+def manifest_files(manifest: dict) -> list:
+    """Every shard file a manifest lists, relative to its folder"""
+    files = list(manifest.get("sections", {}).values())
+    for entry in manifest.get("periods", {}).values():
+        files.append(entry["file"])
+        files.extend(entry["clients"].values())
+    return files
+
+
+def _file_key(path: str):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class DataSnapshot:
+    """
+    One published version of the dashboard data (treat everything as read-only)
+
+    Attributes:
+        version: Published version stamp (None if there is none)
+        key: Identifies this load, for caches of views derived from it
+    """
+
+    def __init__(self, version, key, data: dict = None, manifest: dict = None, manifest_path: str = None):
+        self.version = version
+        self.key = key
+        self.manifest = manifest
+        self.manifest_path = manifest_path
+        self.shards_dir = os.path.dirname(manifest_path) if manifest_path else None
+        self._data = data
+        self._shards = {}
+        self._lock = threading.Lock()
+
+    @property
+    def sharded(self) -> bool:
+        return self.manifest is not None
+
+    @property
+    def data(self) -> dict:
+        """Whole data.json (reads every shard of a sharded snapshot)"""
+        if self._data is None:
+            full = {}
+            for name in self.manifest.get("order", []):
+                full[name] = self.period(name) if name in self.manifest["periods"] else self.section(name)
+            self._data = full
+        return self._data
+
+    def period(self, name: str, clients: list = None) -> dict:
+        """
+        One period's results, with by_client limited to clients (None = all)
+
+        Only the period shard and the requested client shards are parsed.
+        """
+        if not self.sharded or self._data is not None:
+            results = (self._data or {}).get(name, {})
+            if clients is None or "by_client" not in results:
+                return results
+            by_client = results["by_client"]
+            return dict(results, by_client={c: by_client[c] for c in clients if c in by_client})
+
+        entry = self.manifest["periods"].get(name)
+        if entry is None:
+            return {}
+        base = self._shard(entry["file"])
+        names = entry["clients"] if clients is None else [c for c in clients if c in entry["clients"]]
+        by_client = {client: self._shard(entry["clients"][client]) for client in names}
+        results = {}
+        for key in entry.get("keys") or list(base) + ["by_client"]:
+            if key == "by_client":
+                results[key] = by_client
+            elif key in base:
+                results[key] = base[key]
+        return results
+
+    def section(self, name: str):
+        """A non-period section (projections, warmup_ramp), or None"""
+        if not self.sharded or self._data is not None:
+            return (self._data or {}).get(name)
+        relative = self.manifest["sections"].get(name)
+        return self._shard(relative) if relative else None
+
+    def _shard(self, relative: str):
+        shard = self._shards.get(relative)
+        if shard is None:
+            try:
+                shard = self._read_shard(relative)
+            except FileNotFoundError:
+                # This version's folder was pruned by a newer publish
+                shard = self._read_shard(self._current_shard(relative))
+            with self._lock:
+                shard = self._shards.setdefault(relative, shard)
+        return shard
+
+    def _read_shard(self, relative: str):
+        with open(os.path.join(self.shards_dir, relative), "r") as f:
+            return json.load(f)
+
+    def _current_shard(self, relative: str) -> str:
+        """The same shard in the version the manifest lists now (FileNotFoundError if it has none)"""
+        manifest = _read_json(self.manifest_path)
+        current = f"{manifest.get('version')}/{relative.split('/', 1)[-1]}"
+        if current == relative or current not in manifest_files(manifest):
+            raise FileNotFoundError(f"Shard {relative} is no longer published")
+        print(f"  Warning: shard {relative} was pruned, reading {current}")
+        return current
+
+
+class StaticDataStore:
+    """
+    Current data.json snapshot with change detection
+
+    Only the first snapshot() waits for a load; later changes are picked up
+    by a background reload while requests keep the previous snapshot.
+    """
+
+    def __init__(self, data_path: str, version_path: str, validate=None,
+                 check_seconds: float = DATA_CHECK_SECONDS, manifest_path: str = None):
+        self.data_path = data_path
+        self.version_path = version_path
+        self.manifest_path = manifest_path
+        self.validate = validate
+        self.check_seconds = check_seconds
+        self.reloads = 0
+        self._snapshot = None
+        self._checked_at = float("-inf")
+        self._failed_key = None
+        self._load_lock = threading.Lock()
+
+    def files_key(self) -> tuple:
+        manifest = _file_key(self.manifest_path) if self.manifest_path else None
+        return (_file_key(self.data_path), _file_key(self.version_path), manifest)
+
+    def snapshot(self) -> DataSnapshot:
+        """Current snapshot; starts a background reload if the files changed"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._load_lock:
+                if self._snapshot is None:
+                    self._load()
+            return self._snapshot
+
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_seconds:
+            self._checked_at = now
+            key = self.files_key()
+            if key not in (snapshot.key, self._failed_key) and self._load_lock.acquire(blocking=False):
+                threading.Thread(target=self._reload_locked, daemon=True).start()
+        return snapshot
+
+    def reload(self) -> DataSnapshot:
+        """Load the files now (waits for a reload already running); keeps the old snapshot on errors"""
+        with self._load_lock:
+            self._load()
+        return self._snapshot
+
+    def start_watcher(self) -> threading.Thread:
+        """Daemon thread that checks the files every check_seconds (for long-running servers)"""
+        def watch():
+            while True:
+                time.sleep(self.check_seconds)
+                self.snapshot()
+        thread = threading.Thread(target=watch, daemon=True)
+        thread.start()
+        return thread
+
+    def _reload_locked(self):
+        try:
+            self._load()
+        finally:
+            self._load_lock.release()
+
+    def _load(self):
+        # Stamp first: the generator replaces data.json before the stamp, so the
+        # data read below is at least as new as this version
+        key = self.files_key()
+        version = read_version_stamp(self.version_path).get("version")
+        try:
+            manifest = self._read_manifest(version)
+            if manifest is not None:
+                self._snapshot = DataSnapshot(version, key, manifest=manifest, manifest_path=self.manifest_path)
+                self.reloads += 1
+                return
+            if os.path.exists(self.data_path):
+                with open(self.data_path, "r") as f:
+                    data = json.load(f)
+            else:
+                data = {}
+            if self.validate:
+                self.validate(data)
+        except (OSError, ValueError) as e:
+            print(f"  Warning: could not load {self.data_path}: {e}")
+            self._failed_key = key
+            if self._snapshot is None:
+                # Nothing to keep serving; retry on the next check
+                self._snapshot = DataSnapshot(None, None, data={})
+            return
+        self._snapshot = DataSnapshot(version, key, data=data)
+        self.reloads += 1
+
+    def _read_manifest(self, version):
+        """Shard manifest of this version, or None to read data.json instead"""
+        if not self.manifest_path or version is None:
+            return None
+        manifest = _read_json(self.manifest_path)
+        if manifest.get("version") != version:
+            return None
+        shards_dir = os.path.dirname(self.manifest_path)
+        missing = [f for f in manifest_files(manifest) if not os.path.exists(os.path.join(shards_dir, f))]
+        if missing:
+            raise ValueError(f"{len(missing)} shards listed in the manifest are missing")
+        return manifest
@@ -0,0 +1,240 @@
+"""
+RGL Infra Tracking - Stats Cube
+Array-backed daily stats: date x workspace x infra x TLD x metric
+
+One structure answers period / client / infra / TLD questions with array
+slices and sums instead of each consumer re-aggregating rows its own way:
+
+    cube = StatsCube.from_group_stats(dates, stats, membership)
+    week = cube.slice(start="2025-01-01", end="2025-01-07", infra_types=["GR"])
+    week.totals(by=("workspace",))        # {workspace: {sent, replied, ...}}
+    week.rate("bounced", by=("tld",))     # bounce rate % per TLD
+    week.top_k(10, by="domain", metric="bounced", rate=True)
+    cube.save("stats_cube.npz"); StatsCube.load("stats_cube.npz")
+
+The TLD axis ends with "" for stats not attributed to any TLD (mailboxes
+without a domain, groups without mailboxes), so summing over TLDs always
+gives the group totals. Domain drill-down is optional: (dates, domain_keys,
+metrics) from the same allocation.
+"""
+
+import numpy as np
+
+from allocation import METRICS, allocate, rollup
+
+
+# Axes of the cube values, in order (metrics is the last axis)
+DIMS = ("date", "workspace", "infra_type", "tld")
+METRIC_INDEX = {metric: i for i, metric in enumerate(METRICS)}
+
+# Position of each label in a domain key (domain, workspace_name, infra_type, tld)
+DOMAIN_KEY_FIELDS = {"domain": 0, "workspace": 1, "infra_type": 2, "tld": 3}
+
+
+class StatsCube:
+    """
+    Daily stats cube
+
+    Attributes:
+        labels: {dim: [label, ...]} for each of DIMS (dates ascending, YYYY-MM-DD)
+        values: int64 array (dates, workspaces, infra_types, tlds, metrics)
+        domain_keys: [(domain, workspace_name, infra_type, tld), ...] or None
+        domain_values: int64 array (dates, domain_keys, metrics) or None
+    """
+
+    def __init__(self, labels: dict, values: np.ndarray,
+                 domain_keys: list = None, domain_values: np.ndarray = None):
+        self.labels = {dim: list(labels[dim]) for dim in DIMS}
+        self.values = values
+        self.domain_keys = domain_keys
+        self.domain_values = domain_values
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_group_stats(cls, dates: list, stats: np.ndarray, membership: dict,
+                         domains: bool = True) -> "StatsCube":
+        """
+        Build a cube from per-group daily stats and an allocation membership
+
+        Args:
+            dates: YYYY-MM-DD per row of stats (any order; the cube sorts them)
+            stats: array (dates, groups, METRICS) in membership["groups"] order
+            membership: allocation.build_membership result
+            domains: Also keep the domain drill-down
+        """
+        order = np.argsort(np.array(dates, dtype=object), kind="stable")
+        dates = [dates[i] for i in order]
+        stats = np.asarray(stats, dtype=np.float64)[order]
+
+        groups = membership["groups"]
+        workspaces = list(dict.fromkeys(ws for ws, _ in groups))
+        infra_types = list(dict.fromkeys(infra for _, infra in groups))
+        tlds = list(membership["tlds"]) + [""]
+        ws_index = {ws: i for i, ws in enumerate(workspaces)}
+        infra_index = {infra: i for i, infra in enumerate(infra_types)}
+        group_ws = np.array([ws_index[ws] for ws, _ in groups], dtype=np.int64)
+        group_infra = np.array([infra_index[infra] for _, infra in groups], dtype=np.int64)
+
+        n_dates, n_tlds = len(dates), len(tlds)
+        shape = (n_dates, len(workspaces), len(infra_types), n_tlds, len(METRICS))
+        flat = np.zeros((n_dates, shape[1] * shape[2] * n_tlds, len(METRICS)), dtype=np.int64)
+
+        # Allocated slots land in their group's workspace/infra and their TLD ("" if none)
+        slot_values = allocate(stats, membership)
+        slot_group = membership["slot_group"]
+        slot_tld = np.where(membership["slot_tld"] >= 0, membership["slot_tld"], n_tlds - 1)
+        slot_cell = (group_ws[slot_group] * shape[2] + group_infra[slot_group]) * n_tlds + slot_tld
+        np.add.at(flat, (slice(None), slot_cell), slot_values)
+
+        # Groups without mailboxes keep their (rounded) totals under ""
+        empty = np.flatnonzero(membership["group_mailbox_counts"] == 0)
+        if len(empty):
+            empty_cell = (group_ws[empty] * shape[2] + group_infra[empty]) * n_tlds + n_tlds - 1
+            np.add.at(flat, (slice(None), empty_cell), np.rint(stats[:, empty]).astype(np.int64))
+
+        domain_keys = domain_values = None
+        if domains:
+            domain_keys = list(membership["domain_keys"])
+            domain_values = rollup(slot_values, membership, "domain")
+
+        labels = {"date": dates, "workspace": workspaces, "infra_type": infra_types, "tld": tlds}
+        return cls(labels, flat.reshape(shape), domain_keys, domain_values)
+
+    # ------------------------------------------------------------------
+    # Slicing
+    # ------------------------------------------------------------------
+
+    def slice(self, start: str = None, end: str = None, workspaces: list = None,
+              infra_types: list = None, tlds: list = None) -> "StatsCube":
+        """
+        Sub-cube for a date window (inclusive, YYYY-MM-DD) and optional label filters
+
+        Unknown labels in the filters are ignored.
+        """
+        dates = self.labels["date"]
+        lo = np.searchsorted(np.array(dates, dtype=object), start, side="left") if start else 0
+        hi = np.searchsorted(np.array(dates, dtype=object), end, side="right") if end else len(dates)
+        picks = {"date": list(range(lo, hi))}
+        for dim, wanted in (("workspace", workspaces), ("infra_type", infra_types), ("tld", tlds)):
+            all_labels = self.labels[dim]
+            if wanted is None:
+                picks[dim] = list(range(len(all_labels)))
+            else:
+                wanted = set(wanted)
+                picks[dim] = [i for i, label in enumerate(all_labels) if label in wanted]
+
+        values = self.values[np.ix_(picks["date"], picks["workspace"], picks["infra_type"], picks["tld"])]
+        labels = {dim: [self.labels[dim][i] for i in picks[dim]] for dim in DIMS}
+
+        domain_keys = domain_values = None
+        if self.domain_keys is not None:
+            keep = {dim: set(labels[dim]) for dim in ("workspace", "infra_type", "tld")}
+            rows = [k for k, key in enumerate(self.domain_keys)
+                    if all(key[DOMAIN_KEY_FIELDS[dim]] in keep[dim] for dim in keep)]
+            domain_keys = [self.domain_keys[k] for k in rows]
+            domain_values = self.domain_values[lo:hi][:, rows]
+
+        return StatsCube(labels, values, domain_keys, domain_values)
+
+    # ------------------------------------------------------------------
+    # Aggregation
+    # ------------------------------------------------------------------
+
+    def sum(self, by: tuple = ()) -> np.ndarray:
+        """Sum over every dim not in by; returns array (*by dims in DIMS order, METRICS)"""
+        unknown = set(by) - set(DIMS)
+        if unknown:
+            raise ValueError(f"Unknown cube dimension(s): {sorted(unknown)}")
+        axes = tuple(i for i, dim in enumerate(DIMS) if dim not in by)
+        return self.values.sum(axis=axes)
+
+    def totals(self, by: tuple = ()) -> dict:
+        """
+        Summed metrics as dicts
+
+        Returns {metric: value} for by=(), {label: {metric: value}} for one dim,
+        {(label, label, ...): {metric: value}} for several. All-zero cells are skipped.
+        """
+        by = tuple(dim for dim in DIMS if dim in by)
+        summed = self.sum(by)
+        if not by:
+            return dict(zip(METRICS, summed.tolist()))
+
+        result = {}
+        for idx in zip(*np.nonzero(summed.any(axis=-1))):
+            key = tuple(self.labels[dim][i] for dim, i in zip(by, idx))
+            result[key[0] if len(by) == 1 else key] = dict(zip(METRICS, summed[idx].tolist()))
+        return result
+
+    def rate(self, metric: str, by: tuple = ()) -> np.ndarray:
+        """metric / sent * 100 over the same shape as sum(by)[..., 0]; 0 where nothing was sent"""
+        summed = self.sum(by).astype(np.float64)
+        sent = summed[..., METRIC_INDEX["sent"]]
+        out = np.zeros(sent.shape, dtype=np.float64)
+        np.divide(summed[..., METRIC_INDEX[metric]], sent, out=out, where=sent > 0)
+        return out * 100
+
+    def top_k(self, k: int, by: str = "workspace", metric: str = "sent",
+              rate: bool = False, min_sent: int = 0) -> list:
+        """
+        Largest k labels of one dim (or "domain") by a metric or its rate
+
+        Args:
+            k: Number of results
+            by: One of DIMS or "domain" (needs the drill-down)
+            metric: Metric to rank by
+            rate: Rank by metric / sent % instead of the raw metric
+            min_sent: Skip labels with fewer sends (useful with rate=True)
+
+        Returns [(label, value), ...] descending; ties keep label order
+        """
+        if by == "domain":
+            if self.domain_values is None:
+                raise ValueError("Cube was built without the domain drill-down")
+            labels = [(domain, workspace) for domain, workspace, _, _ in self.domain_keys]
+            summed = self.domain_values.sum(axis=0)
+        else:
+            labels = self.labels[by]
+            summed = self.sum((by,))
+
+        sent = summed[:, METRIC_INDEX["sent"]].astype(np.float64)
+        values = summed[:, METRIC_INDEX[metric]].astype(np.float64)
+        if rate:
+            values = np.divide(values, sent, out=np.zeros_like(values), where=sent > 0) * 100
+        candidates = np.flatnonzero(sent >= min_sent) if min_sent else np.arange(len(labels))
+        if k < len(candidates):
+            part = np.argpartition(-values[candidates], k - 1)[:k]
+            candidates = np.sort(candidates[part])
+        ranked = candidates[np.argsort(-values[candidates], kind="stable")][:k]
+        return [(labels[i], values[i].item() if rate else int(values[i])) for i in ranked]
+
+    # ------------------------------------------------------------------
+    # Serialization
+    # ------------------------------------------------------------------
+
+    def save(self, path: str) -> None:
+        """Write the cube to a compressed .npz file"""
+        arrays = {f"labels_{dim}": np.array(self.labels[dim], dtype=str) for dim in DIMS}
+        arrays["values"] = self.values
+        if self.domain_keys is not None:
+            arrays["domain_keys"] = np.array(self.domain_keys, dtype=str).reshape(-1, 4)
+            arrays["domain_values"] = self.domain_values
+        np.savez_compressed(path, **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "StatsCube":
+        """Read a cube written by save()"""
+        with np.load(path, allow_pickle=False) as data:
+            labels = {dim: data[f"labels_{dim}"].tolist() for dim in DIMS}
+            domain_keys = domain_values = None
+            if "domain_keys" in data:
+                domain_keys = [tuple(key) for key in data["domain_keys"].tolist()]
+                domain_values = data["domain_values"]
+            return cls(labels, data["values"], domain_keys, domain_values)
+
+    def __repr__(self):
+        shape = " x ".join(f"{len(self.labels[dim])} {dim}" for dim in DIMS)
+        return f"StatsCube({shape})"
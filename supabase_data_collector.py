@@ -12,14 +12,20 @@ Reuses existing analyzer.py logic for API fetching and aggregation.
 
 import os
 import time
+import tempfile
 import requests
-from datetime import datetime, timedelta
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
 from collections import defaultdict
 
 from config import (
-    TAG_TO_INFRA, TRACKED_INFRA_TYPES, INFRA_MAX_LIMITS, WORKSPACES
+    TRACKED_INFRA_TYPES, INFRA_MAX_LIMITS, WORKSPACES
 )
-from api_client import get_all_workspace_clients
+from api_client import get_all_workspace_clients, Deadline, DeadlineExceeded, NotCollected
+from allocation import METRICS, build_membership, allocate, rollup
+from mailbox_store import MailboxRecord, MailboxStore, get_infra_type_from_tags
+from stats_cube import StatsCube
 
 # Supabase configuration
 SUPABASE_URL = "https://fxxjfgfnrywffjmxoadl.supabase.co"
@@ -37,35 +43,14 @@ WORKSPACE_CAP_PERCENT = 0.10   # Max 10% of a workspace's domains alerted per ru
 WORKSPACE_CAP_MIN = 5          # Always allow at least 5 alerts per workspace
 WORKSPACE_CAP_MAX = 30         # Never more than 30 per workspace per run
 
+# Chunked collection (serverless /api/collect) — workspaces processed per invocation
+COLLECT_CHUNK_WORKSPACES = 3
+COLLECT_CHUNK_DEADLINE_SECONDS = 280   # Budget per invocation (maxDuration for api/collect.py in vercel.json is 300s)
+COLLECT_CHUNK_WRITE_RESERVE = 30       # Seconds of that budget kept for upserts
+COLLECT_RESUME_AFTER_SECONDS = 360     # A saved cursor older than this is resumed (its chain broke)
 
-def get_infra_type_from_tags(tags: list) -> str:
-    """Extract infra type from mailbox tags.
-
-    Uses TAG_TO_INFRA mapping from config.py.
-    Any tag that has a mapping is accepted (no longer requires
-    presence in TRACKED_INFRA_TYPES for forward compatibility).
-    """
-    if not tags:
-        return None
-    for tag in tags:
-        tag_name = tag.get("name", "")
-        if tag_name in TAG_TO_INFRA:
-            return TAG_TO_INFRA[tag_name]
-    return None
-
-
-def extract_domain(email: str) -> str:
-    """Extract domain from email address"""
-    if not email or "@" not in email:
-        return ""
-    return email.split("@")[1].lower()
-
-
-def extract_tld(domain: str) -> str:
-    """Extract TLD from domain"""
-    if not domain or "." not in domain:
-        return ""
-    return "." + domain.split(".")[-1].lower()
+# Backfill aggregation — dates per task (each task allocates and builds records for its dates)
+BACKFILL_CHUNK_DAYS = 7
 
 
 def _fetch_recently_alerted() -> set:
@@ -113,7 +98,7 @@ def _record_alert(domain: str, workspace_name: str, alert_type: str,
         print(f"  Warning: could not record alert for {domain}: {e}")
 
 
-def check_domain_health_and_notify(mailboxes: list):
+def check_domain_health_and_notify(mailboxes: MailboxStore):
     """
     Aggregate mailbox stats by domain, check health thresholds, send webhooks.
     Includes 14-day cooldown and per-workspace cap to prevent cascading volume drops.
@@ -125,19 +110,19 @@ def check_domain_health_and_notify(mailboxes: list):
     })
 
     for mb in mailboxes:
-        domain = mb.get("domain", "")
-        workspace = mb.get("workspace_name", "")
+        domain = mb.domain
+        workspace = mb.workspace_name
         if not domain:
             continue
         key = f"{domain}|{workspace}"
         d = domain_data[key]
-        d["emails_sent"] += mb.get("emails_sent", 0) or 0
-        d["replies"] += mb.get("replies", 0) or 0
-        d["bounces"] += mb.get("bounces", 0) or 0
+        d["emails_sent"] += mb.emails_sent or 0
+        d["replies"] += mb.replies or 0
+        d["bounces"] += mb.bounces or 0
         d["mailbox_count"] += 1
         if d["workspace_name"] is None:
             d["workspace_name"] = workspace
-            d["infra_type"] = mb.get("infra_type", "")
+            d["infra_type"] = mb.infra_type
 
     # --- Count total domains per workspace (for cap calculation) ---
     workspace_domain_counts = defaultdict(int)
@@ -314,14 +299,81 @@ def supabase_upsert(table: str, data: list, on_conflict: str = None, batch_size:
     return {"status": "success", "count": total_inserted}
 
 
-def fetch_all_mailboxes_with_details() -> list:
+def supabase_select(table: str, filters: list = None, select: str = "*", order: str = None,
+                    page_size: int = 1000, workers: int = 1) -> list:
+    """
+    Read all matching rows from a Supabase table, page by page
+
+    Args:
+        table: Table name
+        filters: PostgREST filters as (column, "op.value") pairs, e.g. [("date", "gte.2025-01-01")]
+        select: Columns to return
+        order: Sort order (e.g. "date.asc"); paging needs a stable order
+        page_size: Rows per request (PostgREST max is usually 1000)
+        workers: Parallel page requests; above 1 the first page asks for the exact
+                 row count and the remaining ranges are fetched concurrently
+
+    Returns list of row dicts in order (raises requests.exceptions.RequestException on failure)
+    """
+    url = f"{SUPABASE_URL}/rest/v1/{table}"
+    headers = {
+        "apikey": SUPABASE_KEY,
+        "Authorization": f"Bearer {SUPABASE_KEY}",
+        "Accept": "application/json",
+    }
+    params = [("select", select)] + list(filters or [])
+    if order:
+        params.append(("order", order))
+
+    def fetch_page(offset: int, extra_headers: dict = None) -> requests.Response:
+        page_params = params + [("limit", page_size), ("offset", offset)]
+        response = requests.get(url, headers={**headers, **(extra_headers or {})},
+                                params=page_params, timeout=30)
+        response.raise_for_status()
+        return response
+
+    if workers > 1:
+        # Content-Range: 0-999/12345 gives the total, so every other range is known upfront
+        first = fetch_page(0, {"Prefer": "count=exact"})
+        rows = first.json()
+        total = first.headers.get("Content-Range", "").rpartition("/")[2]
+        if total.isdigit():
+            offsets = range(page_size, int(total), page_size)
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                for response in pool.map(fetch_page, offsets):
+                    rows.extend(response.json())
+            return rows
+        if len(rows) < page_size:
+            return rows
+        offset = page_size
+    else:
+        rows = []
+        offset = 0
+
+    while True:
+        page = fetch_page(offset).json()
+        rows.extend(page)
+        if len(page) < page_size:
+            break
+        offset += page_size
+    return rows
+
+
+def fetch_all_mailboxes_with_details(clients: dict = None, not_collected: list = None,
+                                     warmup_data: dict = None) -> MailboxStore:
     """
     Fetch all mailboxes from all workspaces with warmup details
 
-    Returns list of mailbox dicts with all fields needed for mailbox_snapshots
+    Args:
+        clients: Optional {workspace_name: client} subset to fetch (default: all workspaces)
+        not_collected: Optional list; workspaces not fetched (run deadline or failed retries) are appended
+        warmup_data: Optional dict; each fetched workspace's raw warmup list is stored under its name
+
+    Returns a MailboxStore of records with all fields needed for mailbox_snapshots
     """
-    clients = get_all_workspace_clients()
-    all_mailboxes = []
+    if clients is None:
+        clients = get_all_workspace_clients()
+    all_mailboxes = MailboxStore()
 
     print("Fetching mailboxes from all workspaces...")
 
@@ -336,9 +388,14 @@ def fetch_all_mailboxes_with_details() -> list:
             warmup_list = []
             try:
                 warmup_list = client.get_warmup_status()
+            except DeadlineExceeded:
+                raise
             except Exception as e:
                 print(f"(warmup error: {e})", end=" ")
 
+            if warmup_data is not None:
+                warmup_data[workspace_name] = warmup_list
+
             # Build warmup lookup by ID
             warmup_by_id = {w.get("id"): w for w in warmup_list}
 
@@ -348,52 +405,34 @@ def fetch_all_mailboxes_with_details() -> list:
                 if not infra_type:
                     continue
 
-                email = mb.get("email", "")
-                domain = extract_domain(email)
-                tld = extract_tld(domain)
-                mb_id = mb.get("id")
-
-                # Get warmup info
-                warmup_info = warmup_by_id.get(mb_id, {})
-                warmup_enabled = warmup_info.get("warmup_enabled", False)
-                warmup_daily_limit = warmup_info.get("warmup_daily_limit", 0) if warmup_enabled else 0
-
-                mailbox_data = {
-                    "email": email,
-                    "domain": domain,
-                    "tld": tld,
-                    "workspace_name": workspace_name,
-                    "infra_type": infra_type,
-                    "daily_limit": mb.get("daily_limit", 0),
-                    "warmup_enabled": warmup_enabled,
-                    "warmup_daily_limit": warmup_daily_limit,
-                    "external_id": mb_id,
-                    "created_at": mb.get("created_at"),
-                    # All-time cumulative stats from API
-                    "emails_sent": mb.get("emails_sent_count", 0) or 0,
-                    "replies": mb.get("total_replied_count", 0) or 0,
-                    "bounces": mb.get("bounced_count", 0) or 0,
-                    "interested": mb.get("interested_leads_count", 0) or 0,
-                }
-
-                all_mailboxes.append(mailbox_data)
+                warmup_info = warmup_by_id.get(mb.get("id"))
+                all_mailboxes.add(MailboxRecord.from_api(mb, workspace_name, infra_type, warmup_info))
                 tracked_count += 1
 
             print(f"✓ {tracked_count}/{len(mailboxes)} tracked")
 
+        except NotCollected as e:
+            print(f"✗ Not collected: {e}")
+            if not_collected is not None:
+                not_collected.append(workspace_name)
         except Exception as e:
             print(f"✗ Error: {e}")
 
     return all_mailboxes
 
 
-def fetch_stats_for_mailboxes(mailboxes: list, days: int = 30) -> dict:
+def fetch_stats_for_mailboxes(mailboxes: MailboxStore, days: int = 30, clients: dict = None,
+                              not_collected: list = None) -> dict:
     """
     Fetch time-filtered stats for all mailboxes
 
+    Groups not fetched (run deadline or failed retries) are left out of the result and appended
+    to not_collected as "workspace/infra".
+
     Returns dict of workspace_name -> infra_type -> {sent, replied, bounced, interested}
     """
-    clients = get_all_workspace_clients()
+    if clients is None:
+        clients = get_all_workspace_clients()
 
     end_date = datetime.now()
     start_date = end_date - timedelta(days=days)
@@ -401,11 +440,7 @@ def fetch_stats_for_mailboxes(mailboxes: list, days: int = 30) -> dict:
     end_str = end_date.strftime("%Y-%m-%d")
 
     # Group mailboxes by workspace + infra
-    workspace_infra_mailboxes = defaultdict(lambda: defaultdict(list))
-    for mb in mailboxes:
-        workspace = mb["workspace_name"]
-        infra = mb["infra_type"]
-        workspace_infra_mailboxes[workspace][infra].append(mb)
+    workspace_infra_mailboxes = group_workspace_infra(mailboxes)
 
     stats_by_workspace_infra = defaultdict(lambda: defaultdict(dict))
 
@@ -417,7 +452,7 @@ def fetch_stats_for_mailboxes(mailboxes: list, days: int = 30) -> dict:
             continue
 
         for infra_type, mb_list in infra_groups.items():
-            mailbox_ids = [mb["external_id"] for mb in mb_list if mb.get("external_id")]
+            mailbox_ids = [mb.external_id for mb in mb_list if mb.external_id]
 
             print(f"  {workspace_name}/{infra_type}: {len(mailbox_ids)} mailboxes...", end=" ", flush=True)
 
@@ -431,6 +466,10 @@ def fetch_stats_for_mailboxes(mailboxes: list, days: int = 30) -> dict:
                     "mailbox_count": len(mb_list),
                 }
                 print(f"✓ sent={stats.get('sent', 0)}")
+            except NotCollected as e:
+                print(f"✗ Not collected: {e}")
+                if not_collected is not None:
+                    not_collected.append(f"{workspace_name}/{infra_type}")
             except Exception as e:
                 print(f"✗ {e}")
                 stats_by_workspace_infra[workspace_name][infra_type] = {
@@ -441,69 +480,102 @@ def fetch_stats_for_mailboxes(mailboxes: list, days: int = 30) -> dict:
     return dict(stats_by_workspace_infra)
 
 
-def aggregate_by_domain(mailboxes: list, stats_by_workspace_infra: dict) -> list:
-    """
-    Aggregate mailbox data by domain for daily_domain_stats
+def group_workspace_infra(mailboxes: MailboxStore) -> dict:
+    """Group mailboxes as {workspace_name: {infra_type: [mailbox, ...]}} (views, built once per store)"""
+    return mailboxes.nested("workspace_name", "infra_type")
 
-    Distributes stats proportionally based on mailbox count per domain
+
+def build_group_index(workspace_infra_mailboxes: dict) -> dict:
     """
-    # Group mailboxes by domain + workspace
-    domain_groups = defaultdict(lambda: {
-        "workspace_name": None,
-        "infra_type": None,
-        "tld": None,
-        "mailboxes": [],
-    })
+    Build the static per-group structures used to aggregate many dates at once
+
+    Groups are workspace + infra (in iteration order). The allocation
+    membership maps each group's domains to deduplicated
+    (domain, workspace_name) keys (one daily_domain_stats row each).
+
+    Returns:
+        {
+            "groups": [{workspace_name, infra_type, mailbox_count, domain_count,
+                        current_capacity, theoretical_max, in_warmup}, ...],
+            "membership": allocation.build_membership result,
+        }
+    """
+    groups = []
+    for workspace_name, infra_groups in workspace_infra_mailboxes.items():
+        for infra_type, mb_list in infra_groups.items():
+            mailbox_count = len(mb_list)
+            groups.append({
+                "workspace_name": workspace_name,
+                "infra_type": infra_type,
+                "mailbox_count": mailbox_count,
+                "domain_count": len(set(mb.domain for mb in mb_list if mb.domain)),
+                "current_capacity": sum(mb.daily_limit for mb in mb_list),
+                "theoretical_max": mailbox_count * INFRA_MAX_LIMITS.get(infra_type, 10),
+                "in_warmup": sum(1 for mb in mb_list if mb.warmup_enabled),
+            })
 
-    for mb in mailboxes:
-        key = (mb["domain"], mb["workspace_name"])
-        group = domain_groups[key]
-        group["workspace_name"] = mb["workspace_name"]
-        group["infra_type"] = mb["infra_type"]
-        group["tld"] = mb["tld"]
-        group["mailboxes"].append(mb)
-
-    domain_stats = []
-    today = datetime.now().strftime("%Y-%m-%d")
+    return {"groups": groups, "membership": build_membership(workspace_infra_mailboxes)}
+
+
+def group_stats_matrix(groups: list, daily_stats: dict, dates: list) -> np.ndarray:
+    """Daily stats as a float array of shape (dates, groups, METRICS)"""
+    stats = np.zeros((len(dates), len(groups), len(METRICS)), dtype=np.float64)
+    for gi, group in enumerate(groups):
+        by_date = daily_stats.get(group["workspace_name"], {}).get(group["infra_type"], {})
+        for di, target_date in enumerate(dates):
+            date_stats = by_date.get(target_date)
+            if date_stats:
+                stats[di, gi] = [date_stats.get(m, 0) for m in METRICS]
+    return stats
 
-    for (domain, workspace), group in domain_groups.items():
-        if not domain:
-            continue
 
-        infra_type = group["infra_type"]
-        workspace_name = group["workspace_name"]
-        mb_count = len(group["mailboxes"])
+def group_totals_matrix(groups: list, stats_by_workspace_infra: dict, days: int = 1) -> np.ndarray:
+    """Period stats (optionally averaged per day) as a float array of shape (1, groups, METRICS)"""
+    stats = np.zeros((1, len(groups), len(METRICS)), dtype=np.float64)
+    for gi, group in enumerate(groups):
+        ws_stats = stats_by_workspace_infra.get(group["workspace_name"], {}).get(group["infra_type"], {})
+        stats[0, gi] = [ws_stats.get(m, 0) / days for m in METRICS]
+    return stats
 
-        # Get stats for this workspace+infra
-        ws_stats = stats_by_workspace_infra.get(workspace_name, {}).get(infra_type, {})
-        total_mb_in_group = ws_stats.get("mailbox_count", 1)
 
-        # Calculate proportional stats
-        ratio = mb_count / total_mb_in_group if total_mb_in_group > 0 else 0
+def rate_matrix(stats: np.ndarray) -> np.ndarray:
+    """reply/bounce/positive rates (%) over the last axis of a (..., METRICS) array; 0 where sent is 0"""
+    sent = stats[..., 0:1]
+    rates = np.zeros(stats.shape[:-1] + (3,), dtype=np.float64)
+    np.divide(stats[..., 1:4], sent, out=rates, where=sent > 0)
+    return rates * 100
 
-        sent = round(ws_stats.get("sent", 0) * ratio)
-        replied = round(ws_stats.get("replied", 0) * ratio)
-        bounced = round(ws_stats.get("bounced", 0) * ratio)
-        interested = round(ws_stats.get("interested", 0) * ratio)
 
-        # Calculate rates
-        reply_rate = round(replied / sent * 100, 4) if sent > 0 else 0
-        bounce_rate = round(bounced / sent * 100, 4) if sent > 0 else 0
+def _record_rates(sent: int, rates: list) -> tuple:
+    """Round precomputed rates the way the per-record code does (plain 0 when nothing was sent)"""
+    if sent <= 0:
+        return 0, 0, 0
+    return tuple(round(r, 4) for r in rates)
 
-        # Find oldest mailbox created_at for domain age
-        oldest_date = None
-        for mb in group["mailboxes"]:
-            mb_created = mb.get("created_at")
-            if mb_created:
-                if oldest_date is None or mb_created < oldest_date:
-                    oldest_date = mb_created
 
-        domain_stats.append({
-            "date": today,
+def domain_records(membership: dict, domain_values: np.ndarray, target_date: str) -> list:
+    """
+    daily_domain_stats records for one date
+
+    Args:
+        membership: allocation membership (domain keys and mailbox counts)
+        domain_values: array (domain_keys, METRICS) from the allocation kernel
+        target_date: YYYY-MM-DD
+    """
+    records = []
+    rates = rate_matrix(domain_values).tolist()
+    for key, mb_count, values, key_rates in zip(membership["domain_keys"],
+                                                membership["domain_mailbox_counts"].tolist(),
+                                                domain_values.tolist(), rates):
+        domain, workspace_name, infra_type, tld = key
+        sent, replied, bounced, interested = (int(v) for v in values)
+        reply_rate, bounce_rate, _ = _record_rates(sent, key_rates)
+        records.append({
+            "date": target_date,
             "domain": domain,
             "workspace_name": workspace_name,
             "infra_type": infra_type,
-            "tld": group["tld"],
+            "tld": tld,
             "mailbox_count": mb_count,
             "emails_sent": sent,
             "replies": replied,
@@ -511,13 +583,155 @@ def aggregate_by_domain(mailboxes: list, stats_by_workspace_infra: dict) -> list
             "interested": interested,
             "reply_rate": reply_rate,
             "bounce_rate": bounce_rate,
-            "oldest_mailbox_date": oldest_date,
         })
+    return records
+
 
+def infra_records(groups: list, values: np.ndarray, rates: np.ndarray, target_date: str) -> list:
+    """
+    daily_infra_stats records for one date
+
+    Args:
+        groups: build_group_index groups
+        values: array (groups, METRICS) of that date's stats
+        rates: rate_matrix(values)
+        target_date: YYYY-MM-DD
+    """
+    records = []
+    for group, group_values, group_rates in zip(groups, values.tolist(), rates.tolist()):
+        sent, replied, bounced, interested = (int(v) for v in group_values)
+        reply_rate, bounce_rate, positive_rate = _record_rates(sent, group_rates)
+        records.append({
+            "date": target_date,
+            "workspace_name": group["workspace_name"],
+            "infra_type": group["infra_type"],
+            "mailbox_count": group["mailbox_count"],
+            "domain_count": group["domain_count"],
+            "emails_sent": sent,
+            "replies": replied,
+            "bounces": bounced,
+            "interested": interested,
+            "current_capacity": group["current_capacity"],
+            "theoretical_max": group["theoretical_max"],
+            "in_warmup": group["in_warmup"],
+            "reply_rate": reply_rate,
+            "bounce_rate": bounce_rate,
+            "positive_rate": positive_rate,
+        })
+    return records
+
+
+def backfill_records(groups: list, membership: dict, stats: np.ndarray, dates: list) -> list:
+    """
+    (date, daily_infra_stats records, daily_domain_stats records) for each date of a stats chunk
+
+    Allocation is per date and group, so any split of the dates gives the same records.
+    """
+    # Vectorized across the chunk: proportional domain split with (domain, workspace) dedupe, rates
+    domain_values = rollup(allocate(stats, membership), membership, "domain")
+    rates = rate_matrix(stats)
+    return [
+        (target_date,
+         infra_records(groups, stats[di], rates[di], target_date),
+         # One record per (domain, workspace_name) - duplicates across infra groups already merged
+         domain_records(membership, domain_values[di], target_date))
+        for di, target_date in enumerate(dates)
+    ]
+
+
+# Process-pool backfill: each worker memory-maps the stats array and gets the index once
+_backfill_worker = {}
+
+
+def _init_backfill_worker(stats_path: str, groups: list, membership: dict, dates: list) -> None:
+    _backfill_worker.update(stats=np.load(stats_path, mmap_mode="r"), groups=groups,
+                            membership=membership, dates=dates)
+
+
+def _backfill_chunk(bounds: tuple) -> list:
+    lo, hi = bounds
+    w = _backfill_worker
+    return backfill_records(w["groups"], w["membership"], np.array(w["stats"][lo:hi]), w["dates"][lo:hi])
+
+
+def iter_backfill_records(groups: list, membership: dict, stats: np.ndarray, dates: list,
+                          processes: int = 1, chunk_days: int = BACKFILL_CHUNK_DAYS):
+    """
+    Yield (date, infra records, domain records) in dates order, chunk by chunk
+
+    With processes > 1, chunks are aggregated on a process pool: the stats
+    array is shared read-only as a memory-mapped .npy file, and results are
+    streamed back in order while later chunks are still running. Closing the
+    generator early (e.g. at a deadline) cancels chunks that have not started.
+    """
+    chunks = [(lo, min(lo + chunk_days, len(dates))) for lo in range(0, len(dates), chunk_days)]
+    if processes <= 1 or len(chunks) <= 1:
+        for lo, hi in chunks:
+            yield from backfill_records(groups, membership, stats[lo:hi], dates[lo:hi])
+        return
+
+    fd, stats_path = tempfile.mkstemp(suffix=".npy")
+    os.close(fd)
+    pool = None
+    try:
+        np.save(stats_path, stats)
+        pool = ProcessPoolExecutor(max_workers=processes, initializer=_init_backfill_worker,
+                                   initargs=(stats_path, groups, membership, dates))
+        for chunk in pool.map(_backfill_chunk, chunks):
+            yield from chunk
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+        os.remove(stats_path)
+
+
+def label_last_seen(domain_stats: list, mailboxes: MailboxStore) -> list:
+    """
+    Label domain rows with the infra_type and tld of the domain's last mailbox
+
+    The kernel labels a (domain, workspace) row with its first-seen group (as
+    the daily backfill always has); the snapshot paths label with the last
+    mailbox seen, which is kept here.
+    """
+    last_seen = {(mb.domain, mb.workspace_name): mb for mb in mailboxes}
+    for record in domain_stats:
+        mb = last_seen[(record["domain"], record["workspace_name"])]
+        record["infra_type"] = mb.infra_type
+        record["tld"] = mb.tld
     return domain_stats
 
 
-def aggregate_by_infra(mailboxes: list, stats_by_workspace_infra: dict) -> list:
+def aggregate_by_domain(mailboxes: MailboxStore, stats_by_workspace_infra: dict) -> list:
+    """
+    Aggregate mailbox data by domain for daily_domain_stats
+
+    Distributes each workspace + infra group's stats across its domains by
+    mailbox count (largest-remainder rounding, so domains add up to the group),
+    then sums per (domain, workspace_name). Rows are labelled with the infra
+    type and TLD of the domain's last mailbox.
+    """
+    index = build_group_index(group_workspace_infra(mailboxes))
+    membership = index["membership"]
+    totals = group_totals_matrix(index["groups"], stats_by_workspace_infra)
+    domain_values = rollup(allocate(totals, membership), membership, "domain")[0]
+
+    # Oldest mailbox created_at per domain, for domain age
+    oldest_dates = {}
+    for mb in mailboxes:
+        mb_created = mb.created_at
+        key = (mb.domain, mb.workspace_name)
+        if mb_created and (key not in oldest_dates or mb_created < oldest_dates[key]):
+            oldest_dates[key] = mb_created
+
+    today = datetime.now().strftime("%Y-%m-%d")
+    domain_stats = label_last_seen(domain_records(membership, domain_values, today), mailboxes)
+    for record in domain_stats:
+        record["oldest_mailbox_date"] = oldest_dates.get((record["domain"], record["workspace_name"]))
+
+    return domain_stats
+
+
+def aggregate_by_infra(mailboxes: MailboxStore, stats_by_workspace_infra: dict) -> list:
     """
     Aggregate data by workspace + infra type for daily_infra_stats
     """
@@ -525,23 +739,21 @@ def aggregate_by_infra(mailboxes: list, stats_by_workspace_infra: dict) -> list:
     infra_stats = []
 
     # Group mailboxes by workspace + infra
-    workspace_infra_groups = defaultdict(lambda: defaultdict(list))
-    for mb in mailboxes:
-        workspace_infra_groups[mb["workspace_name"]][mb["infra_type"]].append(mb)
+    workspace_infra_groups = group_workspace_infra(mailboxes)
 
     for workspace_name, infra_groups in workspace_infra_groups.items():
         for infra_type, mb_list in infra_groups.items():
             # Calculate counts
             mailbox_count = len(mb_list)
-            domains = set(mb["domain"] for mb in mb_list if mb["domain"])
+            domains = set(mb.domain for mb in mb_list if mb.domain)
             domain_count = len(domains)
 
             # Calculate capacity
-            current_capacity = sum(mb.get("daily_limit", 0) for mb in mb_list)
+            current_capacity = sum(mb.daily_limit for mb in mb_list)
             theoretical_max = mailbox_count * INFRA_MAX_LIMITS.get(infra_type, 10)
 
             # Count warmup status
-            in_warmup = sum(1 for mb in mb_list if mb.get("warmup_enabled", False))
+            in_warmup = sum(1 for mb in mb_list if mb.warmup_enabled)
 
             # Get stats
             ws_stats = stats_by_workspace_infra.get(workspace_name, {}).get(infra_type, {})
@@ -576,74 +788,102 @@ def aggregate_by_infra(mailboxes: list, stats_by_workspace_infra: dict) -> list:
     return infra_stats
 
 
-def collect_and_store():
-    """
-    Main collection function - fetches all data and stores in Supabase
-    """
-    print("=" * 80)
-    print("RGL Infra Data Collector")
-    print(f"Started at: {datetime.now().isoformat()}")
-    print("=" * 80)
+def collected_mailboxes(mailboxes: MailboxStore, stats_by_workspace_infra: dict) -> MailboxStore:
+    """Mailboxes whose workspace/infra group has stats (drops groups that were not collected)"""
+    return mailboxes.filter(
+        lambda mb: mb.infra_type in stats_by_workspace_infra.get(mb.workspace_name, {}))
 
-    # Step 1: Fetch all mailboxes with warmup details
-    mailboxes = fetch_all_mailboxes_with_details()
-    print(f"\nTotal tracked mailboxes: {len(mailboxes)}")
 
-    # Step 2: Fetch time-filtered stats (last 30 days for current snapshot)
-    stats_by_workspace_infra = fetch_stats_for_mailboxes(mailboxes, days=30)
+def run_result(not_collected_workspaces: list, not_collected_groups: list,
+               not_collected_dates: list = None) -> dict:
+    """Structured completion status for a collection run"""
+    not_collected = {
+        "workspaces": not_collected_workspaces,
+        "groups": not_collected_groups,
+        "dates": not_collected_dates or [],
+    }
+    partial = any(not_collected.values())
+    return {"status": "partial" if partial else "complete", "not_collected": not_collected}
 
-    # Step 3: Store mailbox_snapshots with all-time cumulative stats from API
+
+def store_collection(mailboxes: MailboxStore, stats_by_workspace_infra: dict) -> tuple[list, list]:
+    """
+    Store a collection pass in Supabase: mailbox_snapshots, daily_infra_stats, daily_domain_stats
+
+    Returns (infra_stats, domain_stats) records that were upserted
+    """
+    # Store mailbox_snapshots with all-time cumulative stats from API
     # Deduplicate by email — same email can appear in multiple workspaces
     print("\n" + "-" * 40)
     print("Storing mailbox_snapshots (all-time cumulative stats)...")
 
     snapshot_map = {}
     for mb in mailboxes:
-        mb["updated_at"] = datetime.now().isoformat()
-        email = mb.get("email", "")
-        if email not in snapshot_map or (mb.get("emails_sent", 0) or 0) > (snapshot_map[email].get("emails_sent", 0) or 0):
-            snapshot_map[email] = mb
+        snap = mb.snapshot_row()
+        snap["updated_at"] = datetime.now().isoformat()
+        email = snap["email"]
+        if email not in snapshot_map or (snap["emails_sent"] or 0) > (snapshot_map[email]["emails_sent"] or 0):
+            snapshot_map[email] = snap
     snapshot_data = list(snapshot_map.values())
     print(f"  Deduped {len(mailboxes)} -> {len(snapshot_data)} unique emails")
 
     result = supabase_upsert("mailbox_snapshots", snapshot_data, on_conflict="email")
     print(f"  mailbox_snapshots: {result}")
 
-    # Step 4: Aggregate and store daily_infra_stats
+    # Aggregate and store daily_infra_stats
     print("\nStoring daily_infra_stats...")
     infra_stats = aggregate_by_infra(mailboxes, stats_by_workspace_infra)
     result = supabase_upsert("daily_infra_stats", infra_stats, on_conflict="date,workspace_name,infra_type")
     print(f"  daily_infra_stats: {result}")
 
-    # Step 5: Aggregate and store daily_domain_stats
+    # Aggregate and store daily_domain_stats
     print("\nStoring daily_domain_stats...")
     domain_stats = aggregate_by_domain(mailboxes, stats_by_workspace_infra)
-    # Deduplicate by (date, domain, workspace_name)
-    domain_key_map = {}
-    for ds in domain_stats:
-        key = (ds["date"], ds["domain"], ds["workspace_name"])
-        if key not in domain_key_map:
-            domain_key_map[key] = ds.copy()
-        else:
-            existing = domain_key_map[key]
-            existing["mailbox_count"] += ds["mailbox_count"]
-            existing["emails_sent"] += ds["emails_sent"]
-            existing["replies"] += ds["replies"]
-            existing["bounces"] += ds["bounces"]
-            existing["interested"] += ds["interested"]
-            if existing["emails_sent"] > 0:
-                existing["reply_rate"] = round(existing["replies"] / existing["emails_sent"] * 100, 4)
-                existing["bounce_rate"] = round(existing["bounces"] / existing["emails_sent"] * 100, 4)
-    domain_stats = list(domain_key_map.values())
     result = supabase_upsert("daily_domain_stats", domain_stats, on_conflict="date,domain,workspace_name")
     print(f"  daily_domain_stats: {result}")
 
+    return infra_stats, domain_stats
+
+
+def collect_and_store(deadline: Deadline = None):
+    """
+    Main collection function - fetches all data and stores in Supabase
+
+    Args:
+        deadline: Optional run-wide Deadline. When it runs short, remaining API
+            calls are skipped, everything already fetched is still stored, and
+            the result lists what was not collected.
+    """
+    print("=" * 80)
+    print("RGL Infra Data Collector")
+    print(f"Started at: {datetime.now().isoformat()}")
+    print("=" * 80)
+
+    clients = get_all_workspace_clients(deadline)
+    skipped_workspaces, skipped_groups = [], []
+
+    # Step 1: Fetch all mailboxes with warmup details
+    mailboxes = fetch_all_mailboxes_with_details(clients, not_collected=skipped_workspaces)
+    print(f"\nTotal tracked mailboxes: {len(mailboxes)}")
+
+    # Step 2: Fetch time-filtered stats (last 30 days for current snapshot)
+    stats_by_workspace_infra = fetch_stats_for_mailboxes(mailboxes, days=30, clients=clients,
+                                                         not_collected=skipped_groups)
+    if skipped_groups:
+        mailboxes = collected_mailboxes(mailboxes, stats_by_workspace_infra)
+
+    # Steps 3-5: Store mailbox_snapshots, daily_infra_stats, daily_domain_stats
+    infra_stats, domain_stats = store_collection(mailboxes, stats_by_workspace_infra)
+    status = run_result(skipped_workspaces, skipped_groups)
+
     # Summary
     print("\n" + "=" * 80)
     print("Collection Complete!")
     print(f"  Mailboxes: {len(mailboxes)}")
     print(f"  Infra stats records: {len(infra_stats)}")
     print(f"  Domain stats records: {len(domain_stats)}")
+    if status["status"] == "partial":
+        print(f"  PARTIAL - not collected: {status['not_collected']}")
     print(f"Finished at: {datetime.now().isoformat()}")
     print("=" * 80)
 
@@ -651,6 +891,169 @@ def collect_and_store():
         "mailboxes": len(mailboxes),
         "infra_stats": len(infra_stats),
         "domain_stats": len(domain_stats),
+        **status,
+    }
+
+
+def load_collect_cursor(run_date: str) -> dict:
+    """Fetch the saved chunked-collection state for run_date from collector_runs (or {})."""
+    url = (f"{SUPABASE_URL}/rest/v1/collector_runs"
+           f"?run_date=eq.{run_date}&select=*")
+    headers = {
+        "apikey": SUPABASE_KEY,
+        "Authorization": f"Bearer {SUPABASE_KEY}",
+        "Accept": "application/json",
+    }
+    try:
+        resp = requests.get(url, headers=headers, timeout=10)
+        resp.raise_for_status()
+        data = resp.json()
+        return data[0] if data else {}
+    except Exception as e:
+        print(f"  Warning: could not load collector cursor: {e}")
+        return {}
+
+
+def _seconds_since_update(state: dict) -> float:
+    """Seconds since a collector_runs row was last saved (inf if unknown)"""
+    updated_at = state.get("updated_at")
+    if not updated_at:
+        return float("inf")
+    try:
+        updated = datetime.fromisoformat(updated_at.replace("Z", "+00:00"))
+    except ValueError:
+        return float("inf")
+    if updated.tzinfo is None:
+        # collector_runs timestamps are TIMESTAMPTZ; a bare one is UTC
+        updated = updated.replace(tzinfo=timezone.utc)
+    return (datetime.now(timezone.utc) - updated).total_seconds()
+
+
+def bump_data_generation(source: str) -> dict:
+    """
+    Record that source rewrote stored rows (one data_generations row per source).
+
+    Writers without a collector_runs row (the backfill, the pipeline's
+    Supabase sink) call this so the server's query caches are dropped on
+    their next generation check (query_layer.check_generation).
+    """
+    row = {"source": source, "updated_at": datetime.now(timezone.utc).isoformat()}
+    return supabase_upsert("data_generations", [row], on_conflict="source")
+
+
+def save_collect_cursor(state: dict) -> dict:
+    """Upsert chunked-collection state (one row per run_date) into collector_runs."""
+    state = dict(state, updated_at=datetime.now(timezone.utc).isoformat())
+    return supabase_upsert("collector_runs", [state], on_conflict="run_date")
+
+
+def collect_chunk(cursor: int = None, max_workspaces: int = COLLECT_CHUNK_WORKSPACES,
+                  run_date: str = None, deadline: Deadline = None) -> dict:
+    """
+    Collect and store a bounded slice of workspaces, then save the cursor.
+
+    The run's workspace order (sorted names at the start of the run) is saved
+    in collector_runs and cursor is an index into it, so workspaces added or
+    deactivated mid-run don't shift later slices: new ones wait for the next
+    run, deactivated ones are skipped. Each workspace's rows are keyed by
+    workspace_name, so slices are independent and a run can resume from the
+    saved cursor. Snapshot dedupe by email only applies within a slice. If the
+    deadline cuts the slice short, the cursor stops at the first workspace not
+    fully collected so the next call redoes it (upserts are idempotent).
+
+    Called without a cursor (the cron), a running run is only resumed once its
+    cursor is older than COLLECT_RESUME_AFTER_SECONDS, so a live self-chain is
+    left alone and a broken one is picked up.
+
+    Args:
+        cursor: Index of the first workspace to collect (default: resume saved cursor)
+        max_workspaces: Number of workspaces to collect in this call
+        run_date: Run identifier, YYYY-MM-DD (default: today)
+        deadline: Optional Deadline for this invocation
+
+    Returns dict with progress, next_cursor and done flag
+    """
+    run_date = run_date or datetime.now().strftime("%Y-%m-%d")
+    state = load_collect_cursor(run_date)
+
+    if cursor is None:
+        saved_cursor = state.get("cursor", 0) or 0
+        if state.get("status") == "done":
+            return {
+                "run_date": run_date,
+                "done": True,
+                "cursor": saved_cursor,
+                "next_cursor": None,
+                "total_workspaces": state.get("total_workspaces", 0),
+                "workspaces": [],
+                "message": "Collection already complete for this run",
+            }
+        if state.get("status") == "running" and _seconds_since_update(state) < COLLECT_RESUME_AFTER_SECONDS:
+            return {
+                "run_date": run_date,
+                "done": False,
+                "cursor": saved_cursor,
+                "next_cursor": saved_cursor,
+                "total_workspaces": state.get("total_workspaces", 0),
+                "workspaces": [],
+                "message": "A chained slice is still running for this run",
+            }
+        cursor = saved_cursor
+
+    clients = get_all_workspace_clients(deadline)
+    names = (state.get("workspace_order") if cursor > 0 else None) or sorted(clients.keys())
+    batch = names[cursor:cursor + max_workspaces]
+
+    print(f"Chunked collection {run_date}: workspaces {cursor}-{cursor + len(batch) - 1} of {len(names)}")
+
+    infra_stats, domain_stats, mailboxes = [], [], MailboxStore()
+    skipped_workspaces, skipped_groups = [], []
+    batch_clients = {name: clients[name] for name in batch if name in clients}
+    for name in batch:
+        if name not in batch_clients:
+            print(f"  {name}: no longer active - skipped")
+    if batch_clients:
+        mailboxes = fetch_all_mailboxes_with_details(batch_clients, not_collected=skipped_workspaces)
+        stats_by_workspace_infra = fetch_stats_for_mailboxes(mailboxes, days=30, clients=batch_clients,
+                                                             not_collected=skipped_groups)
+        if skipped_groups:
+            mailboxes = collected_mailboxes(mailboxes, stats_by_workspace_infra)
+        infra_stats, domain_stats = store_collection(mailboxes, stats_by_workspace_infra)
+
+    status = run_result(skipped_workspaces, skipped_groups)
+    incomplete = set(skipped_workspaces) | {g.rsplit("/", 1)[0] for g in skipped_groups}
+    next_cursor = cursor + len(batch)
+    for offset, name in enumerate(batch):
+        if name in incomplete:
+            next_cursor = cursor + offset
+            break
+    done = next_cursor >= len(names)
+
+    # Counts are cumulative across the run; a restarted run starts from zero
+    carry = state if cursor > 0 else {}
+    save_collect_cursor({
+        "run_date": run_date,
+        "cursor": next_cursor,
+        "workspace_order": names,
+        "total_workspaces": len(names),
+        "status": "done" if done else "running",
+        "mailboxes": (carry.get("mailboxes") or 0) + len(mailboxes),
+        "infra_stats": (carry.get("infra_stats") or 0) + len(infra_stats),
+        "domain_stats": (carry.get("domain_stats") or 0) + len(domain_stats),
+        "finished_at": datetime.now(timezone.utc).isoformat() if done else None,
+    })
+
+    return {
+        "run_date": run_date,
+        "done": done,
+        "cursor": cursor,
+        "next_cursor": None if done else next_cursor,
+        "total_workspaces": len(names),
+        "workspaces": batch,
+        "mailboxes": len(mailboxes),
+        "infra_stats": len(infra_stats),
+        "domain_stats": len(domain_stats),
+        **status,
     }
 
 
@@ -680,23 +1083,6 @@ def collect_for_date(target_date: str, days_back: int = 7):
     # Step 4: Aggregate and store daily_domain_stats for target_date
     print(f"\nStoring daily_domain_stats for {target_date}...")
     domain_stats = aggregate_by_domain_for_date(mailboxes, stats_by_workspace_infra, target_date, days_back)
-    # Deduplicate by (date, domain, workspace_name)
-    domain_key_map = {}
-    for ds in domain_stats:
-        key = (ds["date"], ds["domain"], ds["workspace_name"])
-        if key not in domain_key_map:
-            domain_key_map[key] = ds.copy()
-        else:
-            existing = domain_key_map[key]
-            existing["mailbox_count"] += ds["mailbox_count"]
-            existing["emails_sent"] += ds["emails_sent"]
-            existing["replies"] += ds["replies"]
-            existing["bounces"] += ds["bounces"]
-            existing["interested"] += ds["interested"]
-            if existing["emails_sent"] > 0:
-                existing["reply_rate"] = round(existing["replies"] / existing["emails_sent"] * 100, 4)
-                existing["bounce_rate"] = round(existing["bounces"] / existing["emails_sent"] * 100, 4)
-    domain_stats = list(domain_key_map.values())
     result = supabase_upsert("daily_domain_stats", domain_stats, on_conflict="date,domain,workspace_name")
     print(f"  daily_domain_stats: {result}")
 
@@ -707,7 +1093,7 @@ def collect_for_date(target_date: str, days_back: int = 7):
     print("=" * 80)
 
 
-def aggregate_by_infra_for_date(mailboxes: list, stats_by_workspace_infra: dict, target_date: str, days: int) -> list:
+def aggregate_by_infra_for_date(mailboxes: MailboxStore, stats_by_workspace_infra: dict, target_date: str, days: int) -> list:
     """
     Aggregate data by workspace + infra type for a specific date
     Divides cumulative stats by number of days to get daily average
@@ -715,19 +1101,17 @@ def aggregate_by_infra_for_date(mailboxes: list, stats_by_workspace_infra: dict,
     infra_stats = []
 
     # Group mailboxes by workspace + infra
-    workspace_infra_groups = defaultdict(lambda: defaultdict(list))
-    for mb in mailboxes:
-        workspace_infra_groups[mb["workspace_name"]][mb["infra_type"]].append(mb)
+    workspace_infra_groups = group_workspace_infra(mailboxes)
 
     for workspace_name, infra_groups in workspace_infra_groups.items():
         for infra_type, mb_list in infra_groups.items():
             mailbox_count = len(mb_list)
-            domains = set(mb["domain"] for mb in mb_list if mb["domain"])
+            domains = set(mb.domain for mb in mb_list if mb.domain)
             domain_count = len(domains)
 
-            current_capacity = sum(mb.get("daily_limit", 0) for mb in mb_list)
+            current_capacity = sum(mb.daily_limit for mb in mb_list)
             theoretical_max = mailbox_count * INFRA_MAX_LIMITS.get(infra_type, 10)
-            in_warmup = sum(1 for mb in mb_list if mb.get("warmup_enabled", False))
+            in_warmup = sum(1 for mb in mb_list if mb.warmup_enabled)
 
             ws_stats = stats_by_workspace_infra.get(workspace_name, {}).get(infra_type, {})
 
@@ -762,74 +1146,31 @@ def aggregate_by_infra_for_date(mailboxes: list, stats_by_workspace_infra: dict,
     return infra_stats
 
 
-def aggregate_by_domain_for_date(mailboxes: list, stats_by_workspace_infra: dict, target_date: str, days: int) -> list:
+def aggregate_by_domain_for_date(mailboxes: MailboxStore, stats_by_workspace_infra: dict, target_date: str, days: int) -> list:
     """
     Aggregate mailbox data by domain for a specific date
+    Group stats are divided by days, then split across domains by mailbox count
+    (rows labelled with the last mailbox's infra type and TLD)
     """
-    domain_groups = defaultdict(lambda: {
-        "workspace_name": None,
-        "infra_type": None,
-        "tld": None,
-        "mailboxes": [],
-    })
-
-    for mb in mailboxes:
-        key = (mb["domain"], mb["workspace_name"])
-        group = domain_groups[key]
-        group["workspace_name"] = mb["workspace_name"]
-        group["infra_type"] = mb["infra_type"]
-        group["tld"] = mb["tld"]
-        group["mailboxes"].append(mb)
-
-    domain_stats = []
-
-    for (domain, workspace), group in domain_groups.items():
-        if not domain:
-            continue
-
-        infra_type = group["infra_type"]
-        workspace_name = group["workspace_name"]
-        mb_count = len(group["mailboxes"])
-
-        ws_stats = stats_by_workspace_infra.get(workspace_name, {}).get(infra_type, {})
-        total_mb_in_group = ws_stats.get("mailbox_count", 1)
-
-        ratio = mb_count / total_mb_in_group if total_mb_in_group > 0 else 0
-
-        # Get proportional stats and divide by days
-        sent = round(ws_stats.get("sent", 0) * ratio / days)
-        replied = round(ws_stats.get("replied", 0) * ratio / days)
-        bounced = round(ws_stats.get("bounced", 0) * ratio / days)
-        interested = round(ws_stats.get("interested", 0) * ratio / days)
-
-        reply_rate = round(replied / sent * 100, 4) if sent > 0 else 0
-        bounce_rate = round(bounced / sent * 100, 4) if sent > 0 else 0
-
-        domain_stats.append({
-            "date": target_date,
-            "domain": domain,
-            "workspace_name": workspace_name,
-            "infra_type": infra_type,
-            "tld": group["tld"],
-            "mailbox_count": mb_count,
-            "emails_sent": sent,
-            "replies": replied,
-            "bounces": bounced,
-            "interested": interested,
-            "reply_rate": reply_rate,
-            "bounce_rate": bounce_rate,
-        })
-
-    return domain_stats
+    index = build_group_index(group_workspace_infra(mailboxes))
+    membership = index["membership"]
+    totals = group_totals_matrix(index["groups"], stats_by_workspace_infra, days)
+    domain_values = rollup(allocate(totals, membership), membership, "domain")[0]
+    return label_last_seen(domain_records(membership, domain_values, target_date), mailboxes)
 
 
-def fetch_daily_stats_for_mailboxes(mailboxes: list, days: int = 14) -> dict:
+def fetch_daily_stats_for_mailboxes(mailboxes: MailboxStore, days: int = 14, clients: dict = None,
+                                    not_collected: list = None) -> dict:
     """
     Fetch REAL daily time-series stats for all mailboxes.
 
+    Groups not fetched (run deadline or failed retries) are left out of the result and appended
+    to not_collected as "workspace/infra".
+
     Returns dict of workspace_name -> infra_type -> date -> {sent, replied, bounced, interested}
     """
-    clients = get_all_workspace_clients()
+    if clients is None:
+        clients = get_all_workspace_clients()
 
     end_date = datetime.now()
     start_date = end_date - timedelta(days=days)
@@ -837,11 +1178,7 @@ def fetch_daily_stats_for_mailboxes(mailboxes: list, days: int = 14) -> dict:
     end_str = end_date.strftime("%Y-%m-%d")
 
     # Group mailboxes by workspace + infra
-    workspace_infra_mailboxes = defaultdict(lambda: defaultdict(list))
-    for mb in mailboxes:
-        workspace = mb["workspace_name"]
-        infra = mb["infra_type"]
-        workspace_infra_mailboxes[workspace][infra].append(mb)
+    workspace_infra_mailboxes = group_workspace_infra(mailboxes)
 
     # Result: workspace -> infra -> date -> stats
     daily_stats = defaultdict(lambda: defaultdict(dict))
@@ -854,7 +1191,7 @@ def fetch_daily_stats_for_mailboxes(mailboxes: list, days: int = 14) -> dict:
             continue
 
         for infra_type, mb_list in infra_groups.items():
-            mailbox_ids = [mb["external_id"] for mb in mb_list if mb.get("external_id")]
+            mailbox_ids = [mb.external_id for mb in mb_list if mb.external_id]
 
             print(f"  {workspace_name}/{infra_type}: {len(mailbox_ids)} mailboxes...", end=" ", flush=True)
 
@@ -864,6 +1201,10 @@ def fetch_daily_stats_for_mailboxes(mailboxes: list, days: int = 14) -> dict:
                 daily_stats[workspace_name][infra_type] = date_stats
                 total_sent = sum(d.get("sent", 0) for d in date_stats.values())
                 print(f"✓ {len(date_stats)} days, total_sent={total_sent}")
+            except NotCollected as e:
+                print(f"✗ Not collected: {e}")
+                if not_collected is not None:
+                    not_collected.append(f"{workspace_name}/{infra_type}")
             except Exception as e:
                 print(f"✗ {e}")
                 daily_stats[workspace_name][infra_type] = {}
@@ -871,7 +1212,8 @@ def fetch_daily_stats_for_mailboxes(mailboxes: list, days: int = 14) -> dict:
     return dict(daily_stats)
 
 
-def backfill_with_real_daily_data(n_days: int = 14, exclude_recent_days: int = 0):
+def backfill_with_real_daily_data(n_days: int = 14, exclude_recent_days: int = 0,
+                                  deadline: Deadline = None, processes: int = 1) -> dict:
     """
     Backfill data for the last N days using REAL daily values from API.
     Each day gets its actual stats, not averaged values.
@@ -879,6 +1221,12 @@ def backfill_with_real_daily_data(n_days: int = 14, exclude_recent_days: int = 0
     Args:
         n_days: Number of days to fetch data for
         exclude_recent_days: Skip the most recent N days (e.g., 2 to skip today and yesterday)
+        deadline: Optional run-wide Deadline. Groups not fetched in time are not
+            written (instead of being stored as zeros), and dates left when the
+            deadline passes are reported as not collected.
+        processes: Worker processes for the per-date aggregation (1 = in process)
+
+    Returns dict with dates stored and the run status
     """
     print("=" * 80)
     print(f"BACKFILLING LAST {n_days} DAYS WITH REAL DAILY DATA")
@@ -886,8 +1234,11 @@ def backfill_with_real_daily_data(n_days: int = 14, exclude_recent_days: int = 0
         print(f"(Excluding most recent {exclude_recent_days} days)")
     print("=" * 80)
 
+    clients = get_all_workspace_clients(deadline)
+    skipped_workspaces, skipped_groups, skipped_dates = [], [], []
+
     # First, fetch mailboxes once (includes all-time cumulative stats from API)
-    mailboxes = fetch_all_mailboxes_with_details()
+    mailboxes = fetch_all_mailboxes_with_details(clients, not_collected=skipped_workspaces)
     print(f"\nTotal tracked mailboxes: {len(mailboxes)}")
 
     # Store mailbox_snapshots with all-time cumulative stats
@@ -895,11 +1246,11 @@ def backfill_with_real_daily_data(n_days: int = 14, exclude_recent_days: int = 0
     print("\nStoring mailbox_snapshots (all-time cumulative stats)...")
     snapshot_map = {}
     for mb in mailboxes:
-        snap = mb.copy()
+        snap = mb.snapshot_row()
         snap["updated_at"] = datetime.now().isoformat()
         # Keep the last occurrence (or the one with more sends)
-        email = snap.get("email", "")
-        if email not in snapshot_map or (snap.get("emails_sent", 0) or 0) > (snapshot_map[email].get("emails_sent", 0) or 0):
+        email = snap["email"]
+        if email not in snapshot_map or (snap["emails_sent"] or 0) > (snapshot_map[email]["emails_sent"] or 0):
             snapshot_map[email] = snap
     snapshot_data = list(snapshot_map.values())
     print(f"  Deduped {len(mailboxes)} -> {len(snapshot_data)} unique emails")
@@ -907,12 +1258,13 @@ def backfill_with_real_daily_data(n_days: int = 14, exclude_recent_days: int = 0
     print(f"  mailbox_snapshots: {result}")
 
     # Fetch REAL daily stats (not cumulative) — do this BEFORE webhooks so data is stored even if job times out
-    daily_stats = fetch_daily_stats_for_mailboxes(mailboxes, days=n_days)
+    daily_stats = fetch_daily_stats_for_mailboxes(mailboxes, days=n_days, clients=clients,
+                                                  not_collected=skipped_groups)
+    if skipped_groups:
+        mailboxes = collected_mailboxes(mailboxes, daily_stats)
 
     # Group mailboxes by workspace + infra for counts
-    workspace_infra_mailboxes = defaultdict(lambda: defaultdict(list))
-    for mb in mailboxes:
-        workspace_infra_mailboxes[mb["workspace_name"]][mb["infra_type"]].append(mb)
+    workspace_infra_mailboxes = group_workspace_infra(mailboxes)
 
     # Get all dates from the data
     all_dates = set()
@@ -928,126 +1280,72 @@ def backfill_with_real_daily_data(n_days: int = 14, exclude_recent_days: int = 0
         all_dates = {d for d in all_dates if d < cutoff_date}
         print(f"After excluding recent {exclude_recent_days} days, processing {len(all_dates)} dates")
 
-    # Create records for each date
-    for target_date in sorted(all_dates, reverse=True):
-        print(f"\n--- Storing data for {target_date} ---")
+    # Static per-group structures are built once and reused for every date
+    index = build_group_index(workspace_infra_mailboxes)
+    groups = index["groups"]
+    membership = index["membership"]
+    dates = sorted(all_dates, reverse=True)
+    stats = group_stats_matrix(groups, daily_stats, dates)
+
+    # Create records for each date (newest first), aggregated in date chunks
+    records = iter_backfill_records(groups, membership, stats, dates, processes=processes)
+    for di, (target_date, infra_stats, deduplicated_domain_stats) in enumerate(records):
+        if deadline and deadline.expired():
+            skipped_dates = dates[di:]
+            print(f"\nDeadline reached - {len(skipped_dates)} dates not stored")
+            records.close()
+            break
 
-        infra_stats = []
-        domain_stats = []
-
-        for workspace_name, infra_groups in workspace_infra_mailboxes.items():
-            for infra_type, mb_list in infra_groups.items():
-                # Get daily stats for this workspace/infra/date
-                date_stats = daily_stats.get(workspace_name, {}).get(infra_type, {}).get(target_date, {})
-
-                sent = date_stats.get("sent", 0)
-                replied = date_stats.get("replied", 0)
-                bounced = date_stats.get("bounced", 0)
-                interested = date_stats.get("interested", 0)
-
-                # Calculate counts from mailboxes
-                mailbox_count = len(mb_list)
-                domains = set(mb["domain"] for mb in mb_list if mb["domain"])
-                domain_count = len(domains)
-
-                # Calculate capacity
-                current_capacity = sum(mb.get("daily_limit", 0) for mb in mb_list)
-                theoretical_max = mailbox_count * INFRA_MAX_LIMITS.get(infra_type, 10)
-                in_warmup = sum(1 for mb in mb_list if mb.get("warmup_enabled", False))
-
-                # Calculate rates
-                reply_rate = round(replied / sent * 100, 4) if sent > 0 else 0
-                bounce_rate = round(bounced / sent * 100, 4) if sent > 0 else 0
-                positive_rate = round(interested / sent * 100, 4) if sent > 0 else 0
-
-                infra_stats.append({
-                    "date": target_date,
-                    "workspace_name": workspace_name,
-                    "infra_type": infra_type,
-                    "mailbox_count": mailbox_count,
-                    "domain_count": domain_count,
-                    "emails_sent": sent,
-                    "replies": replied,
-                    "bounces": bounced,
-                    "interested": interested,
-                    "current_capacity": current_capacity,
-                    "theoretical_max": theoretical_max,
-                    "in_warmup": in_warmup,
-                    "reply_rate": reply_rate,
-                    "bounce_rate": bounce_rate,
-                    "positive_rate": positive_rate,
-                })
-
-                # Aggregate domain stats
-                domain_groups = defaultdict(list)
-                for mb in mb_list:
-                    if mb["domain"]:
-                        domain_groups[mb["domain"]].append(mb)
-
-                for domain, domain_mbs in domain_groups.items():
-                    mb_count_domain = len(domain_mbs)
-                    ratio = mb_count_domain / mailbox_count if mailbox_count > 0 else 0
-
-                    domain_sent = round(sent * ratio)
-                    domain_replied = round(replied * ratio)
-                    domain_bounced = round(bounced * ratio)
-                    domain_interested = round(interested * ratio)
-
-                    domain_stats.append({
-                        "date": target_date,
-                        "domain": domain,
-                        "workspace_name": workspace_name,
-                        "infra_type": infra_type,
-                        "tld": domain_mbs[0].get("tld", ""),
-                        "mailbox_count": mb_count_domain,
-                        "emails_sent": domain_sent,
-                        "replies": domain_replied,
-                        "bounces": domain_bounced,
-                        "interested": domain_interested,
-                        "reply_rate": round(domain_replied / domain_sent * 100, 4) if domain_sent > 0 else 0,
-                        "bounce_rate": round(domain_bounced / domain_sent * 100, 4) if domain_sent > 0 else 0,
-                    })
+        print(f"\n--- Storing data for {target_date} ---")
 
         result = supabase_upsert("daily_infra_stats", infra_stats, on_conflict="date,workspace_name,infra_type")
         print(f"  daily_infra_stats: {result}")
 
-        # Deduplicate domain_stats - aggregate by (date, domain, workspace_name)
-        domain_key_map = {}
-        for ds in domain_stats:
-            key = (ds["date"], ds["domain"], ds["workspace_name"])
-            if key not in domain_key_map:
-                domain_key_map[key] = ds.copy()
-            else:
-                # Aggregate stats
-                existing = domain_key_map[key]
-                existing["mailbox_count"] += ds["mailbox_count"]
-                existing["emails_sent"] += ds["emails_sent"]
-                existing["replies"] += ds["replies"]
-                existing["bounces"] += ds["bounces"]
-                existing["interested"] += ds["interested"]
-                # Recalculate rates
-                if existing["emails_sent"] > 0:
-                    existing["reply_rate"] = round(existing["replies"] / existing["emails_sent"] * 100, 4)
-                    existing["bounce_rate"] = round(existing["bounces"] / existing["emails_sent"] * 100, 4)
-
-        deduplicated_domain_stats = list(domain_key_map.values())
         result = supabase_upsert("daily_domain_stats", deduplicated_domain_stats, on_conflict="date,domain,workspace_name")
         print(f"  daily_domain_stats: {result}")
 
+    # Stored rows changed: have the server drop its cached queries
+    print(f"  data_generations: {bump_data_generation('backfill')}")
+
+    status = run_result(skipped_workspaces, skipped_groups, skipped_dates)
+    dates_stored = len(all_dates) - len(skipped_dates)
+
     print("\n" + "=" * 80)
-    print(f"Backfill Complete! Created {len(all_dates)} days of REAL historical data.")
+    print(f"Backfill Complete! Created {dates_stored} days of REAL historical data.")
+    if dates_stored:
+        # dates are newest first, and the loop stores them in that order
+        cube = StatsCube.from_group_stats(dates, stats, membership, domains=False)
+        print_backfill_summary(cube.slice(start=dates[dates_stored - 1], end=dates[0]))
+    if status["status"] == "partial":
+        print(f"  PARTIAL - not collected: {status['not_collected']}")
     print("=" * 80)
 
+    return {"dates_stored": dates_stored, **status}
+
 
-def backfill_last_n_days(n_days: int = 14, exclude_recent: int = 0):
+def print_backfill_summary(cube: StatsCube) -> None:
+    """Per-infra totals over the stored dates"""
+    print(f"  {'Infra Type':<16} {'Sent':>10} {'Reply%':>7} {'Bnc%':>6}")
+    reply_rates = dict(zip(cube.labels["infra_type"], cube.rate("replied", by=("infra_type",)).tolist()))
+    bounce_rates = dict(zip(cube.labels["infra_type"], cube.rate("bounced", by=("infra_type",)).tolist()))
+    for infra_type, totals in cube.totals(by=("infra_type",)).items():
+        print(f"  {infra_type:<16} {totals['sent']:>10,} {reply_rates[infra_type]:>6.2f}% "
+              f"{bounce_rates[infra_type]:>5.2f}%")
+
+
+def backfill_last_n_days(n_days: int = 14, exclude_recent: int = 0, deadline: Deadline = None,
+                         processes: int = 1) -> dict:
     """
     Backfill data for the last N days using REAL daily data from API.
 
     Args:
         n_days: Number of days to fetch
         exclude_recent: Skip most recent N days (useful for not overwriting today's data)
+        deadline: Optional run-wide Deadline
+        processes: Worker processes for the aggregation (e.g. os.cpu_count() for long backfills)
     """
-    backfill_with_real_daily_data(n_days, exclude_recent_days=exclude_recent)
+    return backfill_with_real_daily_data(n_days, exclude_recent_days=exclude_recent, deadline=deadline,
+                                         processes=processes)
 
 
 def run_weekly_domain_alerts():
@@ -1069,16 +1367,16 @@ def run_weekly_domain_alerts():
     # Upsert fresh snapshots so alerts use current data
     snapshot_records = []
     for mb in mailboxes:
-        if mb.get("email"):
+        if mb.email:
             snapshot_records.append({
-                "email": mb["email"],
-                "domain": mb.get("domain", ""),
-                "workspace_name": mb.get("workspace_name", ""),
-                "infra_type": mb.get("infra_type", ""),
-                "emails_sent": mb.get("emails_sent", 0),
-                "replies": mb.get("replies", 0),
-                "bounces": mb.get("bounces", 0),
-                "interested": mb.get("interested", 0),
+                "email": mb.email,
+                "domain": mb.domain,
+                "workspace_name": mb.workspace_name,
+                "infra_type": mb.infra_type,
+                "emails_sent": mb.emails_sent,
+                "replies": mb.replies,
+                "bounces": mb.bounces,
+                "interested": mb.interested,
                 "snapshot_date": datetime.now().date().isoformat(),
             })
 
@@ -1093,6 +1391,7 @@ def run_weekly_domain_alerts():
     print(f"\nRefreshing mailbox_snapshots ({len(deduped)} unique mailboxes)...")
     result = supabase_upsert("mailbox_snapshots", deduped, on_conflict="email")
     print(f"  mailbox_snapshots: {result}")
+    print(f"  data_generations: {bump_data_generation('weekly_alerts')}")
 
     print("\nChecking domain health and sending weekly alerts...")
     check_domain_health_and_notify(mailboxes)
@@ -1101,12 +1400,18 @@ def run_weekly_domain_alerts():
 if __name__ == "__main__":
     import sys
 
+    # Optional run budget, e.g. a little under the CI job timeout
+    deadline_minutes = os.environ.get("COLLECTOR_DEADLINE_MINUTES")
+    run_deadline = Deadline(float(deadline_minutes) * 60) if deadline_minutes else None
+
     if len(sys.argv) > 1 and sys.argv[1] == "backfill":
         days = int(sys.argv[2]) if len(sys.argv) > 2 else 14
         # Optional third arg: exclude recent days
         exclude = int(sys.argv[3]) if len(sys.argv) > 3 else 0
-        backfill_last_n_days(days, exclude)
+        # Optional process pool for long backfills, e.g. BACKFILL_PROCESSES=8
+        processes = int(os.environ.get("BACKFILL_PROCESSES", "1"))
+        backfill_last_n_days(days, exclude, deadline=run_deadline, processes=processes)
     elif len(sys.argv) > 1 and sys.argv[1] == "weekly_alerts":
         run_weekly_domain_alerts()
     else:
-        collect_and_store()
+        collect_and_store(deadline=run_deadline)
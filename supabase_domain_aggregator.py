@@ -8,16 +8,24 @@ This script:
 3. Calculates reply rate, bounce rate
 4. Upserts into domain_daily_metrics table
 
+Rows are read page by page and grouped with a SpillAggregator, so at most
+AGGREGATE_MAX_KEYS (domain, client) groups are held in memory; past that
+partial sums spill to a temporary SQLite file.
+
 Can be run:
-- Directly: python supabase_domain_aggregator.py
+- Directly: python supabase_domain_aggregator.py [--max-keys N]
 - Via n8n: HTTP request to trigger
 - Via Vercel cron
 """
 
+import heapq
 import os
+import sys
 import requests
 from datetime import datetime, date
-from collections import defaultdict
+from itertools import islice
+
+from spill_aggregator import SpillAggregator, SPILL_MAX_KEYS
 
 # Supabase configuration
 SUPABASE_URL = "https://fxxjfgfnrywffjmxoadl.supabase.co"
@@ -30,17 +38,33 @@ HEADERS = {
     "Prefer": "resolution=merge-duplicates"  # For upsert
 }
 
+DASHBOARD_SELECT = "Mailbox,Domain,Client,Tag,Email Sent,Reply Count,Bounce Count,interested_response"
+DASHBOARD_PAGE_SIZE = 1000
 
-def fetch_infrastructure_dashboard():
-    """Fetch all mailbox data from Infrastructure_dashboard table"""
+
+def iter_infrastructure_dashboard(page_size: int = DASHBOARD_PAGE_SIZE):
+    """Yield Infrastructure_dashboard rows, one page in memory at a time"""
     url = f"{SUPABASE_URL}/rest/v1/Infrastructure_dashboard"
-    params = {
-        "select": "Mailbox,Domain,Client,Tag,Email Sent,Reply Count,Bounce Count,interested_response"
-    }
+    offset = 0
+    while True:
+        params = {
+            "select": DASHBOARD_SELECT,
+            "order": "Mailbox",
+            "limit": page_size,
+            "offset": offset,
+        }
+        response = requests.get(url, headers=HEADERS, params=params)
+        response.raise_for_status()
+        rows = response.json()
+        yield from rows
+        if len(rows) < page_size:
+            break
+        offset += page_size
+
 
-    response = requests.get(url, headers=HEADERS, params=params)
-    response.raise_for_status()
-    return response.json()
+def fetch_infrastructure_dashboard():
+    """Fetch all mailbox data from Infrastructure_dashboard table"""
+    return list(iter_infrastructure_dashboard())
 
 
 def extract_tld(domain: str) -> str:
@@ -51,61 +75,60 @@ def extract_tld(domain: str) -> str:
     return parts[-1] if parts else "unknown"
 
 
-def aggregate_by_domain(mailboxes: list) -> list:
+def aggregate_domains(mailboxes, max_keys: int = SPILL_MAX_KEYS) -> tuple:
     """
-    Aggregate mailbox data by domain + client
+    Group mailbox rows by domain + client
 
-    Returns list of domain metrics ready for insert
+    Args:
+        mailboxes: Iterable of Infrastructure_dashboard rows (may be a generator)
+        max_keys: Groups held in memory before spilling to disk (0 = never spill)
+
+    Returns:
+        (SpillAggregator, number of rows read); close the aggregator when done
     """
-    # Group by (domain, client)
-    domain_data = defaultdict(lambda: {
-        "mailbox_count": 0,
-        "emails_sent": 0,
-        "replies": 0,
-        "bounces": 0,
-        "interested": 0,
-        "infra_type": None,
-        "tld": None
-    })
+    aggregator = SpillAggregator(
+        ["domain", "client"],
+        ["mailbox_count", "emails_sent", "replies", "bounces", "interested"],
+        ["infra_type"],
+        max_keys=max_keys,
+    )
+    count = 0
 
     for mailbox in mailboxes:
+        count += 1
         domain = mailbox.get("Domain", "").lower().strip()
         client = mailbox.get("Client", "Unknown")
 
         if not domain:
             continue
 
-        key = (domain, client)
-
-        domain_data[key]["mailbox_count"] += 1
-        domain_data[key]["emails_sent"] += mailbox.get("Email Sent", 0) or 0
-        domain_data[key]["replies"] += mailbox.get("Reply Count", 0) or 0
-        domain_data[key]["bounces"] += mailbox.get("Bounce Count", 0) or 0
-        domain_data[key]["interested"] += mailbox.get("interested_response", 0) or 0
-
         # Take first infra type found
-        if not domain_data[key]["infra_type"]:
-            domain_data[key]["infra_type"] = mailbox.get("Tag", "Unknown")
+        aggregator.add((domain, client), [
+            1,
+            mailbox.get("Email Sent", 0) or 0,
+            mailbox.get("Reply Count", 0) or 0,
+            mailbox.get("Bounce Count", 0) or 0,
+            mailbox.get("interested_response", 0) or 0,
+        ], [mailbox.get("Tag", "Unknown") or None])
+
+    return aggregator, count
 
-        # Extract TLD
-        if not domain_data[key]["tld"]:
-            domain_data[key]["tld"] = extract_tld(domain)
 
-    # Convert to list of records
+def domain_records(aggregator: SpillAggregator):
+    """Yield domain metric records ready for insert, in first-seen order"""
     today = date.today().isoformat()
-    records = []
 
-    for (domain, client), data in domain_data.items():
+    for (domain, client), data in aggregator.items():
         sent = data["emails_sent"]
         reply_rate = round(data["replies"] / sent * 100, 4) if sent > 0 else 0
         bounce_rate = round(data["bounces"] / sent * 100, 4) if sent > 0 else 0
 
-        records.append({
+        yield {
             "date": today,
             "domain": domain,
             "client_name": client,
             "infra_type": data["infra_type"] or "Unknown",
-            "tld": data["tld"],
+            "tld": extract_tld(domain),
             "mailbox_count": data["mailbox_count"],
             "emails_sent": data["emails_sent"],
             "replies": data["replies"],
@@ -113,27 +136,42 @@ def aggregate_by_domain(mailboxes: list) -> list:
             "interested": data["interested"],
             "reply_rate": reply_rate,
             "bounce_rate": bounce_rate
-        })
+        }
+
+
+def aggregate_by_domain(mailboxes: list) -> list:
+    """
+    Aggregate mailbox data by domain + client
 
-    return records
+    Returns list of domain metrics ready for insert
+    """
+    aggregator, _ = aggregate_domains(mailboxes, max_keys=0)
+    with aggregator:
+        return list(domain_records(aggregator))
 
 
-def upsert_domain_metrics(records: list) -> dict:
+def upsert_domain_metrics(records) -> dict:
     """
     Upsert domain metrics into Supabase
     Uses ON CONFLICT (date, domain, client_name) DO UPDATE
-    """
-    if not records:
-        return {"inserted": 0, "message": "No records to insert"}
 
+    records may be any iterable; only one batch is held at a time.
+    """
     url = f"{SUPABASE_URL}/rest/v1/domain_daily_metrics"
 
     # Batch insert in chunks of 100
     batch_size = 100
     total_inserted = 0
+    total_records = 0
+    batch_number = 0
+    records = iter(records)
 
-    for i in range(0, len(records), batch_size):
-        batch = records[i:i + batch_size]
+    while True:
+        batch = list(islice(records, batch_size))
+        if not batch:
+            break
+        batch_number += 1
+        total_records += len(batch)
 
         response = requests.post(
             url,
@@ -144,51 +182,54 @@ def upsert_domain_metrics(records: list) -> dict:
         if response.status_code in [200, 201]:
             total_inserted += len(batch)
         else:
-            print(f"Error inserting batch {i//batch_size + 1}: {response.status_code}")
+            print(f"Error inserting batch {batch_number}: {response.status_code}")
             print(response.text)
 
+    if not total_records:
+        return {"inserted": 0, "message": "No records to insert"}
+
     return {
         "inserted": total_inserted,
-        "total_domains": len(records),
+        "total_domains": total_records,
         "date": date.today().isoformat()
     }
 
 
-def run_aggregation():
+def run_aggregation(max_keys: int = SPILL_MAX_KEYS):
     """Main function to run the domain aggregation"""
     print(f"Starting domain aggregation for {date.today().isoformat()}")
 
-    # Step 1: Fetch mailbox data
-    print("Fetching Infrastructure_dashboard data...")
-    mailboxes = fetch_infrastructure_dashboard()
-    print(f"  Found {len(mailboxes)} mailboxes")
-
-    # Step 2: Aggregate by domain
-    print("Aggregating by domain...")
-    domain_records = aggregate_by_domain(mailboxes)
-    print(f"  Aggregated into {len(domain_records)} domains")
-
-    # Step 3: Upsert to Supabase
-    print("Upserting to domain_daily_metrics...")
-    result = upsert_domain_metrics(domain_records)
-    print(f"  Inserted/updated {result['inserted']} records")
-
-    # Print summary of worst domains
-    print("\n--- Top 10 Highest Bounce Rate Domains ---")
-    sorted_by_bounce = sorted(domain_records, key=lambda x: x["bounce_rate"], reverse=True)[:10]
-    for d in sorted_by_bounce:
-        if d["emails_sent"] > 10:  # Only show domains with significant volume
-            print(f"  {d['domain']} ({d['client_name']}): {d['bounce_rate']:.2f}% bounce, {d['emails_sent']} sent")
-
-    print("\n--- Top 10 Lowest Reply Rate Domains (with >100 sent) ---")
-    domains_with_volume = [d for d in domain_records if d["emails_sent"] > 100]
-    sorted_by_reply = sorted(domains_with_volume, key=lambda x: x["reply_rate"])[:10]
-    for d in sorted_by_reply:
-        print(f"  {d['domain']} ({d['client_name']}): {d['reply_rate']:.2f}% reply, {d['emails_sent']} sent")
+    # Step 1-2: Fetch mailbox data page by page and aggregate by domain
+    print("Fetching Infrastructure_dashboard data and aggregating by domain...")
+    aggregator, mailbox_count = aggregate_domains(iter_infrastructure_dashboard(), max_keys)
+    with aggregator:
+        print(f"  Found {mailbox_count} mailboxes")
+        print(f"  Aggregated into {len(aggregator)} domains"
+              + (f" ({aggregator.spills} spills to disk)" if aggregator.spills else ""))
+
+        # Step 3: Upsert to Supabase
+        print("Upserting to domain_daily_metrics...")
+        result = upsert_domain_metrics(domain_records(aggregator))
+        print(f"  Inserted/updated {result['inserted']} records")
+
+        # Print summary of worst domains (second pass over the groups, top 10 kept)
+        print("\n--- Top 10 Highest Bounce Rate Domains ---")
+        sorted_by_bounce = heapq.nlargest(10, domain_records(aggregator), key=lambda x: x["bounce_rate"])
+        for d in sorted_by_bounce:
+            if d["emails_sent"] > 10:  # Only show domains with significant volume
+                print(f"  {d['domain']} ({d['client_name']}): {d['bounce_rate']:.2f}% bounce, {d['emails_sent']} sent")
+
+        print("\n--- Top 10 Lowest Reply Rate Domains (with >100 sent) ---")
+        domains_with_volume = (d for d in domain_records(aggregator) if d["emails_sent"] > 100)
+        sorted_by_reply = heapq.nsmallest(10, domains_with_volume, key=lambda x: x["reply_rate"])
+        for d in sorted_by_reply:
+            print(f"  {d['domain']} ({d['client_name']}): {d['reply_rate']:.2f}% reply, {d['emails_sent']} sent")
 
     return result
 
 
 if __name__ == "__main__":
-    result = run_aggregation()
+    args = sys.argv[1:]
+    max_keys = int(args[args.index("--max-keys") + 1]) if "--max-keys" in args else SPILL_MAX_KEYS
+    result = run_aggregation(max_keys)
     print(f"\nDone! Result: {result}")
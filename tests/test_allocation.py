@@ -0,0 +1,121 @@
+"""Invariants of the allocation kernel (allocate / rollup)"""
+from fractions import Fraction
+
+import numpy as np
+
+from allocation import METRICS, build_membership, allocate, rollup, _synthetic_inventory
+
+
+def _mb(domain: str) -> dict:
+    tld = "." + domain.split(".")[-1] if domain else ""
+    return {"domain": domain, "tld": tld}
+
+
+def _inventory() -> dict:
+    """Two workspaces; a domain shared by two infra groups, a domainless mailbox, an empty group"""
+    return {
+        "WS1": {
+            "GR": [_mb("a.com"), _mb("a.com"), _mb("b.net"), _mb("")],
+            "AO": [_mb("a.com"), _mb("c.io"), _mb("c.io")],
+            "Maldoso": [],
+        },
+        "WS2": {
+            "GR": [_mb("a.com"), _mb("d.com"), _mb("d.com"), _mb("e.org"), _mb("e.org"), _mb("e.org")],
+        },
+    }
+
+
+def _random_totals(membership: dict, n_dates: int = 20, seed: int = 1) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    n_groups = len(membership["groups"])
+    return rng.integers(0, 5000, (n_dates, n_groups, len(METRICS))).astype(np.float64)
+
+
+def _group_sums(slot_values: np.ndarray, membership: dict) -> np.ndarray:
+    n_dates, _, n_metrics = slot_values.shape
+    sums = np.zeros((n_dates, len(membership["groups"]), n_metrics), dtype=np.int64)
+    np.add.at(sums, (slice(None), membership["slot_group"], slice(None)), slot_values)
+    return sums
+
+
+def test_parts_sum_to_group_totals():
+    membership = build_membership(_inventory())
+    totals = _random_totals(membership)
+    slot_values = allocate(totals, membership)
+
+    sums = _group_sums(slot_values, membership)
+    has_slots = membership["group_mailbox_counts"] > 0
+    assert np.array_equal(sums[:, has_slots], np.rint(totals)[:, has_slots])
+
+
+def test_parts_within_one_of_exact_share():
+    membership = build_membership(_inventory())
+    totals = _random_totals(membership, n_dates=5)
+    slot_values = allocate(totals, membership)
+
+    counts = membership["group_mailbox_counts"]
+    for slot, (group, weight) in enumerate(zip(membership["slot_group"], membership["slot_weight"])):
+        for d in range(totals.shape[0]):
+            for m in range(len(METRICS)):
+                exact = Fraction(int(totals[d, group, m])) * Fraction(int(weight), int(counts[group]))
+                assert abs(slot_values[d, slot, m] - exact) < 1
+
+
+def test_non_integer_totals_are_rounded_first():
+    membership = build_membership({"WS": {"GR": [_mb("a.com"), _mb("b.com"), _mb("c.com")]}})
+    slot_values = allocate(np.array([[[10.6, 0.4, 2.5, 3.5]]]), membership)
+    assert slot_values.sum(axis=1).tolist() == [[11, 0, 2, 4]]
+
+
+def test_domainless_slots_dropped_from_rollups():
+    inventory = _inventory()
+    membership = build_membership(inventory)
+    totals = _random_totals(membership)
+    slot_values = allocate(totals, membership)
+
+    labelled_slots = membership["plans"]["domain"][0]
+    labelled_total = rollup(slot_values, membership, "domain").sum(axis=1)
+    assert len(labelled_slots) == len(membership["slot_group"]) - 1
+    assert labelled_total.tolist() == slot_values[:, labelled_slots].sum(axis=1).tolist()
+
+    # The domainless mailbox still takes its share of WS1/GR
+    assert labelled_total.sum() < np.rint(totals).sum()
+    for table in ("domain", "tld", "infra_tld"):
+        assert rollup(slot_values, membership, table).sum() == labelled_total.sum()
+
+
+def test_rollup_merges_domain_across_infra_groups():
+    membership = build_membership(_inventory())
+    keys = membership["domain_keys"]
+    domains = [(domain, workspace) for domain, workspace, _, _ in keys]
+    assert len(domains) == len(set(domains))
+
+    row = domains.index(("a.com", "WS1"))
+    assert membership["domain_mailbox_counts"][row] == 3
+    assert keys[row][2] == "GR"  # first-seen infra group
+
+    tld_counts = dict(zip(membership["tlds"], membership["tld_mailbox_counts"].tolist()))
+    assert tld_counts == {".com": 6, ".net": 1, ".io": 2, ".org": 3}
+
+
+def test_empty_group_and_empty_inventory():
+    membership = build_membership(_inventory())
+    empty = membership["groups"].index(("WS1", "Maldoso"))
+    totals = _random_totals(membership)
+    totals[:, empty] = 100
+    slot_values = allocate(totals, membership)
+    assert not np.any(membership["slot_group"] == empty)
+    assert slot_values.shape == (totals.shape[0], len(membership["slot_group"]), len(METRICS))
+
+    nothing = build_membership({})
+    slot_values = allocate(np.zeros((3, 0, len(METRICS))), nothing)
+    assert slot_values.shape == (3, 0, len(METRICS))
+    assert rollup(slot_values, nothing, "domain").shape == (3, 0, len(METRICS))
+
+
+def test_synthetic_inventory_invariants():
+    membership = build_membership(_synthetic_inventory(5000))
+    totals = _random_totals(membership, n_dates=3)
+    slot_values = allocate(totals, membership)
+    assert np.array_equal(_group_sums(slot_values, membership), np.rint(totals).astype(np.int64))
+    assert rollup(slot_values, membership, "tld").sum() == np.rint(totals).sum()
@@ -0,0 +1,44 @@
+"""analyze_period output does not depend on the thread pool size or completion order"""
+import json
+import random
+import time
+
+from analyzer import analyze_period, index_mailboxes
+from mailbox_store import MailboxRecord, MailboxStore
+
+
+class SlowClient:
+    """get_sender_email_stats with random latency; fails for one group"""
+
+    def __init__(self, seed: int):
+        self.rng = random.Random(seed)
+
+    def get_sender_email_stats(self, ids, start_date, end_date):
+        time.sleep(self.rng.random() * 0.005)
+        if 13 in ids:
+            raise RuntimeError("boom")
+        return {"sent": 10 * sum(ids), "replied": len(ids), "bounced": ids[0] % 3, "interested": 1}
+
+
+def _mailbox_data() -> dict:
+    store = MailboxStore()
+    infra_types = ["GR", "AO", "L", "MD SMTP"]
+    for i in range(40):
+        domain = f"d{i % 7}.{['com', 'net', 'io'][i % 3]}"
+        store.add(MailboxRecord(email=f"u{i}@{domain}", domain=domain, tld="." + domain.split(".")[-1],
+                                workspace_name=f"WS{i % 4}", infra_type=infra_types[i % len(infra_types) - (i % 2)],
+                                daily_limit=i % 9, external_id=i + 1))
+    clients = {f"WS{w}": SlowClient(w) for w in range(4)}
+    return index_mailboxes(store, {}, clients)
+
+
+def test_parallel_matches_serial():
+    outputs = []
+    for workers in (1, 8):
+        results = analyze_period(_mailbox_data(), "7d", workers=workers)
+        results["meta"].pop("generated_at")
+        outputs.append(json.dumps(results))
+    assert outputs[0] == outputs[1]
+
+    results = json.loads(outputs[0])
+    assert results["totals"]["sent"] == sum(s["sent"] for s in results["by_infra"].values())
@@ -0,0 +1,86 @@
+"""RevGenLabsAPI._get: 5xx retries, retry exhaustion and the run deadline"""
+import pytest
+import requests
+
+import api_client
+from api_client import Deadline, DeadlineExceeded, RetriesExhausted, RevGenLabsAPI, MAX_RETRIES
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, payload: dict = None):
+        self.status_code = status_code
+        self.payload = payload or {"data": []}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} Error", response=self)
+
+    def json(self):
+        return self.payload
+
+
+def _patch(monkeypatch, responses: list):
+    """requests.get answers from responses (status codes, or exceptions to raise); sleeps advance a fake clock"""
+    clock, calls = [0.0], []
+
+    def get(url, headers=None, params=None, timeout=None):
+        calls.append(timeout)
+        answer = responses[min(len(calls), len(responses)) - 1]
+        if isinstance(answer, Exception):
+            raise answer
+        return FakeResponse(answer, {"data": [1]})
+
+    def sleep(seconds):
+        clock[0] += seconds
+
+    monkeypatch.setattr(api_client.requests, "get", get)
+    monkeypatch.setattr(api_client.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(api_client.time, "sleep", sleep)
+    return calls
+
+
+def test_only_5xx_is_retried(monkeypatch):
+    calls = _patch(monkeypatch, [503, 200])
+    assert RevGenLabsAPI("WS", "t")._get("/x") == {"data": [1]}
+    assert len(calls) == 2
+
+    for status in (405, 415, 450):
+        calls = _patch(monkeypatch, [status, 200])
+        # Client errors are not retried, and are not "not collected" under a deadline
+        assert RevGenLabsAPI("WS", "t", Deadline(1000))._get("/x") == {"data": []}
+        assert len(calls) == 1
+
+
+def test_retries_exhausted(monkeypatch):
+    calls = _patch(monkeypatch, [502])
+    assert RevGenLabsAPI("WS", "t")._get("/x") == {"data": []}
+    assert len(calls) == MAX_RETRIES
+
+    calls = _patch(monkeypatch, [502])
+    with pytest.raises(RetriesExhausted):
+        RevGenLabsAPI("WS", "t", Deadline(1000))._get("/x")
+    assert len(calls) == MAX_RETRIES
+
+    calls = _patch(monkeypatch, [requests.exceptions.Timeout("slow")])
+    with pytest.raises(RetriesExhausted):
+        RevGenLabsAPI("WS", "t", Deadline(1000))._get("/x")
+    assert len(calls) == MAX_RETRIES
+
+
+def test_deadline_expiry(monkeypatch):
+    # Timeouts shrink to the fetch budget (deadline minus write reserve)
+    calls = _patch(monkeypatch, [200])
+    RevGenLabsAPI("WS", "t", Deadline(40, write_reserve=10))._get("/x")
+    assert calls == [30]
+
+    # No budget left: no request at all
+    calls = _patch(monkeypatch, [200])
+    with pytest.raises(DeadlineExceeded):
+        RevGenLabsAPI("WS", "t", Deadline(12, write_reserve=10))._get("/x")
+    assert calls == []
+
+    # A retry that would not fit is not slept for
+    calls = _patch(monkeypatch, [500, 200])
+    with pytest.raises(DeadlineExceeded):
+        RevGenLabsAPI("WS", "t", Deadline(16, write_reserve=10))._get("/x")
+    assert len(calls) == 1
@@ -0,0 +1,115 @@
+"""Backfill records built for all dates at once match a date-by-date build"""
+import tempfile
+from collections import Counter
+
+from config import INFRA_MAX_LIMITS
+from mailbox_store import MailboxRecord, MailboxStore
+from supabase_data_collector import (
+    backfill_records, build_group_index, group_stats_matrix, group_workspace_infra, iter_backfill_records
+)
+
+DATES = ["2025-01-05", "2025-01-04", "2025-01-03", "2025-01-02"]
+
+
+def _store() -> MailboxStore:
+    store = MailboxStore()
+    rows = [  # workspace, infra, domain, daily_limit, warmup
+        ("WS1", "GR", "a.com", 10, True), ("WS1", "GR", "a.com", 10, False), ("WS1", "GR", "b.net", 8, False),
+        ("WS1", "GR", "", 5, False), ("WS1", "AO", "a.com", 2, True), ("WS1", "AO", "c.io", 2, True),
+        ("WS2", "GR", "a.com", 20, False), ("WS2", "L", "e.co", 1, False),
+    ]
+    for i, (workspace, infra, domain, limit, warmup) in enumerate(rows):
+        store.add(MailboxRecord(email=f"u{i}@{domain}", domain=domain,
+                                tld="." + domain.split(".")[-1] if domain else "",
+                                workspace_name=workspace, infra_type=infra, daily_limit=limit,
+                                warmup_enabled=warmup, external_id=i + 1))
+    return store
+
+
+def _daily_stats() -> dict:
+    return {
+        "WS1": {"GR": {d: {"sent": 101 * (i + 1), "replied": 3 * i, "bounced": i, "interested": i % 2}
+                       for i, d in enumerate(DATES)},
+                "AO": {"2025-01-03": {"sent": 7, "replied": 1, "bounced": 0, "interested": 1}}},
+        "WS2": {"GR": {"2025-01-04": {"sent": 50, "replied": 2, "bounced": 5, "interested": 0}}},
+        # WS2/L sent nothing
+    }
+
+
+def test_group_index():
+    index = build_group_index(group_workspace_infra(_store()))
+    groups = {(g["workspace_name"], g["infra_type"]): g for g in index["groups"]}
+    assert groups[("WS1", "GR")] == {
+        "workspace_name": "WS1", "infra_type": "GR", "mailbox_count": 4, "domain_count": 2,
+        "current_capacity": 33, "theoretical_max": 4 * INFRA_MAX_LIMITS.get("GR", 10), "in_warmup": 1,
+    }
+    assert groups[("WS1", "AO")]["in_warmup"] == 2
+    # (domain, workspace) keys: a.com appears once per workspace, labelled by the first group seen
+    keys = index["membership"]["domain_keys"]
+    assert Counter((domain, workspace) for domain, workspace, _, _ in keys) == Counter(
+        {("a.com", "WS1"): 1, ("b.net", "WS1"): 1, ("c.io", "WS1"): 1, ("a.com", "WS2"): 1, ("e.co", "WS2"): 1})
+    assert ("a.com", "WS1", "GR", ".com") in keys
+
+
+def test_records_match_date_by_date():
+    index = build_group_index(group_workspace_infra(_store()))
+    groups, membership = index["groups"], index["membership"]
+    daily = _daily_stats()
+    stats = group_stats_matrix(groups, daily, DATES)
+    assert stats.shape == (len(DATES), len(groups), 4)
+
+    together = backfill_records(groups, membership, stats, DATES)
+    one_by_one = [backfill_records(groups, membership, stats[i:i + 1], [d])[0] for i, d in enumerate(DATES)]
+    assert together == one_by_one
+
+    for target_date, infra_stats, domain_stats in together:
+        for record in infra_stats:
+            source = daily.get(record["workspace_name"], {}).get(record["infra_type"], {}).get(target_date, {})
+            sent = source.get("sent", 0)
+            assert record["emails_sent"] == sent and record["replies"] == source.get("replied", 0)
+            assert record["reply_rate"] == (round(source["replied"] / sent * 100, 4) if sent else 0)
+            assert record["positive_rate"] == (round(source["interested"] / sent * 100, 4) if sent else 0)
+
+        # One row per (domain, workspace); domain rows never add up to more than the groups sent
+        assert len({(r["domain"], r["workspace_name"]) for r in domain_stats}) == len(domain_stats)
+        for workspace in ("WS1", "WS2"):
+            group_sent = sum(r["emails_sent"] for r in infra_stats if r["workspace_name"] == workspace)
+            domain_sent = sum(r["emails_sent"] for r in domain_stats if r["workspace_name"] == workspace)
+            assert domain_sent <= group_sent
+        for record in domain_stats:
+            sent = record["emails_sent"]
+            assert record["bounce_rate"] == (round(record["bounces"] / sent * 100, 4) if sent else 0)
+
+    # The domainless mailbox keeps its share: a.com gets 2 of WS1/GR's 4 mailboxes
+    first = together[0][2]
+    a_com = next(r for r in first if (r["domain"], r["workspace_name"]) == ("a.com", "WS1"))
+    assert a_com["mailbox_count"] == 3
+    assert abs(a_com["emails_sent"] - 101 * 2 / 4) < 1
+    assert abs(sum(r["emails_sent"] for r in first if r["workspace_name"] == "WS1") - 101 * 3 / 4) < 1
+
+
+def _many_dates(n: int = 20):
+    index = build_group_index(group_workspace_infra(_store()))
+    dates = [f"2025-02-{d:02d}" for d in range(n, 0, -1)]
+    daily = {"WS1": {"GR": {d: {"sent": 37 * i + 3, "replied": i % 5, "bounced": i % 3, "interested": i % 2}
+                            for i, d in enumerate(dates)}},
+             "WS2": {"GR": {d: {"sent": 11 * i, "replied": 1, "bounced": 0, "interested": 0}
+                            for i, d in enumerate(dates)}}}
+    return index["groups"], index["membership"], group_stats_matrix(index["groups"], daily, dates), dates
+
+
+def test_process_pool_matches_in_process(tmp_path, monkeypatch):
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    groups, membership, stats, dates = _many_dates()
+    serial = list(iter_backfill_records(groups, membership, stats, dates, processes=1, chunk_days=6))
+    assert serial == backfill_records(groups, membership, stats, dates)
+    assert [d for d, _, _ in serial] == dates
+
+    pooled = list(iter_backfill_records(groups, membership, stats, dates, processes=2, chunk_days=6))
+    assert pooled == serial
+
+    # Closing the stream early (the deadline) shuts the pool down and removes the shared array
+    records = iter_backfill_records(groups, membership, stats, dates, processes=2, chunk_days=6)
+    assert next(records) == serial[0]
+    records.close()
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,101 @@
+"""Chunked collection: slices advance the saved cursor, resume it, and stop at the deadline"""
+from datetime import datetime, timedelta, timezone
+
+import api_client
+import supabase_data_collector as collector
+from api_client import Deadline
+
+WORKSPACES = ["WS1", "WS2", "WS3", "WS4", "WS5"]
+
+
+class FakeClient:
+    """Workspace API client: one GR mailbox, each request checks the deadline like RevGenLabsAPI._get"""
+
+    def __init__(self, name: str, deadline: Deadline, clock: list):
+        self.name = name
+        self.deadline = deadline
+        self.clock = clock
+
+    def _request(self):
+        if self.deadline:
+            self.deadline.request_timeout()
+        self.clock[0] += 10   # every request takes 10s
+
+    def get_sender_emails(self):
+        self._request()
+        return [{"id": 1, "email": f"a@{self.name.lower()}.com", "tags": [{"name": "GR"}], "daily_limit": 10}]
+
+    def get_warmup_status(self):
+        self._request()
+        return []
+
+    def get_sender_email_stats(self, ids, start_date, end_date):
+        self._request()
+        return {"sent": 5, "replied": 1, "bounced": 0, "interested": 1}
+
+
+def _patch(monkeypatch, saved: dict, workspaces=WORKSPACES):
+    clock = [0.0]
+    monkeypatch.setattr(api_client.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(collector, "get_all_workspace_clients",
+                        lambda deadline=None: {name: FakeClient(name, deadline, clock) for name in workspaces})
+    monkeypatch.setattr(collector, "load_collect_cursor", lambda run_date: dict(saved))
+    monkeypatch.setattr(collector, "supabase_upsert", lambda table, rows, on_conflict=None: rows)
+
+    def save(state):
+        saved.clear()
+        saved.update(state, updated_at=datetime.now(timezone.utc).isoformat())
+    monkeypatch.setattr(collector, "save_collect_cursor", save)
+    return clock
+
+
+def test_slices_cover_every_workspace_once(monkeypatch):
+    saved = {}
+    _patch(monkeypatch, saved)
+    seen, cursor = [], 0
+    while True:
+        result = collector.collect_chunk(cursor=cursor, max_workspaces=2, run_date="2025-03-01")
+        seen += result["workspaces"]
+        assert saved["cursor"] == cursor + len(result["workspaces"])
+        if result["done"]:
+            break
+        cursor = result["next_cursor"]
+    assert seen == WORKSPACES
+    assert result["next_cursor"] is None and saved["status"] == "done"
+    assert saved["mailboxes"] == len(WORKSPACES)
+
+
+def test_cron_resumes_only_a_stale_cursor(monkeypatch):
+    saved = {"run_date": "2025-03-01", "cursor": 3, "workspace_order": WORKSPACES,
+             "total_workspaces": 5, "status": "running", "mailboxes": 3}
+    _patch(monkeypatch, saved)
+
+    # A chain saved the cursor a moment ago: leave it alone
+    saved["updated_at"] = datetime.now(timezone.utc).isoformat()
+    result = collector.collect_chunk(max_workspaces=2, run_date="2025-03-01")
+    assert result["workspaces"] == [] and result["next_cursor"] == 3
+
+    # Naive and "Z" timestamps are both read as UTC
+    stale = datetime.now(timezone.utc) - timedelta(seconds=collector.COLLECT_RESUME_AFTER_SECONDS + 60)
+    for updated_at in (stale.replace(tzinfo=None).isoformat(), stale.isoformat().replace("+00:00", "Z")):
+        saved.update(cursor=3, status="running", updated_at=updated_at, mailboxes=3)
+        result = collector.collect_chunk(max_workspaces=2, run_date="2025-03-01")
+        assert result["workspaces"] == ["WS4", "WS5"] and result["done"]
+        assert saved["mailboxes"] == 5
+
+    result = collector.collect_chunk(max_workspaces=2, run_date="2025-03-01")
+    assert result["done"] and result["workspaces"] == []
+
+
+def test_deadline_stops_before_the_write_reserve(monkeypatch):
+    saved = {}
+    _patch(monkeypatch, saved)
+    # Requests take 10s and need 5s of fetch time left: with 125s of fetch time the
+    # 10 mailbox/warmup requests and the stats of WS1-WS3 fit, WS4's do not
+    deadline = Deadline(150, write_reserve=25)
+    result = collector.collect_chunk(cursor=0, max_workspaces=5, run_date="2025-03-01", deadline=deadline)
+    assert result["status"] == "partial"
+    assert result["not_collected"]["groups"] == ["WS4/GR", "WS5/GR"]
+    assert result["next_cursor"] == 3 and saved["cursor"] == 3 and saved["status"] == "running"
+    assert result["mailboxes"] == 3
+    assert not deadline.expired()
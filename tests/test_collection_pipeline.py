@@ -0,0 +1,82 @@
+"""One collection pass feeds Supabase and data.json from the same daily stats"""
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+import collection_pipeline
+import supabase_data_collector
+
+GROUPS = {"WS1": ["GR", "AO"], "WS2": ["GR"]}
+
+
+class FakeClient:
+    """Two mailboxes per group; daily stats for every date asked for; counts requests"""
+
+    def __init__(self, workspace: str, calls: list):
+        self.workspace = workspace
+        self.calls = calls
+
+    def get_sender_emails(self):
+        self.calls.append((self.workspace, "sender-emails"))
+        return [{"id": f"{self.workspace}-{infra}-{i}", "email": f"m{i}@{infra.lower()}-{self.workspace.lower()}.com",
+                 "tags": [{"name": infra}], "daily_limit": 10}
+                for infra in GROUPS[self.workspace] for i in range(2)]
+
+    def get_warmup_status(self):
+        self.calls.append((self.workspace, "warmup"))
+        return [{"id": f"{self.workspace}-GR-0", "warmup_enabled": True, "warmup_daily_limit": 5}]
+
+    def get_sender_email_stats_daily(self, ids, start_date, end_date):
+        self.calls.append((self.workspace, "daily"))
+        day = datetime.strptime(start_date, "%Y-%m-%d")
+        stats = {}
+        while day.strftime("%Y-%m-%d") <= end_date:
+            n = day.day + len(ids[0])
+            stats[day.strftime("%Y-%m-%d")] = {"sent": 40 * n, "replied": n % 7, "bounced": n % 3, "interested": n % 2}
+            day += timedelta(days=1)
+        return stats
+
+
+@pytest.fixture
+def upserts(monkeypatch):
+    calls, upserts = [], {}
+    monkeypatch.setattr(collection_pipeline, "get_all_workspace_clients",
+                        lambda deadline=None: {ws: FakeClient(ws, calls) for ws in GROUPS})
+
+    def upsert(table, rows, on_conflict=None):
+        upserts.setdefault(table, []).extend(rows)
+        return {"success": len(rows)}
+    monkeypatch.setattr(supabase_data_collector, "supabase_upsert", upsert)
+    upserts["_calls"] = calls
+    return upserts
+
+
+def test_one_pass_feeds_both_outputs(upserts, tmp_path):
+    path = tmp_path / "static" / "data.json"
+    path.parent.mkdir()
+    summary = collection_pipeline.run_pipeline(["supabase", "dashboard"], path=str(path),
+                                               partials_dir=str(tmp_path / "partials"))
+    assert summary["status"] == "complete"
+
+    # Inventory once per workspace, daily stats once per group
+    calls = upserts["_calls"]
+    assert sorted(c for c in calls if c[1] == "daily") == [("WS1", "daily")] * 2 + [("WS2", "daily")]
+    assert len([c for c in calls if c[1] == "sender-emails"]) == len(GROUPS)
+
+    data = json.loads(path.read_text())
+    assert {"3d", "7d", "14d", "30d", "projections"} <= set(data)
+    infra_rows = upserts["daily_infra_stats"]
+    for infra in ("GR", "AO"):
+        stored = sum(r["emails_sent"] for r in infra_rows if r["infra_type"] == infra)
+        assert data["30d"]["by_infra"][infra]["sent"] == stored
+    assert data["30d"]["by_client"]["WS2"]["GR"]["sent"] == next(
+        r["emails_sent"] for r in infra_rows if (r["workspace_name"], r["infra_type"]) == ("WS2", "GR"))
+    assert len(upserts["mailbox_snapshots"]) == 6
+    assert collection_pipeline.version_path(str(path)).endswith("data.version.json")
+
+
+def test_unknown_sink(upserts):
+    with pytest.raises(ValueError):
+        collection_pipeline.run_pipeline(["supabase", "nowhere"])
+    assert upserts["_calls"] == []
@@ -0,0 +1,109 @@
+"""Date-range analysis sums stored daily rows over the window and caches each window"""
+import pytest
+
+import analyzer
+import query_cache
+from query_cache import TTLCache
+
+SNAPSHOTS = [
+    {"email": "a@x.com", "domain": "x.com", "tld": ".com", "workspace_name": "WS1", "infra_type": "GR",
+     "daily_limit": 10, "warmup_enabled": False, "external_id": 1},
+    {"email": "b@y.net", "domain": "y.net", "tld": ".net", "workspace_name": "WS1", "infra_type": "AO",
+     "daily_limit": 2, "warmup_enabled": True, "warmup_daily_limit": 2, "external_id": 2},
+    {"email": "c@z.io", "domain": "z.io", "tld": ".io", "workspace_name": "WS2", "infra_type": "GR",
+     "daily_limit": 15, "warmup_enabled": False, "external_id": 3},
+    {"email": "d@w.co", "domain": "w.co", "tld": ".co", "workspace_name": "WS2", "infra_type": "Untracked",
+     "external_id": 4},
+]
+DAILY = [
+    {"date": f"2025-02-{day:02d}", "workspace_name": workspace, "infra_type": infra,
+     "emails_sent": 100 * day, "replies": day, "bounces": 1, "interested": day % 2}
+    for day in range(1, 11) for workspace, infra in (("WS1", "GR"), ("WS1", "AO"), ("WS2", "GR"))
+]
+
+
+@pytest.fixture
+def reads(monkeypatch):
+    reads = []
+
+    def select(table, filters=None, select="*", order=None, workers=1):
+        reads.append(table)
+        rows = SNAPSHOTS if table == "mailbox_snapshots" else DAILY
+        for column, condition in filters or []:
+            op, value = condition.split(".", 1)
+            rows = [r for r in rows if (r[column] >= value if op == "gte" else r[column] <= value)]
+        return rows
+
+    monkeypatch.setattr(analyzer, "supabase_select", select)
+    monkeypatch.setattr(analyzer, "check_generation", lambda: None)
+    monkeypatch.setattr(analyzer, "_window_cache", TTLCache(max_entries=8, ttl=600))
+    return reads
+
+
+def test_window_sums_and_meta(reads):
+    result = analyzer.analyze_date_range("2025-02-03", "2025-02-05")
+    days = range(3, 6)
+    assert result["by_infra"]["GR"]["sent"] == 2 * sum(100 * d for d in days)
+    assert result["by_infra"]["AO"]["sent"] == sum(100 * d for d in days)
+    assert result["by_infra"]["GR"]["mailbox_count"] == 2
+    assert result["by_client"]["WS2"]["GR"]["replied"] == sum(days)
+    assert result["totals"]["sent"] == 3 * sum(100 * d for d in days)
+    assert result["totals"]["mailbox_count"] == 3            # untracked snapshot left out
+    assert result["meta"]["days"] == 3 and result["meta"]["days_with_data"] == 3
+    assert result["meta"]["period"] == "2025-02-03..2025-02-05"
+
+    # A window past the stored days still counts every day for per-day metrics
+    wide = analyzer.analyze_date_range("2025-02-09", "2025-02-12")
+    assert wide["meta"]["days"] == 4 and wide["meta"]["days_with_data"] == 2
+
+
+def test_windows_are_cached(reads):
+    first = analyzer.analyze_date_range("2025-02-01", "2025-02-10")
+    assert analyzer.analyze_date_range("2025-02-01", "2025-02-10") is first
+    analyzer.analyze_date_range("2025-02-02", "2025-02-10")
+    # The inventory is read once and shared by both windows
+    assert reads == ["mailbox_snapshots", "daily_infra_stats", "daily_infra_stats"]
+
+
+def test_invalid_windows(reads):
+    for start, end in (("2025-02-05", "2025-02-01"), ("2025-02-30", "2025-03-03"), (None, "2025-02-03")):
+        with pytest.raises(ValueError):
+            analyzer.analyze_date_range(start, end)
+    assert reads == []
+
+
+def test_ttl_cache_expiry_and_lru(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(query_cache.time, "monotonic", lambda: clock[0])
+    cache = TTLCache(max_entries=2, ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1       # a is now the most recently used
+    cache.set("c", 3)
+    assert cache.get("b") is None and cache.get("a") == 1
+    clock[0] = 10
+    assert cache.get("a") is None and len(cache) == 1
+    assert cache.get_or_compute("a", lambda: 5) == 5
+
+
+def test_window_responses_expire_with_windows(monkeypatch):
+    import query_layer
+    import server
+
+    clock, builds = [0.0], []
+    monkeypatch.setattr(query_cache.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(query_layer, "check_generation", lambda: None)
+    monkeypatch.setattr(server, "analyze_date_range", lambda start, end: builds.append((start, end)) or {"n": len(builds)})
+    query_layer.invalidate()
+    client = server.app.test_client()
+
+    url = "/api/analyze?start=2025-02-01&end=2025-02-10"
+    assert client.get(url).get_json() == client.get(url).get_json() == {"n": 1}
+    assert len(server._window_response_cache) == 1
+    assert not any("2025-02-01" in key for key in server._response_cache._entries)
+
+    # No older than a computed window, and dropped with the query caches (backfill, collector run)
+    clock[0] = analyzer.WINDOW_CACHE_TTL
+    assert client.get(url).get_json() == {"n": 2}
+    query_layer.invalidate()
+    assert client.get(url).get_json() == {"n": 3}
@@ -0,0 +1,62 @@
+"""Domain health pages cover every matching domain once, in sort order"""
+import random
+from datetime import datetime, timezone
+
+from domain_health import aggregate_domains, query_domains, score_domains
+
+
+def _domains(n: int = 3000, seed: int = 3) -> list:
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        sent = rng.choice([0, 500, 1500, 4000])
+        rows.append({
+            "domain": f"d{rng.randrange(400)}.{rng.choice(['com', 'co'])}" if i % 17 else None,
+            "tld": rng.choice(["com", "co"]),
+            "workspace_name": f"C{rng.randrange(3)}",
+            "infra_type": rng.choice(["GR", "AO"]),
+            "emails_sent": sent,
+            "replies": rng.randrange(sent // 40 + 1),
+            "bounces": rng.randrange(sent // 15 + 1),
+            "interested": rng.randrange(3),
+            "created_at": rng.choice([None, "2025-01-01T00:00:00+00:00", "2025-03-01T12:00:00Z"]),
+        })
+    return score_domains(aggregate_domains(rows, now=datetime(2025, 4, 1, tzinfo=timezone.utc)))
+
+
+def test_cursor_pages_match_full_sort():
+    domains = _domains()
+    for sort, order in (("bounce_rate", "desc"), ("reply_rate", "asc"), ("emails_sent", "desc")):
+        kwargs = dict(sort=sort, order=order, client=["C0", "C2"], min_sends=1000, domains=domains)
+        seen, cursor = [], None
+        while True:
+            page = query_domains(limit=37, cursor=cursor, **kwargs)
+            seen.extend((d["domain"], d["client"]) for d in page["domains"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+        expected = sorted(
+            (d for d in domains if d["client"] in ("C0", "C2") and d["emails_sent"] >= 1000),
+            key=lambda d: ((-1 if order == "desc" else 1) * d[sort], d["domain"], d["client"]))
+        assert seen == [(d["domain"], d["client"]) for d in expected]
+        assert page["total"] == len(expected)
+
+
+def test_summary_and_status_filter():
+    domains = _domains()
+    page = query_domains(status=["burned"], limit=5, domains=domains)
+    assert page["summary"]["total"] == len(domains)
+    assert sum(page["summary"][s] for s in ("burned", "danger", "warning", "healthy", "insufficient")) == len(domains)
+    assert page["total"] == page["summary"]["burned"]
+    assert len(page["domains"]) == 5 and all(d["status"] == "burned" for d in page["domains"])
+
+
+def test_scoring_thresholds():
+    rows = [{"domain": "a.com", "workspace_name": "C", "emails_sent": 5000, "replies": 100, "bounces": 250},
+            {"domain": "b.com", "workspace_name": "C", "emails_sent": 5000, "replies": 10, "bounces": 0},
+            {"domain": "c.com", "workspace_name": "C", "emails_sent": 100, "replies": 0, "bounces": 50}]
+    a, b, c = score_domains(aggregate_domains(rows))
+    assert (a["status"], a["burn_reason"]) == ("danger", "Stop sends, scrub (bounce 5.0%)")
+    assert (b["status"], b["burn_reason"]) == ("burned", "Pull infra, likely blocked (reply 0.20%)")
+    assert c["status"] == "insufficient"
@@ -0,0 +1,40 @@
+"""Downsampling keeps the endpoints, the point budget and isolated spikes"""
+import numpy as np
+
+from downsample import lttb, min_max
+from trends import downsample_trends, trend_series
+
+
+def _noisy(n: int = 1000, spike: int = 613) -> np.ndarray:
+    rng = np.random.default_rng(1)
+    y = 2 + 0.2 * rng.standard_normal(n)
+    y[spike] = 25
+    return y
+
+
+def test_budget_endpoints_and_spike():
+    y = _noisy()
+    for keep in (lttb(np.arange(len(y)), y, 50), min_max(y, 50)):
+        assert len(keep) <= 50
+        assert keep[0] == 0 and keep[-1] == len(y) - 1
+        assert (np.diff(keep) > 0).all()
+        assert 613 in keep
+
+
+def test_short_series_unchanged():
+    assert lttb([0, 1, 2], [1, 5, 2], 10).tolist() == [0, 1, 2]
+    assert min_max([1, 5], 10).tolist() == [0, 1]
+
+
+def test_trend_series_downsampled():
+    rows = [{"date": f"2025-{1 + d // 28:02d}-{1 + d % 28:02d}", "infra_type": "GR",
+             "emails_sent": 1000, "replies": 10, "interested": 1, "bounces": 50 if d == 100 else 5}
+            for d in range(300)]
+    full = trend_series(rows, "infra")
+    small = downsample_trends(full, 40, "minmax", "bounce_rate")
+    gr = small["series"]["GR"]
+    assert small["downsample"]["bucket_count"] == 300
+    assert len(gr["dates"]) == len(gr["sent"]) <= 40
+    assert max(gr["bounce_rate"]) == 5.0
+    assert gr["dates"][0] == full["buckets"][0]["start"]
+    assert gr["labels"] == [b["label"] for b in full["buckets"] if b["start"] in gr["dates"]]
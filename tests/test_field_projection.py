@@ -0,0 +1,46 @@
+"""fields= / include= projections keep exactly the requested parts"""
+from field_projection import compile_projection
+
+RESULTS = {
+    "by_infra": {"GR": {"sent": 10, "reply_rate": 1.5, "bounce_rate": 2.0},
+                 "AO": {"sent": 5, "reply_rate": 0.5, "bounce_rate": 1.0}},
+    "by_client": {"Reev": {"GR": {"sent": 4, "reply_rate": 1.0}},
+                  "Acme": {"GR": {"sent": 6, "reply_rate": 2.0}, "AO": {"sent": 5, "reply_rate": 0.5}}},
+    "totals": {"sent": 15, "reply_rate": 1.2},
+    "meta": {"period": "7d"},
+}
+
+
+def test_fields_and_include():
+    projection = compile_projection("by_infra.sent,by_infra.reply_rate", "totals")
+    assert projection.apply(RESULTS) == {
+        "by_infra": {"GR": {"sent": 10, "reply_rate": 1.5}, "AO": {"sent": 5, "reply_rate": 0.5}},
+        "totals": {"sent": 15, "reply_rate": 1.2},
+    }
+    assert projection.keys("by_client") == ()
+
+
+def test_explicit_keys_and_wildcards_merge():
+    projection = compile_projection("by_client.Acme.*.sent,by_client.Acme.AO.reply_rate,meta.period")
+    assert projection.apply(RESULTS) == {
+        "by_client": {"Acme": {"GR": {"sent": 6}, "AO": {"sent": 5, "reply_rate": 0.5}}},
+        "meta": {"period": "7d"},
+    }
+    assert projection.keys("by_client") == ("Acme",)
+    assert compile_projection("by_client.sent").keys("by_client") is None
+
+
+def test_whole_section_wins_and_cache_key_is_canonical():
+    projection = compile_projection("totals.sent", "totals")
+    assert projection.apply(RESULTS) == {"totals": RESULTS["totals"]}
+    assert compile_projection("by_infra.sent,totals.sent").key == compile_projection("totals.sent, by_infra.sent").key
+    assert compile_projection(None, "") is None
+
+
+def test_malformed():
+    for fields, include in [("nope.sent", None), ("by_client.a.b", None), ("totals", None), (None, "by_nothing")]:
+        try:
+            compile_projection(fields, include)
+        except ValueError:
+            continue
+        raise AssertionError(f"accepted fields={fields!r} include={include!r}")
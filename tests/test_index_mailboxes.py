@@ -0,0 +1,53 @@
+"""index_mailboxes: domain indexes and warmup stats match a scan of every mailbox"""
+import random
+
+from analyzer import index_mailboxes
+from mailbox_store import MailboxRecord, MailboxStore
+
+
+def _store(n: int = 400, seed: int = 11) -> MailboxStore:
+    rng = random.Random(seed)
+    store = MailboxStore()
+    for i in range(n):
+        domain = f"d{rng.randrange(60)}.{rng.choice(['com', 'net', 'io'])}" if i % 13 else ""
+        store.add(MailboxRecord(email=f"u{i}@{domain}", domain=domain,
+                                tld="." + domain.split(".")[-1] if domain else "",
+                                workspace_name=f"WS{rng.randrange(4)}", infra_type=rng.choice(["GR", "AO", "L"]),
+                                external_id=i + 1))
+    return store
+
+
+def test_domain_indexes_match_a_full_scan():
+    store = _store()
+    data = index_mailboxes(store, {}, clients={})
+    tlds = {mb.tld for mb in store if mb.tld}
+    assert set(data["tld_domains"]) == tlds
+    for tld in tlds:
+        assert data["tld_domains"][tld] == {mb.domain for mb in store if mb.tld == tld}
+        for infra_type in ("GR", "AO", "L"):
+            expected = {mb.domain for mb in store if mb.tld == tld and mb.infra_type == infra_type}
+            assert data["infra_tld_domains"].get((infra_type, tld), set()) == expected
+    assert "" not in data["by_tld"]
+    assert sum(len(mbs) for mbs in data["by_tld"].values()) == sum(1 for mb in store if mb.tld)
+
+
+def test_warmup_stats_by_id():
+    store = _store(20)
+    warmup = {
+        "WS0": [{"id": 1, "warmup_enabled": True, "warmup_daily_limit": 10},
+                {"id": 2, "warmup_enabled": True, "warmup_daily_limit": 4},
+                {"id": 3, "warmup_enabled": False},
+                {"id": 4, "warmup_enabled": True, "warmup_daily_limit": 0},   # neither
+                {"id": 999, "warmup_enabled": True, "warmup_daily_limit": 8}],  # not tracked
+    }
+    stats = index_mailboxes(store, warmup, clients={})["warmup_stats"]
+    expected = {}
+    for mb_id, enabled, limit in ((1, True, 10), (2, True, 4), (3, False, 0)):
+        infra = expected.setdefault(store.get(mb_id).infra_type, {"in_warmup": 0, "ready": 0, "limit": 0})
+        infra["in_warmup" if enabled else "ready"] += 1
+        infra["limit"] += limit
+    for infra_type, counts in expected.items():
+        assert stats[infra_type]["in_warmup"] == counts["in_warmup"]
+        assert stats[infra_type]["ready"] == counts["ready"]
+        assert stats[infra_type]["total_warmup_limit"] == counts["limit"]
+    assert sum(s["in_warmup"] + s["ready"] for s in stats.values()) == 3
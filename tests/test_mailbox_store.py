@@ -0,0 +1,58 @@
+"""MailboxStore: records, id lookup and group-by views over shared records"""
+import pytest
+
+from mailbox_store import MailboxRecord, MailboxStore, MailboxView, SNAPSHOT_FIELDS
+
+
+def _api_mailbox(i: int, domain: str) -> dict:
+    return {"id": i, "email": f"u{i}@{domain}", "daily_limit": 5, "emails_sent_count": 10 * i,
+            "total_replied_count": None, "bounced_count": 1, "interested_leads_count": 0}
+
+
+def _store() -> MailboxStore:
+    store = MailboxStore()
+    rows = [("WS1", "GR", "a.com"), ("WS2", "AO", "b.net"), ("WS1", "AO", "a.com"), ("WS1", "GR", "c.io")]
+    for i, (workspace, infra, domain) in enumerate(rows, start=1):
+        warmup = {"warmup_enabled": True, "warmup_daily_limit": 3} if i == 2 else None
+        store.add(MailboxRecord.from_api(_api_mailbox(i, domain), workspace, infra, warmup))
+    return store
+
+
+def test_record_fields():
+    record = _store().get(2)
+    assert (record.email, record.domain, record.tld) == ("u2@b.net", "b.net", ".net")
+    assert record.warmup_enabled and record.warmup_daily_limit == 3
+    assert record.replies == 0                 # None from the API
+    assert record["daily_limit"] == record.get("daily_limit") == 5
+    assert record.get("missing", "x") == "x"
+    with pytest.raises(KeyError):
+        record["missing"]
+    assert list(record.snapshot_row()) == list(SNAPSHOT_FIELDS)
+    assert not hasattr(record, "__dict__")
+
+
+def test_lookup_and_views_share_records():
+    store = _store()
+    assert len(store) == 4 and 3 in store and 9 not in store
+    assert [mb.external_id for mb in store] == [1, 2, 3, 4]
+
+    by_infra = store.group_by("infra_type")
+    assert list(by_infra) == ["GR", "AO"]
+    assert [mb.external_id for mb in by_infra["GR"]] == [1, 4]
+    assert isinstance(by_infra["GR"], MailboxView) and by_infra["GR"][0] is store.get(1)
+    assert [mb.external_id for mb in by_infra["AO"][1:]] == [3]
+
+    nested = store.nested("workspace_name", "infra_type")
+    assert {ws: {infra: len(view) for infra, view in groups.items()} for ws, groups in nested.items()} == {
+        "WS1": {"GR": 2, "AO": 1}, "WS2": {"AO": 1}}
+
+    # Interned strings: equal domains are the same object
+    assert store.get(1).domain is store.get(3).domain
+
+    # Views are cached until the next add
+    assert store.group_by("infra_type") is by_infra
+    store.add(MailboxRecord.from_api(_api_mailbox(5, "d.org"), "WS3", "L"))
+    assert list(store.group_by("infra_type")) == ["GR", "AO", "L"]
+
+    ws1 = store.filter(lambda mb: mb.workspace_name == "WS1")
+    assert [mb.external_id for mb in ws1] == [1, 3, 4] and ws1.get(1) is store.get(1)
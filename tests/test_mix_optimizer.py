@@ -0,0 +1,36 @@
+"""Mix optimizer picks the cheapest mix that meets every constraint"""
+from mix_optimizer import optimize_mix
+
+RATES = {"GR": 0.09, "AO": 0.06, "MD SMTP": 0.12}
+BOUNCES = {"GR": 0.6, "AO": 2.4, "MD SMTP": 1.1}
+
+
+def test_constraints_hold_and_cost_rises():
+    free = optimize_mix(100000, positive_rates=RATES, bounce_rates=BOUNCES)
+    assert free["feasible"] == free["evaluated"]
+    costs = [free["best"]["horizon_cost"]] + [alt["horizon_cost"] for alt in free["alternatives"]]
+    assert costs == sorted(costs)
+
+    constrained = optimize_mix(100000, positive_rates=RATES, bounce_rates=BOUNCES,
+                               max_share={"AO": 0.3}, lead_weeks=3,
+                               min_positives_per_month=2500, max_bounce_rate=1.5)
+    best = constrained["best"]
+    assert best["mix"].get("AO", 0) <= 0.3
+    assert "GR" not in best["mix"]          # 4 weeks of warmup
+    assert best["positives_per_month"] >= 2500
+    assert best["bounce_rate"] <= 1.5
+    assert best["horizon_cost"] >= free["best"]["horizon_cost"]
+    assert abs(sum(best["mix"].values()) - 1) < 1e-9
+
+
+def test_infeasible():
+    result = optimize_mix(100000, positive_rates=RATES, min_positives_per_month=10 ** 9)
+    assert result["best"] is None and result["feasible"] == 0
+
+
+def test_capacity_reaches_uneven_targets():
+    for target, max_share in ((33333, {"AO": 0.3}), (100007, None), (12345, {"AO": 0.5, "GR": 0.5}), (999, None)):
+        result = optimize_mix(target, positive_rates=RATES, max_share=max_share)
+        for scenario in [result["best"]] + result["alternatives"]:
+            assert scenario["capacity"] >= target
+            assert sum(scenario["sends"].values()) == target
@@ -0,0 +1,53 @@
+"""Projection grid: tenant pricing for AO, and mixes add up per infra type"""
+import numpy as np
+
+from config import INFRA_COSTS
+from projections import mix_grid, parse_mix, project_grid, pure_mixes
+
+INFRA = ["MD SMTP", "GR", "AO"]
+
+
+def test_ao_is_tenant_priced():
+    grid = project_grid([100000], pure_mixes(INFRA), INFRA)
+    ao = INFRA_COSTS["AO"]
+    tenants = 100000 // ao["sends_per_day"] // ao["mailboxes_per_tenant"]
+    assert grid["monthly_cost"][0, 2] == tenants * ao["monthly_per_tenant"]
+    assert grid["capacity"][0, 2] == 100000
+    assert grid["setup_cost"][0, 2] == tenants * ao["tenant_cost"] + tenants * ao["aged_domain_cost"]
+    assert grid["domains_needed"][0, 2] == tenants
+
+
+def test_mix_is_sum_of_its_parts():
+    targets = [1000, 55555, 100000]
+    mixes = np.vstack([mix_grid(INFRA, 0.25), parse_mix("GR:2,AO:1", INFRA)])
+    rates = np.array([[0.1, 0.2, 0.05], [0.0, 0.3, 0.1]])
+    grid = project_grid(targets, mixes, INFRA, positive_rates=rates, horizons_weeks=[2, 8])
+    assert grid["cost_per_positive"].shape == (3, len(mixes), 2)
+    assert grid["horizon_cost_per_positive"].shape == (3, len(mixes), 2, 2)
+
+    for t, target in enumerate(targets):
+        for m, mix in enumerate(mixes):
+            for i, infra_type in enumerate(INFRA):
+                alone = project_grid([grid["sends"][t, m, i]], [np.eye(3)[i]], INFRA, positive_rates=rates)
+                if grid["sends"][t, m, i]:
+                    assert grid["infra_monthly_cost"][t, m, i] == alone["monthly_cost"][0, 0]
+                    assert grid["mailboxes"][t, m, i] == alone["mailboxes_needed"][0, 0]
+            assert grid["sends"][t, m].sum() == target
+            assert grid["capacity"][t, m] >= target
+    # Horizons shorter than the warmup bring no positives
+    assert (grid["horizon_positives"][:, :, 0, :] == 0).all()
+
+
+def test_uneven_targets_round_up():
+    ao = INFRA_COSTS["AO"]
+    grid = project_grid([100007], pure_mixes(INFRA), INFRA)
+    assert grid["mailboxes"][0, 2, 2] == 10001
+    assert grid["tenants"][0, 2, 2] == -(-10001 // ao["mailboxes_per_tenant"])
+    md = INFRA_COSTS["MD SMTP"]
+    assert grid["domains"][0, 0, 0] == -(-grid["mailboxes"][0, 0, 0] // md["mailboxes_per_domain"])
+
+    # Largest remainder: 33333 * (1/3 each) -> 11111 each; 10 * (0.25, 0.25, 0.5) stays exact
+    grid = project_grid([33333, 10, 7], [[1 / 3, 1 / 3, 1 / 3], [0.25, 0.25, 0.5]], INFRA)
+    assert grid["sends"][0, 0].tolist() == [11111, 11111, 11111]
+    assert grid["sends"][1, 1].tolist() == [3, 2, 5]
+    assert grid["sends"].sum(axis=2).tolist() == [[33333, 33333], [10, 10], [7, 7]]
@@ -0,0 +1,69 @@
+"""Query layer: caches dropped on a new generation, guarded invalidation, capped query windows"""
+import pytest
+
+import query_layer
+import server
+
+
+@pytest.fixture
+def reads(monkeypatch):
+    reads = []
+
+    def select(table, filters=None, select="*", order=None, workers=1):
+        reads.append(table)
+        return [{"n": len(reads)}]
+
+    clock = [0.0]
+    generation = [("2025-03-01", "done", "2025-03-01T11:40:00+00:00", None)]
+    monkeypatch.setattr(query_layer, "supabase_select", select)
+    monkeypatch.setattr(query_layer.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(query_layer, "collector_generation", lambda: generation[0])
+    monkeypatch.setattr(query_layer, "_generation", {"token": None, "checked_at": float("-inf")})
+    query_layer.invalidate()
+    return reads, clock, generation
+
+
+def test_generation_change_drops_caches(reads):
+    reads, clock, generation = reads
+    first = query_layer.daily_infra_stats("2025-02-01", "2025-02-28")
+    assert query_layer.daily_infra_stats("2025-02-01", "2025-02-28") is first
+
+    # A backfill bumps data_generations: dropped on the next check, not before
+    generation[0] = generation[0][:3] + ("2025-03-02T11:10:00+00:00",)
+    clock[0] = query_layer.GENERATION_CHECK_SECONDS - 1
+    assert query_layer.daily_infra_stats("2025-02-01", "2025-02-28") is first
+    clock[0] = query_layer.GENERATION_CHECK_SECONDS
+    assert query_layer.daily_infra_stats("2025-02-01", "2025-02-28") == [{"n": 2}]
+
+    # An unavailable check keeps the caches
+    generation[0] = None
+    clock[0] *= 2
+    assert query_layer.daily_infra_stats("2025-02-01", "2025-02-28") == [{"n": 2}]
+    assert reads == ["daily_infra_stats"] * 2
+
+
+def test_invalidate_needs_token(reads, monkeypatch):
+    reads, _, _ = reads
+    client = server.app.test_client()
+    query_layer.daily_infra_stats("2025-02-01", "2025-02-28")
+
+    monkeypatch.delenv("CACHE_INVALIDATE_TOKEN", raising=False)
+    assert client.post("/api/cache/invalidate").status_code == 403
+    monkeypatch.setenv("CACHE_INVALIDATE_TOKEN", "s3cret")
+    assert client.post("/api/cache/invalidate").status_code == 401
+    assert client.post("/api/cache/invalidate", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    query_layer.daily_infra_stats("2025-02-01", "2025-02-28")
+    assert reads == ["daily_infra_stats"]
+
+    assert client.post("/api/cache/invalidate", headers={"Authorization": "Bearer s3cret"}).status_code == 200
+    query_layer.daily_infra_stats("2025-02-01", "2025-02-28")
+    assert reads == ["daily_infra_stats"] * 2
+
+
+def test_query_window_is_capped(reads):
+    reads, _, _ = reads
+    client = server.app.test_client()
+    assert client.get("/api/query/daily_infra_stats?start=2024-01-01&end=2025-01-01").status_code == 400
+    ok = client.get("/api/query/daily_domain_stats?start=2024-01-02&end=2025-01-01")
+    assert ok.status_code == 200 and ok.get_json() == [{"n": 1}]
+    assert reads == ["daily_domain_stats"]
@@ -0,0 +1,35 @@
+"""Prepared responses: one body per encoding, 304 on a matching ETag"""
+import gzip
+
+from flask import Flask
+
+from response_cache import PreparedResponse, send_prepared
+
+app = Flask(__name__)
+BODY = b'{"rows": [' + b",".join(b'{"n": %d}' % i for i in range(500)) + b"]}\n"
+prepared = PreparedResponse(BODY)
+
+
+@app.route("/data")
+def data():
+    return send_prepared(prepared)
+
+
+def test_encodings_and_conditional_get():
+    client = app.test_client()
+    plain = client.get("/data")
+    assert plain.data == BODY and "Content-Encoding" not in plain.headers
+
+    zipped = client.get("/data", headers={"Accept-Encoding": "gzip"})
+    assert zipped.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(zipped.data) == BODY
+    assert zipped.headers["ETag"] == plain.headers["ETag"]
+    assert client.get("/data", headers={"Accept-Encoding": "gzip;q=0"}).data == BODY
+
+    cached = client.get("/data", headers={"If-None-Match": plain.headers["ETag"]})
+    assert cached.status_code == 304 and cached.data == b""
+    assert client.get("/data", headers={"If-None-Match": 'W/"other"'}).status_code == 200
+
+
+def test_small_bodies_not_compressed():
+    assert PreparedResponse(b"{}").encoded == {}
@@ -0,0 +1,49 @@
+"""Spilled group-by gives the same groups, sums and order as the in-memory one"""
+import os
+import random
+
+from spill_aggregator import SpillAggregator
+from supabase_domain_aggregator import aggregate_by_domain, aggregate_domains, domain_records
+
+
+def _rows(n: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        rows.append({
+            "Mailbox": f"m{i}",
+            "Domain": f" D{rng.randrange(40)}.{rng.choice(['com', 'net', 'io'])} " if i % 11 else "",
+            "Client": f"C{rng.randrange(3)}",
+            "Tag": rng.choice(["GR", "AO", None, ""]),
+            "Email Sent": rng.randrange(200),
+            "Reply Count": rng.randrange(5),
+            "Bounce Count": rng.choice([0, 1, None]),
+            "interested_response": rng.randrange(2),
+        })
+    return rows
+
+
+def test_spill_matches_memory():
+    rows = _rows(2000)
+    expected = aggregate_by_domain(rows)
+
+    for max_keys in (1, 3, 50):
+        aggregator, count = aggregate_domains(iter(rows), max_keys=max_keys)
+        with aggregator:
+            assert count == len(rows)
+            assert aggregator.spills > 0
+            assert len(aggregator) == len(expected)
+            assert list(domain_records(aggregator)) == expected
+            # items() can be read again after the spill file is merged
+            assert list(domain_records(aggregator)) == expected
+
+
+def test_first_seen_survives_spill(tmp_path):
+    with SpillAggregator(["k"], ["n"], ["first"], max_keys=1, directory=str(tmp_path)) as agg:
+        agg.add(("a",), [1], [None])
+        agg.add(("b",), [1], ["b1"])   # spills a
+        agg.add(("a",), [2], ["a2"])   # spills b; a's stored first is still unset
+        agg.add(("b",), [3], ["b2"])   # spills a
+        assert list(agg.items()) == [(("a",), {"n": 3, "first": "a2"}), (("b",), {"n": 4, "first": "b1"})]
+        assert len(os.listdir(tmp_path)) == 1
+    assert os.listdir(tmp_path) == []
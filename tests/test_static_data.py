@@ -0,0 +1,117 @@
+"""data.json snapshots: changes are swapped in whole, bad files are ignored"""
+import json
+import os
+import time
+
+from static_data import StaticDataStore
+
+
+def _validate(data):
+    if not isinstance(data, dict):
+        raise ValueError("not an object")
+
+
+def _write(path, data):
+    tmp = str(path) + ".tmp"
+    with open(tmp, "w") as f:
+        f.write(data if isinstance(data, str) else json.dumps(data))
+    os.replace(tmp, path)
+
+
+def _wait_for(store, predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        snapshot = store.snapshot()
+        if predicate(snapshot):
+            return snapshot
+        time.sleep(0.01)
+    return store.snapshot()
+
+
+def test_reload_swaps_snapshot(tmp_path):
+    data_path, version_path = tmp_path / "data.json", tmp_path / "data.version.json"
+    _write(data_path, {"14d": {"n": 1}})
+    _write(version_path, {"version": "v1"})
+    store = StaticDataStore(str(data_path), str(version_path), validate=_validate, check_seconds=0)
+
+    first = store.snapshot()
+    assert (first.data, first.version) == ({"14d": {"n": 1}}, "v1")
+
+    _write(data_path, {"14d": {"n": 2}, "7d": {}})
+    _write(version_path, {"version": "v2"})
+    second = _wait_for(store, lambda s: s.version == "v2")
+    assert second.data == {"14d": {"n": 2}, "7d": {}}
+    assert second.key != first.key
+    assert first.data == {"14d": {"n": 1}}   # old snapshot untouched
+
+
+def test_bad_file_keeps_previous_snapshot(tmp_path):
+    data_path = tmp_path / "data.json"
+    _write(data_path, {"14d": {}})
+    store = StaticDataStore(str(data_path), str(tmp_path / "missing.json"), validate=_validate, check_seconds=0)
+    good = store.snapshot()
+
+    for bad in ('{"14d": ', "[1, 2]"):
+        _write(data_path, bad)
+        store.snapshot()
+        assert store.reload() is good
+
+    _write(data_path, {"30d": {}})
+    assert _wait_for(store, lambda s: "30d" in s.data).data == {"30d": {}}
+
+
+def test_sharded_snapshot_matches_data_json(tmp_path):
+    from collection_pipeline import write_data_json
+
+    results = {
+        "7d": {"by_infra": {"GR": {"sent": 10}}, "by_client": {"Reev": {"GR": {"sent": 4}}, "A/B Co": {"GR": {"sent": 6}}},
+               "totals": {"sent": 10}, "meta": {"period": "7d"}},
+        "14d": {"by_infra": {}, "totals": {}, "meta": {"period": "14d"}},
+        "projections": {"GR": {"monthly_cost": 1.5}},
+    }
+    data_path = tmp_path / "data.json"
+    write_data_json(results, str(data_path))
+    store = StaticDataStore(str(data_path), str(tmp_path / "data.version.json"), validate=_validate,
+                            manifest_path=str(tmp_path / "data" / "manifest.json"))
+
+    snapshot = store.snapshot()
+    assert snapshot.sharded
+    assert snapshot.period("7d", clients=["A/B Co", "missing"])["by_client"] == {"A/B Co": {"GR": {"sent": 6}}}
+    assert len(snapshot._shards) == 2
+    assert snapshot.period("7d", clients=[])["totals"] == {"sent": 10}
+    assert snapshot.section("projections") == results["projections"]
+    assert snapshot.data == results
+    assert list(snapshot.data["7d"]) == list(results["7d"])
+
+    # A newer data.json without matching shards is read whole
+    results["7d"]["totals"] = {"sent": 11}
+    _write(data_path, results)
+    _write(tmp_path / "data.version.json", {"version": "hand-edited"})
+    fallback = store.reload()
+    assert not fallback.sharded and fallback.period("7d")["totals"] == {"sent": 11}
+
+
+def test_pruned_shards_read_from_current_version(tmp_path):
+    from collection_pipeline import write_data_json
+
+    def results(n):
+        return {"7d": {"by_infra": {}, "by_client": {"Reev": {"GR": {"sent": n}}}, "totals": {"sent": n}},
+                "projections": {"GR": {"monthly_cost": n}}}
+
+    data_path = tmp_path / "data.json"
+    write_data_json(results(1), str(data_path))
+    store = StaticDataStore(str(data_path), str(tmp_path / "data.version.json"), validate=_validate,
+                            manifest_path=str(tmp_path / "data" / "manifest.json"))
+    old = store.snapshot()
+    assert old.period("7d", clients=[])["totals"] == {"sent": 1}      # read before the prune
+
+    # Two more publishes remove the first version's folder
+    for n in (2, 3):
+        time.sleep(0.01)
+        write_data_json(results(n), str(data_path))
+    assert not os.path.exists(os.path.join(old.shards_dir, old.version))
+
+    assert old.period("7d", clients=[])["totals"] == {"sent": 1}
+    assert old.period("7d", clients=["Reev"])["by_client"] == {"Reev": {"GR": {"sent": 3}}}
+    assert old.section("projections") == {"GR": {"monthly_cost": 3}}
+    assert store.reload().period("7d")["totals"] == {"sent": 3}
@@ -0,0 +1,75 @@
+"""StatsCube building, slicing, rollups and serialization"""
+import numpy as np
+
+from allocation import METRICS, build_membership
+from stats_cube import StatsCube
+
+
+def _mb(domain: str) -> dict:
+    tld = "." + domain.split(".")[-1] if domain else ""
+    return {"domain": domain, "tld": tld}
+
+
+def _cube():
+    membership = build_membership({
+        "WS1": {"GR": [_mb("a.com"), _mb("b.net"), _mb("")], "AO": [_mb("c.io")], "L": []},
+        "WS2": {"GR": [_mb("d.com"), _mb("d.com")]},
+    })
+    dates = ["2025-01-03", "2025-01-01", "2025-01-02"]
+    rng = np.random.default_rng(3)
+    stats = rng.integers(0, 1000, (len(dates), len(membership["groups"]), len(METRICS)))
+    return StatsCube.from_group_stats(dates, stats, membership), dates, stats, membership
+
+
+def test_sums_match_group_totals():
+    cube, dates, stats, membership = _cube()
+    assert cube.labels["date"] == sorted(dates)
+    assert cube.labels["tld"][-1] == ""
+
+    by_group = cube.sum(("date", "workspace", "infra_type"))
+    order = np.argsort(dates)
+    for g, (workspace, infra) in enumerate(membership["groups"]):
+        w = cube.labels["workspace"].index(workspace)
+        i = cube.labels["infra_type"].index(infra)
+        assert by_group[:, w, i].tolist() == stats[order, g].tolist()
+
+
+def test_slice_and_totals():
+    cube, dates, stats, membership = _cube()
+    day = cube.slice(start="2025-01-02", end="2025-01-02", workspaces=["WS1"])
+    assert day.labels["date"] == ["2025-01-02"]
+    assert day.labels["workspace"] == ["WS1"]
+    assert all(key[1] == "WS1" for key in day.domain_keys)
+
+    g = membership["groups"].index(("WS1", "AO"))
+    expected = dict(zip(METRICS, stats[dates.index("2025-01-02"), g].tolist()))
+    assert day.totals(by=("infra_type",))["AO"] == expected
+    assert day.totals(by=("tld",)).get(".io") == expected
+
+
+def test_rate_and_top_k():
+    cube, _, _, _ = _cube()
+    summed = cube.sum(("workspace",))
+    rates = cube.rate("bounced", by=("workspace",))
+    for w in range(len(cube.labels["workspace"])):
+        sent, bounced = summed[w, 0], summed[w, 2]
+        assert np.isclose(rates[w], bounced / sent * 100 if sent else 0)
+
+    top = cube.top_k(2, by="infra_type", metric="sent")
+    sent = dict(zip(cube.labels["infra_type"], cube.sum(("infra_type",))[:, 0].tolist()))
+    assert [value for _, value in top] == sorted(sent.values(), reverse=True)[:2]
+
+    domains = cube.top_k(10, by="domain", metric="bounced", rate=True)
+    assert len(domains) == len(cube.domain_keys)
+    assert [v for _, v in domains] == sorted((v for _, v in domains), reverse=True)
+
+
+def test_save_load_roundtrip(tmp_path):
+    cube, _, _, _ = _cube()
+    path = str(tmp_path / "cube.npz")
+    cube.save(path)
+    loaded = StatsCube.load(path)
+    assert loaded.labels == cube.labels
+    assert np.array_equal(loaded.values, cube.values)
+    assert loaded.domain_keys == cube.domain_keys
+    assert np.array_equal(loaded.domain_values, cube.domain_values)
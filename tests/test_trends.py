@@ -0,0 +1,51 @@
+"""Trend series sum daily stats into the dashboard's buckets"""
+import random
+
+from trends import trend_series
+
+
+def _rows(seed: int = 5) -> list:
+    rng = random.Random(seed)
+    rows = []
+    for day in range(1, 11):
+        for infra in ("GR", "AO", "L"):
+            for workspace in ("C1", "C2"):
+                if rng.random() < 0.2:
+                    continue
+                rows.append({
+                    "date": f"2025-03-{day:02d}",
+                    "infra_type": infra,
+                    "workspace_name": workspace,
+                    "emails_sent": rng.randrange(0, 500),
+                    "replies": rng.randrange(10),
+                    "interested": rng.randrange(3),
+                    "bounces": rng.randrange(5),
+                })
+    rng.shuffle(rows)
+    return rows
+
+
+def test_buckets_match_daily_sums():
+    rows = _rows()
+    trends = trend_series(rows, "infra", bucket_days=3)
+    assert [b["label"] for b in trends["buckets"]] == ["03-01 - 03-03", "03-04 - 03-06", "03-07 - 03-09", "03-10"]
+
+    for infra, series in trends["series"].items():
+        for i, bucket in enumerate(trends["buckets"]):
+            chunk = [r for r in rows if r["infra_type"] == infra and bucket["start"] <= r["date"] <= bucket["end"]]
+            sent = sum(r["emails_sent"] for r in chunk)
+            assert series["sent"][i] == sent
+            assert series["bounced"][i] == sum(r["bounces"] for r in chunk)
+            if sent:
+                assert abs(series["reply_rate"][i] - sum(r["replies"] for r in chunk) / sent * 100) < 1e-3
+
+
+def test_total_and_top():
+    rows = _rows()
+    total = trend_series(rows, "total", bucket_days=7)
+    assert list(total["series"]) == ["all"]
+    assert total["series"]["all"]["total_sent"] == sum(r["emails_sent"] for r in rows)
+
+    top = trend_series(rows, "workspace", top=1)
+    sent = {ws: sum(r["emails_sent"] for r in rows if r["workspace_name"] == ws) for ws in ("C1", "C2")}
+    assert list(top["series"]) == [max(sent, key=sent.get)]
@@ -0,0 +1,89 @@
+"""Warehouse mode: periods from stored daily rows, missing days filled from the API, parallel paging"""
+import analyzer
+import supabase_data_collector
+from analyzer import analyze_stored_periods, index_mailboxes, summarize_groups, sum_daily_stats
+from mailbox_store import MailboxRecord, MailboxStore
+
+WINDOWS = {"3d": ("2025-03-07", "2025-03-10", 3), "7d": ("2025-03-03", "2025-03-10", 7)}
+STORED_DAYS = [f"2025-03-{d:02d}" for d in range(3, 11) if d != 8]   # 03-08 never stored
+
+
+def _day_stats(day: str, infra: str) -> list:
+    d = int(day[-2:])
+    return [100 * d + (5 if infra == "AO" else 0), d, 1, d % 2]
+
+
+class DailyClient:
+    """get_sender_email_stats_daily for every date in range; records the ranges asked for"""
+
+    def __init__(self):
+        self.calls = []
+
+    def get_sender_email_stats_daily(self, ids, start_date, end_date):
+        self.calls.append((start_date, end_date))
+        days = [f"2025-03-{d:02d}" for d in range(int(start_date[-2:]), int(end_date[-2:]) + 1)]
+        return {day: dict(zip(("sent", "replied", "bounced", "interested"), _day_stats(day, "GR")))
+                for day in days}
+
+
+def _mailbox_data(client) -> dict:
+    store = MailboxStore()
+    for i, infra in enumerate(("GR", "GR", "AO")):
+        store.add(MailboxRecord(email=f"u{i}@a.com", domain="a.com", tld=".com", workspace_name="WS1",
+                                infra_type=infra, daily_limit=5, external_id=i + 1))
+    return index_mailboxes(store, {}, clients={"WS1": client})
+
+
+def test_periods_with_filled_days(monkeypatch):
+    rows = [{"date": day, "workspace_name": "WS1", "infra_type": infra,
+             **dict(zip(analyzer.STORED_METRIC_COLUMNS, _day_stats(day, infra)))}
+            for day in STORED_DAYS for infra in ("GR", "AO")]
+    reads = []
+
+    def select(table, filters=None, select="*", order=None, workers=1):
+        reads.append((table, filters))
+        return rows
+
+    monkeypatch.setattr(analyzer, "supabase_select", select)
+    monkeypatch.setattr(analyzer, "get_date_range", lambda period: WINDOWS[period])
+    client = DailyClient()
+    results = analyze_stored_periods(_mailbox_data(client), list(WINDOWS))
+
+    # One read of the widest window, one API call per group for the missing day only
+    assert reads == [("daily_infra_stats", [("date", "gte.2025-03-03"), ("date", "lte.2025-03-10")])]
+    assert client.calls == [("2025-03-08", "2025-03-08")] * 2
+
+    daily = {("WS1", infra): {day: _day_stats(day, "GR" if day == "2025-03-08" else infra)
+                              for day in STORED_DAYS + ["2025-03-08"]} for infra in ("GR", "AO")}
+    mailbox_data = _mailbox_data(client)
+    for period, (start, end, num_days) in WINDOWS.items():
+        expected = summarize_groups(mailbox_data, sum_daily_stats(daily, start, end)[0], num_days)
+        meta = results[period].pop("meta")
+        assert results[period] == expected
+        assert meta["filled_dates"] == ["2025-03-08"] and meta["source"] == "warehouse"
+
+
+class Page:
+    def __init__(self, rows, total):
+        self.rows = rows
+        self.headers = {"Content-Range": f"0-{len(rows) - 1}/{total}"}
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return list(self.rows)
+
+
+def test_parallel_pages_keep_order(monkeypatch):
+    table = [{"id": i} for i in range(2345)]
+
+    def get(url, headers=None, params=None, timeout=None):
+        params = dict(params)
+        offset, limit = params["offset"], params["limit"]
+        return Page(table[offset:offset + limit], len(table))
+
+    monkeypatch.setattr(supabase_data_collector.requests, "get", get)
+    for workers in (1, 4):
+        assert supabase_data_collector.supabase_select("t", order="id.asc", page_size=100,
+                                                       workers=workers) == table
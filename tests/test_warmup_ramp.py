@@ -0,0 +1,54 @@
+"""Warmup ramp: vectorized capacities match a per-mailbox day-by-day ramp"""
+from datetime import date, timedelta
+
+from analyzer import index_mailboxes
+from config import INFRA_COSTS, INFRA_MAX_LIMITS
+from mailbox_store import MailboxRecord, MailboxStore
+from warmup_ramp import simulate_warmup_ramp
+
+TODAY = date(2025, 3, 1)
+ROWS = [  # infra, workspace, daily_limit, created_at, warming
+    ("GR", "WS1", 5, "2025-02-20", True),
+    ("GR", "WS1", 20, "2024-12-01", False),
+    ("AO", "WS2", 2, None, True),
+    ("MD SMTP", "WS2", 3, "2025-01-01", True),   # overdue: full from day 1
+    ("L", "WS1", 1, "2025-02-28", False),
+]
+
+
+def _warmup_limit(i, warming):
+    return (4 + i) * warming
+
+
+def _expected(infra, limit, created, warming, day, warmup_limit):
+    if not warming:
+        return limit
+    limit = warmup_limit            # warming mailboxes ramp from what they send today
+    weeks = INFRA_COSTS.get(infra, {}).get("warmup_weeks", 4)
+    start = date.fromisoformat(created) if created else TODAY
+    days_left = max((start + timedelta(weeks=weeks) - TODAY).days, 0)
+    return limit + (INFRA_MAX_LIMITS[infra] - limit) * min(day / max(days_left, 1), 1)
+
+
+def test_ramp_matches_scalar():
+    store = MailboxStore()
+    for i, (infra, workspace, limit, created, _) in enumerate(ROWS):
+        store.add(MailboxRecord(email=f"u{i}@d{i}.com", domain=f"d{i}.com", tld=".com",
+                                workspace_name=workspace, infra_type=infra, daily_limit=limit,
+                                external_id=i + 1, created_at=created and created + "T08:00:00Z"))
+    warmup = {"WS": [{"id": i + 1, "warmup_enabled": row[4], "warmup_daily_limit": _warmup_limit(i, row[4])}
+                     for i, row in enumerate(ROWS)]}
+    ramp = simulate_warmup_ramp(index_mailboxes(store, warmup, {}), weeks=5, today=TODAY)
+
+    assert len(ramp["dates"]) == 35 and ramp["dates"][0] == TODAY.isoformat()
+    for infra in ("GR", "AO", "MD SMTP", "L"):
+        rows = [(i, row) for i, row in enumerate(ROWS) if row[0] == infra]
+        expected = [round(sum(_expected(r[0], r[2], r[3], r[4], d, _warmup_limit(i, r[4])) for i, r in rows))
+                    for d in range(35)]
+        assert ramp["by_infra"][infra]["capacity"] == expected
+        assert ramp["by_infra"][infra]["in_warmup"] == sum(r[4] for _, r in rows)
+    assert ramp["by_infra"]["GR"]["current_capacity"] == 4 + 20     # warmup limit, not daily_limit 5
+    assert ramp["by_infra"]["MD SMTP"]["reaches_max_on"] == "2025-03-02"
+    assert ramp["by_infra"]["L"]["reaches_max_on"] is None
+    assert ramp["by_workspace"]["WS1"]["mailbox_count"] == 3
+    assert ramp["totals"]["theoretical_max"] == sum(INFRA_MAX_LIMITS[r[0]] for r in ROWS)
@@ -0,0 +1,91 @@
+"""Workspace partials merge to the same period output as summarize_groups"""
+import json
+
+from analyzer import index_mailboxes, summarize_groups, sum_daily_stats
+from mailbox_store import MailboxRecord, MailboxStore
+from workspace_partials import merge_partials, workspace_hash, workspace_partial
+
+WINDOWS = {"3d": ("2025-01-03", "2025-01-06", 3), "7d": ("2025-01-01", "2025-01-08", 7)}
+
+
+def _store() -> MailboxStore:
+    store = MailboxStore()
+    rows = [
+        ("WS1", "GR", "a.com"), ("WS1", "GR", "a.com"), ("WS1", "GR", "b.net"), ("WS1", "GR", ""),
+        ("WS1", "AO", "a.com"), ("WS1", "AO", "c.io"),
+        ("WS2", "GR", "a.com"), ("WS2", "GR", "d.org"), ("WS2", "L", "e.co"),
+    ]
+    for i, (workspace, infra, domain) in enumerate(rows):
+        store.add(MailboxRecord(email=f"u{i}@{domain}", domain=domain,
+                                tld="." + domain.split(".")[-1] if domain else "",
+                                workspace_name=workspace, infra_type=infra,
+                                daily_limit=5 + i, external_id=i + 1))
+    return store
+
+
+def _inputs():
+    warmup = {
+        "WS1": [{"id": 1, "warmup_enabled": True, "warmup_daily_limit": 10},
+                {"id": 5, "warmup_enabled": False}],
+        "WS2": [{"id": 7, "warmup_enabled": True, "warmup_daily_limit": 3}],
+    }
+    mailbox_data = index_mailboxes(_store(), warmup, clients={})
+    daily = {
+        ("WS1", "GR"): {f"2025-01-0{d}": [100 * d, 3 * d, d, d % 2] for d in range(1, 9)},
+        ("WS1", "AO"): {"2025-01-02": [51, 2, 1, 1]},
+        ("WS2", "GR"): {f"2025-01-0{d}": [77, 5, 0, 1] for d in range(4, 7)},
+        # ("WS2", "L") was not collected
+    }
+    return mailbox_data, warmup, daily
+
+
+def _partials(mailbox_data, warmup, daily, roundtrip=False):
+    partials = []
+    for workspace, infra_groups in mailbox_data["by_workspace_infra"].items():
+        partial = workspace_partial(workspace, infra_groups, warmup.get(workspace, []), daily, WINDOWS)
+        partials.append(json.loads(json.dumps(partial)) if roundtrip else partial)
+    return partials
+
+
+def test_merge_matches_summarize_groups():
+    mailbox_data, warmup, daily = _inputs()
+    for roundtrip in (False, True):
+        merged = merge_partials(_partials(mailbox_data, warmup, daily, roundtrip), WINDOWS)
+        for period, (start, end, num_days) in WINDOWS.items():
+            group_results, _ = sum_daily_stats(daily, start, end)
+            expected = summarize_groups(mailbox_data, group_results, num_days)
+            assert json.dumps(merged[period]) == json.dumps(expected)
+
+
+def test_hash_tracks_only_own_inputs():
+    mailbox_data, warmup, daily = _inputs()
+    ws1 = mailbox_data["by_workspace_infra"]["WS1"]
+    before = workspace_hash("WS1", ws1, warmup["WS1"], daily, WINDOWS)
+
+    other = dict(daily)
+    other[("WS2", "GR")] = {"2025-01-05": [1, 0, 0, 0]}
+    assert workspace_hash("WS1", ws1, warmup["WS1"], other, WINDOWS) == before
+
+    own = dict(daily)
+    own[("WS1", "AO")] = {"2025-01-02": [52, 2, 1, 1]}
+    assert workspace_hash("WS1", ws1, warmup["WS1"], own, WINDOWS) != before
+    assert workspace_hash("WS1", ws1, warmup["WS1"], daily, {"3d": WINDOWS["3d"]}) != before
+
+
+def test_hash_survives_windows_rolling_forward():
+    mailbox_data, warmup, daily = _inputs()
+    ws1 = mailbox_data["by_workspace_infra"]["WS1"]
+    idle = {key: by_date for key, by_date in daily.items() if key[0] == "WS1"}
+    idle[("WS1", "GR")] = {"2025-01-04": [10, 1, 0, 0]}
+    idle[("WS1", "AO")] = {}
+    rolled = {"3d": ("2025-01-04", "2025-01-07", 3), "7d": ("2025-01-02", "2025-01-09", 7)}
+    before = workspace_hash("WS1", ws1, warmup["WS1"], idle, WINDOWS)
+
+    # Same sums in the new windows: the cached partial is still valid
+    assert workspace_hash("WS1", ws1, warmup["WS1"], idle, rolled) == before
+    assert (workspace_partial("WS1", ws1, warmup["WS1"], idle, rolled)
+            == workspace_partial("WS1", ws1, warmup["WS1"], idle, WINDOWS))
+
+    # A day leaving the window changes the sums
+    moved = {"3d": ("2025-01-05", "2025-01-08", 3), "7d": WINDOWS["7d"]}
+    assert workspace_hash("WS1", ws1, warmup["WS1"], idle, moved) != before
@@ -0,0 +1,165 @@
+"""
+RGL Infra Tracking - Trend Series
+Daily stats bucketed and grouped on the server for the trend charts
+
+daily_infra_stats rows (through the query layer) are summed per group
+and per bucket of bucket_days consecutive data dates, the same buckets as
+the dashboard's aggregateByPeriod, and returned as one array per metric:
+
+    trends = get_trends("infra", 7, "2025-01-01", "2025-02-11", top=6)
+    trends["buckets"]                          # [{start, end, label}, ...]
+    trends["series"]["GR"]["positive_rate"]    # one value per bucket
+
+Long ranges can be cut to a number of points per series (LTTB or
+min/max windows on one metric, so spikes in it survive):
+
+    trends = get_trends("infra", 1, "2024-01-01", "2025-01-01", points=200, metric="bounce_rate")
+    trends["series"]["GR"]["dates"]            # start date of each kept bucket
+    trends["series"]["GR"]["labels"]           # and its label
+"""
+
+import numpy as np
+
+import query_layer
+from downsample import downsample_indices, DOWNSAMPLE_METHODS, MIN_POINTS
+from query_cache import TTLCache
+
+TREND_GROUPS = {"total": None, "infra": "infra_type", "workspace": "workspace_name"}
+MAX_BUCKET_DAYS = 366
+
+# Response metric -> daily_infra_stats column
+TREND_METRICS = {"sent": "emails_sent", "replied": "replies", "interested": "interested", "bounced": "bounces"}
+TREND_RATES = {"reply_rate": "replied", "positive_rate": "interested", "bounce_rate": "bounced"}
+DEFAULT_DOWNSAMPLE_METRIC = "bounce_rate"
+MAX_POINTS = 5000
+
+_trend_cache = query_layer.register_cache(TTLCache(max_entries=query_layer.QUERY_CACHE_MAX,
+                                                   ttl=query_layer.QUERY_CACHE_TTL))
+
+
+def bucket_dates(dates: list, bucket_days: int) -> list:
+    """Consecutive runs of bucket_days dates -> [{start, end, label}] (label as aggregateByPeriod)"""
+    buckets = []
+    for i in range(0, len(dates), bucket_days):
+        chunk = dates[i:i + bucket_days]
+        start, end = chunk[0], chunk[-1]
+        label = f"{start[5:]} - {end[5:]}" if len(chunk) > 1 else start[5:]
+        buckets.append({"start": start, "end": end, "label": label})
+    return buckets
+
+
+def trend_series(rows: list, group_by: str = "total", bucket_days: int = 1, top: int = None) -> dict:
+    """
+    Bucketed series per group from daily_infra_stats rows
+
+    Args:
+        rows: daily_infra_stats rows (any order)
+        group_by: "total", "infra" or "workspace"
+        bucket_days: Data dates per bucket
+        top: Keep only the top groups by emails sent
+
+    Returns:
+        {"group_by", "bucket_days", "buckets": [{start, end, label}],
+         "series": {group: {"total_sent", sent: [...], replied: [...], interested: [...],
+                            bounced: [...], reply_rate: [...], positive_rate: [...],
+                            bounce_rate: [...]}}}
+        Groups are ordered by emails sent, largest first; rates are percent.
+    """
+    column = TREND_GROUPS[group_by]
+    dates = sorted({str(row["date"])[:10] for row in rows})
+    bucket_of = {date: i // bucket_days for i, date in enumerate(dates)}
+    n_buckets = (len(dates) + bucket_days - 1) // bucket_days
+
+    sums = {}
+    for row in rows:
+        group = row.get(column) if column else "all"
+        if not group:
+            continue
+        series = sums.get(group)
+        if series is None:
+            series = sums[group] = {metric: [0] * n_buckets for metric in TREND_METRICS}
+        b = bucket_of[str(row["date"])[:10]]
+        for metric, field in TREND_METRICS.items():
+            series[metric][b] += row.get(field) or 0
+
+    ranked = sorted(sums, key=lambda g: (-sum(sums[g]["sent"]), g))
+    if top:
+        ranked = ranked[:top]
+
+    result = {}
+    for group in ranked:
+        series = sums[group]
+        out = {"total_sent": sum(series["sent"]), **series}
+        for rate, metric in TREND_RATES.items():
+            out[rate] = [round(v / sent * 100, 4) if sent > 0 else 0
+                         for v, sent in zip(series[metric], series["sent"])]
+        result[group] = out
+
+    return {
+        "group_by": group_by,
+        "bucket_days": bucket_days,
+        "buckets": bucket_dates(dates, bucket_days),
+        "series": result,
+    }
+
+
+def downsample_trends(trends: dict, points: int, method: str = "lttb",
+                      metric: str = DEFAULT_DOWNSAMPLE_METRIC) -> dict:
+    """
+    Keep at most points buckets per series, chosen on metric
+
+    Every metric of a series is sampled at the same buckets, listed in the
+    series' "dates" and "labels"; the shared "buckets" list is replaced by
+    "downsample".
+    """
+    x = np.array([b["start"] for b in trends["buckets"]], dtype="datetime64[D]").astype(np.int64)
+    series = {}
+    for group, values in trends["series"].items():
+        keep = downsample_indices(x, values[metric], points, method).tolist()
+        out = {"total_sent": values["total_sent"],
+               "dates": [trends["buckets"][i]["start"] for i in keep],
+               "labels": [trends["buckets"][i]["label"] for i in keep]}
+        for name in list(TREND_METRICS) + list(TREND_RATES):
+            out[name] = [values[name][i] for i in keep]
+        series[group] = out
+
+    return {
+        "group_by": trends["group_by"],
+        "bucket_days": trends["bucket_days"],
+        "downsample": {"points": points, "method": method, "metric": metric,
+                       "bucket_count": len(trends["buckets"])},
+        "series": series,
+    }
+
+
+def get_trends(group_by: str, bucket_days: int, start_date: str, end_date: str, top: int = None,
+               points: int = None, method: str = "lttb", metric: str = DEFAULT_DOWNSAMPLE_METRIC) -> dict:
+    """
+    Cached trend_series over [start_date, end_date] (dropped with the query cache),
+    downsampled to points per series if given
+
+    Raises ValueError for unknown groupings, bucket sizes or downsampling options
+    """
+    if group_by not in TREND_GROUPS:
+        raise ValueError(f"group must be one of: {', '.join(TREND_GROUPS)}")
+    if not 1 <= bucket_days <= MAX_BUCKET_DAYS:
+        raise ValueError(f"bucket must be between 1 and {MAX_BUCKET_DAYS} days")
+    if top is not None and top < 1:
+        raise ValueError("top must be positive")
+    if points is not None:
+        if not MIN_POINTS <= points <= MAX_POINTS:
+            raise ValueError(f"points must be between {MIN_POINTS} and {MAX_POINTS}")
+        if method not in DOWNSAMPLE_METHODS:
+            raise ValueError(f"method must be one of: {', '.join(DOWNSAMPLE_METHODS)}")
+        if metric not in TREND_METRICS and metric not in TREND_RATES:
+            raise ValueError(f"metric must be one of: {', '.join(list(TREND_METRICS) + list(TREND_RATES))}")
+
+    query_layer.check_generation()
+    full = _trend_cache.get_or_compute(
+        ("trends", group_by, bucket_days, start_date, end_date, top),
+        lambda: trend_series(query_layer.daily_infra_stats(start_date, end_date), group_by, bucket_days, top))
+    if points is None:
+        return full
+    return _trend_cache.get_or_compute(
+        ("downsampled", group_by, bucket_days, start_date, end_date, top, points, method, metric),
+        lambda: downsample_trends(full, points, method, metric))
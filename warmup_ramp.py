@@ -0,0 +1,159 @@
+"""
+RGL Infra Tracking - Warmup Ramp Simulator
+Projected daily sendable capacity per infra type and workspace
+
+Mailboxes still in warmup (warmup enabled with a warmup daily limit)
+ramp linearly from their warmup daily limit (what they actually send
+today; daily_limit is the campaign cap, not reached until warmup ends)
+to the infra's theoretical
+max (INFRA_MAX_LIMITS) by created_at + warmup_weeks (INFRA_COSTS, default
+4 weeks; mailboxes without created_at finish warmup_weeks from today).
+Every other mailbox stays at its daily_limit. The whole fleet is one
+(days, mailboxes) array pass:
+
+    ramp = simulate_warmup_ramp(mailbox_data, weeks=12)
+    ramp["by_infra"]["GR"]["capacity"]        # [day 0, day 1, ...] sends/day
+    ramp["by_infra"]["GR"]["reaches_max_on"]  # first date at theoretical max, or None
+"""
+
+from datetime import date, timedelta
+
+import numpy as np
+
+from config import INFRA_MAX_LIMITS
+from projections import cost_table
+
+# Default simulation horizon
+RAMP_WEEKS = 12
+
+
+def fleet_arrays(store, warmup_data: dict) -> dict:
+    """
+    Per-mailbox arrays for the simulator (one pass over the store)
+
+    Warmup state comes from the warmup API items when a mailbox has one
+    (as calculate_warmup_stats), otherwise from the record itself.
+    """
+    warmup_by_id = {}
+    for warmup_list in warmup_data.values():
+        for item in warmup_list:
+            if item.get("id"):
+                warmup_by_id[item["id"]] = item
+
+    infra_types, workspaces = [], []
+    infra_index, workspace_index = {}, {}
+    infra_codes, workspace_codes = [], []
+    daily_limit, warmup_limit, warming, created = [], [], [], []
+    for mb in store:
+        if mb.infra_type not in infra_index:
+            infra_index[mb.infra_type] = len(infra_types)
+            infra_types.append(mb.infra_type)
+        if mb.workspace_name not in workspace_index:
+            workspace_index[mb.workspace_name] = len(workspaces)
+            workspaces.append(mb.workspace_name)
+        infra_codes.append(infra_index[mb.infra_type])
+        workspace_codes.append(workspace_index[mb.workspace_name])
+        daily_limit.append(mb.daily_limit or 0)
+
+        item = warmup_by_id.get(mb.external_id)
+        if item is not None:
+            enabled, limit = item.get("warmup_enabled", False), item.get("warmup_daily_limit", 0)
+        else:
+            enabled, limit = mb.warmup_enabled, mb.warmup_daily_limit
+        warming.append(bool(enabled) and (limit or 0) > 0)
+        warmup_limit.append(limit or 0)
+        created.append(str(mb.created_at)[:10] if mb.created_at else "NaT")
+
+    return {
+        "infra_types": infra_types,
+        "workspaces": workspaces,
+        "infra": np.array(infra_codes, dtype=np.int64),
+        "workspace": np.array(workspace_codes, dtype=np.int64),
+        "daily_limit": np.array(daily_limit, dtype=np.float64),
+        "warmup_limit": np.array(warmup_limit, dtype=np.float64),
+        "warming": np.array(warming, dtype=bool),
+        "created": np.array(created, dtype="datetime64[D]"),
+    }
+
+
+def ramp_capacity(fleet: dict, days: int, today: date) -> np.ndarray:
+    """
+    Sendable capacity of every mailbox on each of the next days
+
+    Returns (days, mailboxes) float array, day 0 = today's capacity
+    """
+    table = cost_table(fleet["infra_types"])
+    target = np.array([INFRA_MAX_LIMITS.get(t, 10) for t in fleet["infra_types"]],
+                      dtype=np.float64)[fleet["infra"]]
+    warmup_days = (table["warmup_weeks"] * 7).astype(np.int64)[fleet["infra"]]
+
+    today64 = np.datetime64(today, "D")
+    ramp_end = np.where(np.isnat(fleet["created"]), today64, fleet["created"]) + warmup_days
+    days_left = np.maximum((ramp_end - today64).astype(np.int64), 0)
+
+    start = np.where(fleet["warming"], fleet["warmup_limit"], fleet["daily_limit"])
+    step = np.where(fleet["warming"], np.maximum(target - start, 0), 0)
+    offsets = np.arange(days, dtype=np.float64)[:, None]
+    fraction = np.clip(offsets / np.maximum(days_left, 1)[None, :], 0, 1)
+    return start[None, :] + fraction * step[None, :]
+
+
+def _rollup(capacity: np.ndarray, codes: np.ndarray, n_groups: int) -> np.ndarray:
+    """(days, mailboxes) -> (days, groups) sums"""
+    onehot = (codes[None, :] == np.arange(n_groups)[:, None]).astype(np.float64)
+    return capacity @ onehot.T
+
+
+def simulate_warmup_ramp(mailbox_data: dict, weeks: int = RAMP_WEEKS, today: date = None) -> dict:
+    """
+    Daily capacity projection for the tracked fleet
+
+    Args:
+        mailbox_data: Indexed inventory (index_mailboxes)
+        weeks: Weeks to project
+        today: Day 0 (default: today)
+
+    Returns:
+        {
+            "start_date", "weeks", "dates": [...],
+            "totals": group, "by_infra": {infra_type: group}, "by_workspace": {workspace: group},
+        }
+        where group = {mailbox_count, in_warmup, current_capacity, theoretical_max,
+                       capacity: [sends/day per date], reaches_max_on}
+    """
+    today = today or date.today()
+    days = weeks * 7
+    fleet = fleet_arrays(mailbox_data["store"], mailbox_data["warmup_data"])
+    capacity = ramp_capacity(fleet, days, today)
+    dates = [(today + timedelta(days=d)).isoformat() for d in range(days)]
+    per_mailbox_max = np.array([INFRA_MAX_LIMITS.get(t, 10) for t in fleet["infra_types"]],
+                               dtype=np.float64)[fleet["infra"]]
+
+    def groups(names: list, codes: np.ndarray) -> dict:
+        n = len(names)
+        series = np.rint(_rollup(capacity, codes, n)).astype(np.int64)
+        mailbox_count = np.bincount(codes, minlength=n)
+        in_warmup = np.bincount(codes, weights=fleet["warming"], minlength=n).astype(np.int64)
+        theoretical = np.rint(np.bincount(codes, weights=per_mailbox_max, minlength=n)).astype(np.int64)
+        reached = series >= theoretical[None, :]
+        first = reached.argmax(axis=0)
+        out = {}
+        for g, name in enumerate(names):
+            out[name] = {
+                "mailbox_count": int(mailbox_count[g]),
+                "in_warmup": int(in_warmup[g]),
+                "current_capacity": int(series[0, g]) if days else 0,
+                "theoretical_max": int(theoretical[g]),
+                "capacity": series[:, g].tolist(),
+                "reaches_max_on": dates[first[g]] if days and reached[first[g], g] else None,
+            }
+        return out
+
+    return {
+        "start_date": today.isoformat(),
+        "weeks": weeks,
+        "dates": dates,
+        "totals": groups(["all"], np.zeros(len(fleet["infra"]), dtype=np.int64))["all"],
+        "by_infra": groups(fleet["infra_types"], fleet["infra"]),
+        "by_workspace": groups(fleet["workspaces"], fleet["workspace"]),
+    }
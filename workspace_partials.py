@@ -0,0 +1,256 @@
+"""
+RGL Infra Tracking - Workspace Partials
+Per-workspace partial results for incremental data.json regeneration
+
+Every number in a period output is a sum (or a domain-set union) over
+workspaces, so each workspace's share can be computed on its own, keyed
+by a content hash of its inputs, and merged afterwards:
+
+    h = workspace_hash(workspace, infra_groups, warmup_list, daily, windows)
+    partial = workspace_partial(workspace, infra_groups, warmup_list, daily, windows)
+    periods = merge_partials([partial, ...], windows)   # {period: summarize_groups structure}
+
+Partials are plain JSON (lists, string keys) so they can be cached on disk
+between runs; a workspace is recomputed only when its hash changes.
+
+The hash covers the workspace's inventory and its per-period group totals,
+not the window dates, so a partial survives the windows rolling forward
+as long as the workspace's sums come out the same. In practice that means
+idle workspaces and repeated runs on the same data; a workspace that sent
+anything in a window since the last run is recomputed. The saving is local
+aggregation only: the API stats are refetched every run either way.
+"""
+
+import hashlib
+import json
+
+import numpy as np
+
+from allocation import METRICS, build_membership, allocate, rollup
+from config import TRACKED_INFRA_TYPES, INFRA_MAX_LIMITS
+from analyzer import finish_period_stats, sum_daily_stats
+
+# Bump when the partial layout or the merge changes (invalidates cached partials)
+PARTIAL_FORMAT = 2
+
+
+def _workspace_daily(workspace_name: str, infra_groups: dict, daily: dict) -> dict:
+    """The workspace's groups from daily, in infra_groups order"""
+    return {(workspace_name, infra_type): daily[(workspace_name, infra_type)]
+            for infra_type in infra_groups if (workspace_name, infra_type) in daily}
+
+
+def workspace_hash(workspace_name: str, infra_groups: dict, warmup_list: list,
+                   daily: dict, windows: dict) -> str:
+    """
+    Content hash of everything a workspace partial is computed from
+
+    Only the inputs that differ per workspace are hashed: the mailboxes, the
+    warmup list and the group totals of each period (not the window dates,
+    which change every day for every workspace alike).
+
+    Args:
+        workspace_name: Workspace
+        infra_groups: {infra_type: [mailbox, ...]} tracked mailboxes of the workspace
+        warmup_list: The workspace's raw warmup items
+        daily: {(workspace, infra_type): {date: [sent, replied, bounced, interested]}}
+            (other workspaces' groups are ignored)
+        windows: {period: (start_date, end_date, num_days)}
+    """
+    workspace_daily = _workspace_daily(workspace_name, infra_groups, daily)
+    period_totals = {}
+    for period, (start_date, end_date, _) in windows.items():
+        group_results, _ = sum_daily_stats(workspace_daily, start_date, end_date)
+        period_totals[period] = [[infra_type, values] for (_, infra_type), values in group_results.items()]
+    payload = [
+        PARTIAL_FORMAT,
+        workspace_name,
+        [[infra_type, [mb.snapshot_row() for mb in mailboxes]]
+         for infra_type, mailboxes in infra_groups.items()],
+        warmup_list,
+        period_totals,
+    ]
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def workspace_partial(workspace_name: str, infra_groups: dict, warmup_list: list,
+                      daily: dict, windows: dict) -> dict:
+    """
+    One workspace's share of every period (see workspace_hash for the arguments)
+
+    Returns:
+        {
+            "format": PARTIAL_FORMAT,
+            "workspace": workspace_name,
+            "infra": [{infra_type, mailbox_count, current_capacity, domains,
+                       in_warmup, ready, total_warmup_limit}, ...],
+            "infra_tld_domains": [[infra_type, tld, [domain, ...]], ...],
+            "periods": {period: {
+                "groups": [[infra_type, [sent, replied, bounced, interested]], ...],
+                "tld": [[tld, mailbox_count, [metrics]], ...],
+                "infra_tld": [[infra_type, tld, mailbox_count, [metrics]], ...],
+            }},
+        }
+    """
+    # Warmup counts (as calculate_warmup_stats, looked up in this workspace's mailboxes)
+    by_id = {mb.external_id: mb for mailboxes in infra_groups.values() for mb in mailboxes}
+    warmup = {infra_type: {"in_warmup": 0, "ready": 0, "total_warmup_limit": 0}
+              for infra_type in infra_groups}
+    for item in warmup_list:
+        mb_id = item.get("id")
+        if mb_id and mb_id in by_id:
+            stats = warmup[by_id[mb_id].infra_type]
+            warmup_enabled = item.get("warmup_enabled", False)
+            warmup_limit = item.get("warmup_daily_limit", 0)
+            if warmup_enabled and warmup_limit > 0:
+                stats["in_warmup"] += 1
+                stats["total_warmup_limit"] += warmup_limit
+            elif not warmup_enabled:
+                stats["ready"] += 1
+
+    infra = []
+    infra_tld_domains = {}
+    for infra_type, mailboxes in infra_groups.items():
+        infra.append({
+            "infra_type": infra_type,
+            "mailbox_count": len(mailboxes),
+            "current_capacity": sum(mb.daily_limit for mb in mailboxes),
+            "domains": sorted(set(mb.domain for mb in mailboxes if mb.domain)),
+            **warmup[infra_type],
+        })
+        for mb in mailboxes:
+            if mb.tld:
+                infra_tld_domains.setdefault((infra_type, mb.tld), set()).add(mb.domain)
+
+    # TLD split per period (allocation is per group, so workspaces add up)
+    membership = build_membership({workspace_name: infra_groups})
+    groups = membership["groups"]
+    workspace_daily = _workspace_daily(workspace_name, infra_groups, daily)
+    periods = {}
+    for period, (start_date, end_date, _) in windows.items():
+        group_results, _ = sum_daily_stats(workspace_daily, start_date, end_date)
+        totals = np.array([[group_results.get(g, [0] * len(METRICS)) for g in groups]], dtype=np.float64)
+        slot_values = allocate(totals, membership)
+        fetched = np.array([g in group_results for g in groups], dtype=bool)
+        weights = (membership["slot_weight"] * fetched[membership["slot_group"]])[None, :, None]
+
+        periods[period] = {
+            "groups": [[infra_type, values] for (_, infra_type), values in group_results.items()],
+            "tld": [
+                [tld, count, values] for tld, count, values in zip(
+                    membership["tlds"],
+                    rollup(weights, membership, "tld")[0, :, 0].tolist(),
+                    rollup(slot_values, membership, "tld")[0].tolist())
+            ],
+            "infra_tld": [
+                [infra_type, tld, count, values] for (infra_type, tld), count, values in zip(
+                    membership["infra_tlds"],
+                    rollup(weights, membership, "infra_tld")[0, :, 0].tolist(),
+                    rollup(slot_values, membership, "infra_tld")[0].tolist())
+            ],
+        }
+
+    return {
+        "format": PARTIAL_FORMAT,
+        "workspace": workspace_name,
+        "infra": infra,
+        "infra_tld_domains": [[infra_type, tld, sorted(domains)]
+                              for (infra_type, tld), domains in infra_tld_domains.items()],
+        "periods": periods,
+    }
+
+
+def merge_partials(partials: list, windows: dict) -> dict:
+    """
+    Merge workspace partials (in output order) into every period
+
+    Returns {period: {"by_infra", "by_client", "by_tld", "by_infra_tld", "totals"}},
+    the same structure summarize_groups builds from the full inventory
+    """
+    # Inventory side, shared by every period
+    inventory = {infra_type: {"mailbox_count": 0, "current_capacity": 0, "domains": set(),
+                              "in_warmup": 0, "ready": 0, "total_warmup_limit": 0}
+                 for infra_type in TRACKED_INFRA_TYPES}
+    workspace_inventory = {}
+    tld_domains, infra_tld_domains = {}, {}
+    for partial in partials:
+        for item in partial["infra"]:
+            infra_type = item["infra_type"]
+            totals = inventory[infra_type]
+            for key in ("mailbox_count", "current_capacity", "in_warmup", "ready", "total_warmup_limit"):
+                totals[key] += item[key]
+            totals["domains"].update(item["domains"])
+            workspace_inventory[(partial["workspace"], infra_type)] = item
+        for infra_type, tld, domains in partial["infra_tld_domains"]:
+            tld_domains.setdefault(tld, set()).update(domains)
+            infra_tld_domains.setdefault((infra_type, tld), set()).update(domains)
+
+    results = {}
+    for period, (_, _, num_days) in windows.items():
+        infra_stats = {}
+        for infra_type, totals in inventory.items():
+            in_warmup = totals["in_warmup"]
+            infra_stats[infra_type] = {
+                "mailbox_count": totals["mailbox_count"],
+                "domain_count": len(totals["domains"]),
+                "current_capacity": totals["current_capacity"],
+                "theoretical_max": totals["mailbox_count"] * INFRA_MAX_LIMITS.get(infra_type, 10),
+                "sent": 0,
+                "replied": 0,
+                "bounced": 0,
+                "interested": 0,
+                "workspaces": set(),
+                "in_warmup": in_warmup,
+                "ready": totals["ready"],
+                "avg_warmup_limit": round(totals["total_warmup_limit"] / in_warmup, 1) if in_warmup > 0 else 0,
+            }
+
+        workspace_infra_stats = {}
+        tld_totals, infra_tld_totals = {}, {}
+        for partial in partials:
+            workspace_name = partial["workspace"]
+            period_partial = partial["periods"][period]
+
+            for infra_type, values in period_partial["groups"]:
+                stats = infra_stats[infra_type]
+                for metric, value in zip(METRICS, values):
+                    stats[metric] += value
+                stats["workspaces"].add(workspace_name)
+
+                item = workspace_inventory[(workspace_name, infra_type)]
+                workspace_infra_stats.setdefault(workspace_name, {})[infra_type] = {
+                    "mailbox_count": item["mailbox_count"],
+                    "domain_count": len(item["domains"]),
+                    "current_capacity": item["current_capacity"],
+                    "theoretical_max": item["mailbox_count"] * INFRA_MAX_LIMITS.get(infra_type, 10),
+                    **dict(zip(METRICS, values)),
+                }
+
+            # TLD keys keep first-seen order across workspaces, as one global membership would
+            for tld, count, values in period_partial["tld"]:
+                _add_counts(tld_totals.setdefault(tld, [0, [0] * len(METRICS)]), count, values)
+            for infra_type, tld, count, values in period_partial["infra_tld"]:
+                _add_counts(infra_tld_totals.setdefault((infra_type, tld), [0, [0] * len(METRICS)]),
+                            count, values)
+
+        tld_stats = {tld: _tld_entry(count, values)
+                     for tld, (count, values) in tld_totals.items() if count}
+        infra_tld_stats = {}
+        for (infra_type, tld), (count, values) in infra_tld_totals.items():
+            if count:
+                infra_tld_stats.setdefault(infra_type, {})[tld] = _tld_entry(count, values)
+
+        results[period] = finish_period_stats(infra_stats, workspace_infra_stats, tld_stats,
+                                              infra_tld_stats, tld_domains, infra_tld_domains, num_days)
+    return results
+
+
+def _add_counts(entry: list, count: int, values: list) -> None:
+    entry[0] += count
+    for i, value in enumerate(values):
+        entry[1][i] += value
+
+
+def _tld_entry(count: int, values: list) -> dict:
+    return {"mailbox_count": count, "domain_count": 0, **dict(zip(METRICS, values))}